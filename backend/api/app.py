@@ -3,11 +3,27 @@ Flask API for options pricing service.
 Provides REST endpoint for pricing options using Monte Carlo simulation.
 """
 
-from flask import Flask, request, jsonify, make_response
-from pricing import price_option
+from flask import Flask, Response, g, request, jsonify, make_response
+from pricing import (
+    price_option_batch, price_option_detailed, price_option_ladder, price_option_memoized, memoized_request, CONTROL_VARIATES, ENGINES, LSM_BASES, QUICK_ENGINES,
+    SCHEME_STEPS_PER_YEAR
+)
 from data.cache import get_api_usage_stats
+from jobs import JobQueue, JobQueueFull, run_pricing_job
+from metrics import REQUEST_SECONDS, collect_timings, debug_log, render_metrics, timed
+from model.heston_model import DEFAULT_BLOCK_SIZE
+from payloads import MSGPACK_MIMETYPE, PATH_ENCODINGS, compress, encode_arrays, msgpack, pack_msgpack, sample_paths
 from flask_cors import CORS
+from dataclasses import dataclass
+from typing import Optional
+import contextvars
+import functools
+import hashlib
+import json
 import os
+import queue
+import threading
+import time
 
 app = Flask(__name__)
 
@@ -20,11 +36,69 @@ ALLOWED_ORIGINS = [
 ]
 CORS(app, resources={
     r"/price_option": {"origins": ALLOWED_ORIGINS},
-    r"/price_option/*": {"origins": ALLOWED_ORIGINS}
+    r"/price_option/*": {"origins": ALLOWED_ORIGINS},
+    r"/price_ladder": {"origins": ALLOWED_ORIGINS},
+    r"/price_options": {"origins": ALLOWED_ORIGINS},
+    r"/jobs": {"origins": ALLOWED_ORIGINS},
+    r"/jobs/*": {"origins": ALLOWED_ORIGINS}
 })
 
 # Configuration
 MAX_SAMPLE_PATHS = 150  # Limit paths sent to frontend for performance
+MIN_SIMULATIONS = 100
+MAX_IN_MEMORY_SIMULATIONS = 10000  # Above this, paths are streamed in blocks
+MAX_SIMULATIONS = 200000
+MAX_JOB_SIMULATIONS = 2000000  # Background jobs (/jobs) run off the request thread
+MAX_LADDER_STRIKES = 50
+MAX_BATCH_CONTRACTS = 200
+PRICING_MODES = ('full', 'quick')  # quick: closed-form American approximation, no simulation
+PRICING_WORKERS = int(os.environ.get('PRICING_WORKERS', os.cpu_count() or 1))
+RESULT_MAX_AGE_SECONDS = 60  # Client cache lifetime of a /price_option response
+
+# Background pricing jobs, one per worker process
+pricing_jobs = JobQueue()
+
+
+@dataclass
+class PriceRequest:
+    """A validated /price_option request."""
+    call_or_put: str
+    ticker: str
+    strike_price: float
+    time_to_expiry_days: float
+    num_simulations: int
+    scheme: str
+    mode: str
+    engine: str
+    options: dict  # Keyword arguments for price_option_detailed other than workers
+    path_points: Optional[int] = None  # Downsample sample paths to this many time steps
+    path_encoding: str = 'list'  # JSON format of the sample paths, one of PATH_ENCODINGS
+
+    @property
+    def args(self):
+        """Positional arguments for price_option_detailed."""
+        return (self.call_or_put, self.ticker, self.strike_price, self.time_to_expiry_days / 365.0,
+                self.num_simulations)
+
+
+def _instrumented(endpoint):
+    """
+    Collect per-stage timings while a view runs and record its total duration.
+
+    A streamed response is still being produced when the view returns, so its
+    body generator records the duration itself (see _stream_pricing).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with collect_timings() as timings:
+                g.timings = timings
+                response = view(*args, **kwargs)
+            if not getattr(response, 'is_streamed', False):
+                REQUEST_SECONDS.observe(time.perf_counter() - timings.started, endpoint=endpoint)
+            return response
+        return wrapper
+    return decorator
 
 
 @app.route('/', methods=['OPTIONS'])
@@ -36,7 +110,7 @@ def handle_options():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Simple health check endpoint."""
-    print("🏥 Health check request received")
+    debug_log("🏥 Health check request received")
     return jsonify({
         'status': 'healthy',
         'message': 'Options pricer API is running',
@@ -44,7 +118,14 @@ def health_check():
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus-style metrics: stage timing histograms, path counts and cache hit/miss counters."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/price_option', methods=['POST'])
+@_instrumented('price_option')
 def calculate_option_price():
     """
     Calculate option prices using Monte Carlo simulation.
@@ -55,9 +136,48 @@ def calculate_option_price():
         "ticker": "AAPL",
         "strike_price": 150.0,
         "time_to_expiry": 30,
-        "num_simulations": 1000
+        "num_simulations": 1000,
+        "mode": "full" | "quick"  (optional, default "full"; "quick" returns an indicative closed-form
+                                   quote for as-you-type use, defaulting engine to "bjerksund_stensland"),
+        "engine": "monte_carlo" | "pde" | "tree" | "barone_adesi_whaley" | "bjerksund_stensland"
+                  (optional, default "monte_carlo"; "pde" (finite differences) and "tree" (Leisen-Reimer)
+                   are fast deterministic prices without paths, the last two are closed-form approximations),
+        "scheme": "euler" | "qe"  (optional, default "euler"),
+        "seed": 42  (optional, makes the result reproducible),
+        "qmc": false  (optional, randomized quasi-Monte Carlo paths),
+        "antithetic": false  (optional, antithetic path pairs),
+        "control_variate": false | true | "black_scholes" | "heston"  (optional, American control variate),
+        "target_se": 0.01  (optional, simulate until the American standard error reaches this;
+                            num_simulations then becomes the minimum path count),
+        "max_sims": 200000  (optional, path cap when target_se or time_budget_ms is set),
+        "time_budget_ms": 500  (optional, stop simulating after this much time),
+        "lsm_basis": "monomial" | "laguerre" | "european"  (optional, Longstaff-Schwartz regression basis),
+        "lsm_itm_only": true  (optional, regress on in-the-money paths only),
+        "exercise_frequency": 52  (optional, early-exercise dates per year; default every simulated day),
+        "richardson": false  (optional, extrapolate the American price from two exercise grids),
+        "reuse_policy": false  (optional, price with a cached exercise policy instead of refitting),
+        "greeks": false  (optional, simulated delta, gamma and vega of both prices with standard errors;
+                          "monte_carlo" engine only),
+        "path_points": 60  (optional, downsample each sample path to this many time steps (LTTB);
+                            "path_steps" then gives the time-step index of every point),
+        "path_encoding": "list" | "float32"  (optional, sample paths as nested lists or as
+                                              {"dtype", "shape", "data"} with base64 float32 data),
+        "timings": false  (optional, add per-stage timings to the response; also ?timings=1)
     }
     
+    With "Accept: application/msgpack" (and msgpack installed) the body is
+    MessagePack, paths carrying raw float32 bytes; large bodies are brotli- or
+    gzip-compressed per Accept-Encoding.
+    
+    Results are memoized per ticker data version (see memoized_request):
+    requests without a seed use a fixed one, so repeating a request returns the
+    same prices. Responses carry a weak ETag and a Cache-Control max-age, and a
+    request whose If-None-Match holds the current ETag gets 304 Not Modified
+    without being priced.
+    Runs with time_budget_ms or reuse_policy, and requests asking for timings,
+    are priced afresh and carry no ETag; unseeded timed requests also simulate
+    fresh paths, so their timings include the path generation.
+    
     Legacy field names also supported:
     {
         "callOrPut": "call" | "put",
@@ -70,92 +190,711 @@ def calculate_option_price():
     Returns:
         JSON response with option prices, paths, and metadata
     """
-    print(f"🔍 Received request to /price_option from {request.origin}")
-    print(f"📝 Request headers: {dict(request.headers)}")
+    debug_log(f"🔍 Received request to /price_option from {request.origin}")
+    debug_log(f"📝 Request headers: {dict(request.headers)}")
+    
+    try:
+        data = request.get_json()
+        debug_log(f"📊 Request data: {data}")
+        
+        price_request, error = _parse_price_request(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        # The ETag is known from the request and the market data version, before any pricing
+        # Timed requests are priced afresh, so their timings describe an actual run
+        memoized = memoized_request(*price_request.args, keep_paths=MAX_SAMPLE_PATHS,
+                                    memoize=not _timings_requested(data), workers=PRICING_WORKERS,
+                                    **price_request.options)
+        etag = _result_etag(memoized.digest, price_request)
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            result = price_option_memoized(memoized)
+            response = _json_response(_price_payload(result, price_request), data)
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = f'private, max-age={RESULT_MAX_AGE_SECONDS}'
+        return response
+        
+    except ValueError as e:
+        return jsonify({'error': f'Invalid input data: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Error calculating option price. Please check the ticker symbol and try again.',
+            'details': str(e)
+        }), 500
+
+
+@app.route('/price_option/stream', methods=['POST'])
+@_instrumented('price_option_stream')
+def stream_option_price():
+    """
+    Price an option like /price_option, streaming running estimates as Server-Sent Events.
+    
+    Expected JSON payload: as for /price_option, plus
+    {
+        "block_size": 2500  (optional, paths per block, i.e. per progress event)
+    }
+    
+    Monte Carlo runs are priced block by block (as in streaming mode). After each
+    block a "progress" event carries the running American and European prices,
+    their standard errors and the path count; a final "result" event carries the
+    full /price_option response body, or an "error" event the failure. When the
+    client disconnects the remaining blocks are cancelled. QMC runs and the
+    deterministic engines send their result only.
+    
+    Returns:
+        text/event-stream response, or a JSON error for an invalid request
+    """
+    try:
+        data = request.get_json()
+        
+        price_request, error = _parse_price_request(data)
+        if error:
+            return jsonify({'error': error}), 400
+        block_size = int(data.get('block_size', DEFAULT_BLOCK_SIZE))
+        if block_size < MIN_SIMULATIONS:
+            return jsonify({'error': f'block_size must be at least {MIN_SIMULATIONS:,}'}), 400
+        
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid input data: {str(e)}'}), 400
+    
+    stream = _stream_pricing(price_request, block_size, g.timings.started, _timings_requested(data))
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/jobs', methods=['POST'])
+@_instrumented('jobs')
+def submit_pricing_job():
+    """
+    Queue a pricing run on the job worker pool instead of running it in the request thread.
+    
+    Expected JSON payload: as for /price_option, with num_simulations and max_sims
+    allowed up to MAX_JOB_SIMULATIONS.
     
+    Returns:
+        202 response with the job id and the URL to poll (also in the Location header),
+        or 503 when too many jobs are already pending
+    """
     try:
         data = request.get_json()
-        print(f"📊 Request data: {data}")
         
-        # Support both new and legacy field names
-        call_or_put = data.get('option_type', data.get('callOrPut', '')).lower()
-        ticker = data.get('ticker', '').upper().strip()
-        strike_price = float(data.get('strike_price', data.get('K', 0)))
-        time_to_expiry_days = float(data.get('time_to_expiry', data.get('T', 0)))
-        num_simulations = int(data.get('num_simulations', data.get('numSims', 0)))
+        price_request, error = _parse_price_request(data, MAX_JOB_SIMULATIONS)
+        if error:
+            return jsonify({'error': error}), 400
         
-        print(f"🎯 Processing: {call_or_put} option for {ticker}, strike=${strike_price}, days={time_to_expiry_days}")
+        try:
+            job = pricing_jobs.submit(run_pricing_job, price_request.args, price_request.options, MAX_SAMPLE_PATHS,
+                                      context=price_request)
+        except JobQueueFull as e:
+            return jsonify({'error': str(e)}), 503
         
-        # Convert days to years for the simulation (if needed)
-        time_to_expiry_years = time_to_expiry_days / 365.0
+        status_url = f'/jobs/{job.id}'
+        response = jsonify({'job_id': job.id, 'status': job.status, 'status_url': status_url})
+        response.headers['Location'] = status_url
+        return response, 202
+        
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid input data: {str(e)}'}), 400
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@_instrumented('job_status')
+def get_pricing_job(job_id):
+    """
+    Poll a pricing job.
+    
+    Returns:
+        JSON response with the job's status ("queued", "running", "completed" or "failed")
+        and, once finished, its /price_option result or error; 404 for unknown or expired jobs
+    """
+    job = pricing_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job id'}), 404
+    
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'submitted_at': job.submitted_at,
+        'finished_at': job.finished_at
+    }
+    if payload['status'] == 'completed':
+        payload['result'] = _price_payload(job.future.result(), job.context)
+    elif payload['status'] == 'failed':
+        error = job.future.exception()
+        if isinstance(error, ValueError):
+            payload['error'] = f'Invalid input data: {str(error)}'
+        else:
+            payload['error'] = 'Error calculating option price. Please check the ticker symbol and try again.'
+            payload['details'] = str(error)
+    return _json_response(payload, {}, path_encoding=job.context.path_encoding)
+
+
+
+@app.route('/price_ladder', methods=['POST'])
+@_instrumented('price_ladder')
+def calculate_option_ladder():
+    """
+    Price a ladder of strikes, for calls and/or puts, from one simulated path set.
+    
+    Expected JSON payload:
+    {
+        "ticker": "AAPL",
+        "strikes": [140.0, 145.0, 150.0],
+        "time_to_expiry": 30,
+        "num_simulations": 1000,
+        "option_types": ["call", "put"]  (optional, default both),
+        "scheme", "seed", "qmc", "antithetic", "control_variate", "lsm_basis", "lsm_itm_only",
+        "exercise_frequency", "richardson", "reuse_policy", "greeks", "mode", "engine", "path_points",
+        "path_encoding", "timings"
+        (optional, as for /price_option)
+    }
+    
+    Paths are shared by every contract in the ladder, and seeded path sets are
+    cached, so later ladders or /price_option calls with the same ticker, expiry,
+    seed and settings reuse them.
+    
+    Returns:
+        JSON response with one result per (option type, strike), sample paths and metadata
+    """
+    try:
+        data = request.get_json()
+        
+        ticker = str(data.get('ticker', '')).upper().strip()
+        strikes = [float(strike) for strike in data.get('strikes', [])]
+        time_to_expiry_days = float(data.get('time_to_expiry', 0))
+        num_simulations = int(data.get('num_simulations', 0))
+        option_types = [str(option_type).lower() for option_type in data.get('option_types', ['call', 'put'])]
+        mode, options, error = _pricing_options(data)
+        if error:
+            return jsonify({'error': error}), 400
+        if options['engine'] != 'monte_carlo' and 'num_simulations' not in data:
+            num_simulations = MIN_SIMULATIONS
+        path_points, path_encoding, error = _path_options(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Validate required fields
-        if not call_or_put:
-            return jsonify({'error': 'Missing required field: option_type or callOrPut'}), 400
         if not ticker:
             return jsonify({'error': 'Missing required field: ticker'}), 400
-        if strike_price <= 0:
-            return jsonify({'error': 'Missing or invalid required field: strike_price or K'}), 400
-        if time_to_expiry_days <= 0:
-            return jsonify({'error': 'Missing or invalid required field: time_to_expiry or T'}), 400
-        if num_simulations <= 0:
-            return jsonify({'error': 'Missing or invalid required field: num_simulations or numSims'}), 400
-        
-        # Validate input values
-        if time_to_expiry_days > 365:  # Max 1 year (365 days)
+        if not strikes or len(strikes) > MAX_LADDER_STRIKES:
+            return jsonify({'error': f'strikes must contain between 1 and {MAX_LADDER_STRIKES} strike prices'}), 400
+        if any(strike <= 0 for strike in strikes):
+            return jsonify({'error': 'Strike prices must be positive'}), 400
+        if not 0 < time_to_expiry_days <= 365:
             return jsonify({'error': 'Time to expiry must be between 0 and 365 days'}), 400
-        if num_simulations < 100 or num_simulations > 10000:  # Reduced limits for deployment
-            return jsonify({'error': 'Number of simulations must be between 100 and 10,000'}), 400
-        if call_or_put not in ['call', 'put']:
-            return jsonify({'error': 'Option type must be "call" or "put"'}), 400
-        
-        # Price the option
-        american_price, european_price, american_se, european_se, paths, volatility, dividends = price_option(
-            call_or_put, ticker, strike_price, time_to_expiry_years, num_simulations
-        )
-        
-        # Get API usage statistics
-        api_stats = get_api_usage_stats()
+        if num_simulations < MIN_SIMULATIONS or num_simulations > MAX_IN_MEMORY_SIMULATIONS:
+            return jsonify({'error': f'Number of simulations must be between {MIN_SIMULATIONS:,} and {MAX_IN_MEMORY_SIMULATIONS:,}'}), 400
+        if not option_types or any(option_type not in ['call', 'put'] for option_type in option_types):
+            return jsonify({'error': 'option_types must contain "call" and/or "put"'}), 400
         
-        # Sample paths for frontend (limit for performance)
-        if not hasattr(paths, '__len__') or isinstance(paths, (float, int)):
-            sampled_paths = []
-        else:
-            sampled_paths = paths[:MAX_SAMPLE_PATHS] if len(paths) > MAX_SAMPLE_PATHS else paths
-            # Ensure sampled_paths is a list of lists for JSON serialization
-            if hasattr(sampled_paths, 'tolist'):
-                sampled_paths = sampled_paths.tolist()
-            else:
-                sampled_paths = [list(p) for p in sampled_paths]
+        results = price_option_ladder(
+            ticker, strikes, time_to_expiry_days / 365.0, num_simulations, option_types=tuple(option_types),
+            workers=PRICING_WORKERS, **options
+        )
+        first = next(iter(results.values()))
+        with timed('serialization'):
+            sampled_paths, path_steps = sample_paths(first.paths, MAX_SAMPLE_PATHS, path_points)
         
-        response = jsonify({
-            'us_option_price': american_price,
-            'eu_option_price': european_price,
+        return _json_response({
+            'results': [
+                {
+                    'option_type': option_type,
+                    'strike_price': strike,
+                    'us_option_price': result.us_price,
+                    'eu_option_price': result.eu_price,
+                    'us_price_std': result.us_std,
+                    'eu_price_std': result.eu_std,
+                    'us_price_se': result.us_se,
+                    'eu_price_se': result.eu_se,
+                    'policy_reused': result.policy_reused,
+                    'greeks': result.greeks
+                }
+                for (option_type, strike), result in results.items()
+            ],
             'paths': sampled_paths,
-            'us_price_std': american_se,
-            'eu_price_std': european_se,
-            'vol': volatility,
-            'dividends': dividends,
-            'api_usage': api_stats,
+            'path_steps': path_steps,
+            'vol': first.volatility,
+            'dividends': first.dividends,
+            'api_usage': get_api_usage_stats(),
             'ticker': ticker,
-            'strike_price': strike_price,
             'time_to_expiry': time_to_expiry_days,
-            'option_type': call_or_put,
-            'total_paths': len(paths) if hasattr(paths, '__len__') else 0,
+            'scheme': options['scheme'],
+            'mode': mode,
+            'engine': options['engine'],
+            'total_paths': first.num_paths,
             'sampled_paths': len(sampled_paths)
-        })
+        }, data)
         
-        return response
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid input data: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Error calculating option prices. Please check the ticker symbol and try again.',
+            'details': str(e)
+        }), 500
+
+
+@app.route('/price_options', methods=['POST'])
+@_instrumented('price_options')
+def calculate_option_batch():
+    """
+    Price many contracts across tickers, strikes, expiries and option types in one request.
+    
+    Expected JSON payload:
+    {
+        "contracts": [
+            {"ticker": "AAPL", "option_type": "call", "strike_price": 150.0, "time_to_expiry": 30},
+            ...
+        ]  (legacy callOrPut / K / T names are accepted as for /price_option),
+        "num_simulations": 1000,
+        "scheme", "seed", "qmc", "antithetic", "control_variate", "lsm_basis", "lsm_itm_only",
+        "exercise_frequency", "richardson", "reuse_policy", "greeks", "mode", "engine", "timings"
+        (optional, as for /price_option, applied to every contract)
+    }
+    
+    Contracts are grouped by ticker and expiry: market data is fetched once per
+    ticker and each expiry's strikes and option types share one path set.
+    
+    Returns:
+        JSON response with one result per contract in request order; a contract that
+        cannot be priced carries an "error" (and "details") instead of prices
+    """
+    try:
+        data = request.get_json()
         
-    except ValueError as e:
+        items = data.get('contracts', [])
+        num_simulations = int(data.get('num_simulations', 0))
+        mode, options, error = _pricing_options(data)
+        if error:
+            return jsonify({'error': error}), 400
+        if options['engine'] != 'monte_carlo' and 'num_simulations' not in data:
+            num_simulations = MIN_SIMULATIONS
+        
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_BATCH_CONTRACTS:
+            return jsonify({'error': f'contracts must contain between 1 and {MAX_BATCH_CONTRACTS} contracts'}), 400
+        if num_simulations < MIN_SIMULATIONS or num_simulations > MAX_IN_MEMORY_SIMULATIONS:
+            return jsonify({'error': f'Number of simulations must be between {MIN_SIMULATIONS:,} and {MAX_IN_MEMORY_SIMULATIONS:,}'}), 400
+        
+        # Malformed contracts get their error in place; the rest are priced together
+        contracts, results = [], [None] * len(items)
+        for index, item in enumerate(items):
+            try:
+                contracts.append((index, _batch_contract(item)))
+            except (ValueError, TypeError, AttributeError) as e:
+                results[index] = {'error': f'Invalid input data: {str(e)}'}
+        
+        priced = price_option_batch(
+            [(call_or_put, ticker, strike, days / 365.0) for _, (call_or_put, ticker, strike, days) in contracts],
+            num_simulations, workers=PRICING_WORKERS, **options
+        )
+        for (index, (call_or_put, ticker, strike, days)), result in zip(contracts, priced):
+            contract = {
+                'ticker': ticker,
+                'option_type': call_or_put,
+                'strike_price': strike,
+                'time_to_expiry': days
+            }
+            if isinstance(result, ValueError):
+                results[index] = {**contract, 'error': f'Invalid input data: {str(result)}'}
+            elif isinstance(result, Exception):
+                results[index] = {
+                    **contract,
+                    'error': 'Error calculating option price. Please check the ticker symbol and try again.',
+                    'details': str(result)
+                }
+            else:
+                results[index] = {
+                    **contract,
+                    'us_option_price': result.us_price,
+                    'eu_option_price': result.eu_price,
+                    'us_price_std': result.us_std,
+                    'eu_price_std': result.eu_std,
+                    'us_price_se': result.us_se,
+                    'eu_price_se': result.eu_se,
+                    'vol': result.volatility,
+                    'dividends': result.dividends,
+                    'total_paths': result.num_paths,
+                    'policy_reused': result.policy_reused,
+                    'greeks': result.greeks
+                }
+        
+        return _json_response({
+            'results': results,
+            'api_usage': get_api_usage_stats(),
+            'scheme': options['scheme'],
+            'mode': mode,
+            'engine': options['engine']
+        }, data)
+        
+    except (ValueError, TypeError, AttributeError) as e:
         return jsonify({'error': f'Invalid input data: {str(e)}'}), 400
     except Exception as e:
         return jsonify({
-            'error': 'Error calculating option price. Please check the ticker symbol and try again.',
+            'error': 'Error calculating option prices. Please check the ticker symbols and try again.',
             'details': str(e)
         }), 500
 
 
+def _batch_contract(item):
+    """Parse and validate one /price_options contract; returns (call_or_put, ticker, strike, days to expiry)."""
+    call_or_put = str(item.get('option_type', item.get('callOrPut', ''))).lower()
+    ticker = str(item.get('ticker', '')).upper().strip()
+    strike_price = float(item.get('strike_price', item.get('K', 0)))
+    time_to_expiry_days = float(item.get('time_to_expiry', item.get('T', 0)))
+    if call_or_put not in ['call', 'put']:
+        raise ValueError('Option type must be "call" or "put"')
+    if not ticker:
+        raise ValueError('Missing required field: ticker')
+    if strike_price <= 0:
+        raise ValueError('Missing or invalid required field: strike_price or K')
+    if not 0 < time_to_expiry_days <= 365:
+        raise ValueError('Time to expiry must be between 0 and 365 days')
+    return call_or_put, ticker, strike_price, time_to_expiry_days
+
+
+def _parse_price_request(data, max_simulations=MAX_SIMULATIONS):
+    """
+    Parse and validate a /price_option payload.
+    
+    Args:
+        data: Request JSON
+        max_simulations: Largest accepted num_simulations (and max_sims)
+    
+    Returns:
+        Tuple of (PriceRequest, None), or (None, error message) for an invalid request
+    """
+    # Support both new and legacy field names
+    call_or_put = data.get('option_type', data.get('callOrPut', '')).lower()
+    ticker = data.get('ticker', '').upper().strip()
+    strike_price = float(data.get('strike_price', data.get('K', 0)))
+    time_to_expiry_days = float(data.get('time_to_expiry', data.get('T', 0)))
+    num_simulations = int(data.get('num_simulations', data.get('numSims', 0)))
+    mode, options, options_error = _pricing_options(data)
+    target_se = _optional_float(data.get('target_se'))
+    time_budget_ms = _optional_float(data.get('time_budget_ms'))
+    target_mode = target_se is not None or time_budget_ms is not None
+    max_sims = int(data.get('max_sims', max_simulations))
+    if (target_mode or options['engine'] != 'monte_carlo') and 'num_simulations' not in data and 'numSims' not in data:
+        num_simulations = MIN_SIMULATIONS
+    
+    debug_log(f"🎯 Processing: {call_or_put} option for {ticker}, strike=${strike_price}, days={time_to_expiry_days}")
+    
+    # Validate required fields
+    if not call_or_put:
+        return None, 'Missing required field: option_type or callOrPut'
+    if not ticker:
+        return None, 'Missing required field: ticker'
+    if strike_price <= 0:
+        return None, 'Missing or invalid required field: strike_price or K'
+    if time_to_expiry_days <= 0:
+        return None, 'Missing or invalid required field: time_to_expiry or T'
+    if num_simulations <= 0:
+        return None, 'Missing or invalid required field: num_simulations or numSims'
+    
+    # Validate input values
+    if time_to_expiry_days > 365:  # Max 1 year (365 days)
+        return None, 'Time to expiry must be between 0 and 365 days'
+    if num_simulations < MIN_SIMULATIONS or num_simulations > max_simulations:
+        return None, f'Number of simulations must be between {MIN_SIMULATIONS:,} and {max_simulations:,}'
+    if call_or_put not in ['call', 'put']:
+        return None, 'Option type must be "call" or "put"'
+    if options_error:
+        return None, options_error
+    use_qmc = options['qmc']
+    if use_qmc and num_simulations > MAX_IN_MEMORY_SIMULATIONS:
+        return None, f'QMC runs are limited to {MAX_IN_MEMORY_SIMULATIONS:,} simulations'
+    if target_se is not None and target_se <= 0:
+        return None, 'target_se must be positive'
+    if time_budget_ms is not None and time_budget_ms <= 0:
+        return None, 'time_budget_ms must be positive'
+    if target_mode and use_qmc:
+        return None, 'target_se and time_budget_ms cannot be combined with QMC'
+    if target_mode and not num_simulations <= max_sims <= max_simulations:
+        return None, f'max_sims must be between num_simulations and {max_simulations:,}'
+    path_points, path_encoding, error = _path_options(data)
+    if error:
+        return None, error
+    
+    return PriceRequest(
+        call_or_put=call_or_put,
+        ticker=ticker,
+        strike_price=strike_price,
+        time_to_expiry_days=time_to_expiry_days,
+        num_simulations=num_simulations,
+        scheme=options['scheme'],
+        mode=mode,
+        engine=options['engine'],
+        # Large runs stream paths so memory stays bounded
+        options=dict(
+            options, streaming=num_simulations > MAX_IN_MEMORY_SIMULATIONS and not use_qmc,
+            target_se=target_se, max_sims=max_sims if target_mode else None, time_budget_ms=time_budget_ms
+        ),
+        path_points=path_points,
+        path_encoding=path_encoding
+    ), None
+
+
+class _StreamClosed(Exception):
+    """Raised into a streamed pricing run once its client has gone away."""
+
+
+def _stream_pricing(price_request, block_size, started, include_timings=False):
+    """
+    Server-Sent Events for a pricing run executed on a background thread.
+
+    Closing the generator (the server does so when the client disconnects) makes
+    the next progress callback raise, which stops the run and cancels its
+    remaining blocks.
+
+    The run collects its own stage timings: the thread executes in a copy of the
+    generator's context, so the pricing stages reach them. The request duration
+    is recorded once the stream ends.
+
+    Args:
+        price_request: Validated PriceRequest
+        block_size: Paths per block, i.e. per progress event
+        started: perf_counter time the request started at
+        include_timings: Add the stage timings to the result event
+    """
+    events = queue.Queue()
+    closed = threading.Event()
+    options = dict(price_request.options, streaming=not price_request.options['qmc'], block_size=block_size)
+
+    def report(result):
+        if closed.is_set():
+            raise _StreamClosed()
+        events.put(('progress', result))
+
+    def run():
+        try:
+            result = price_option_detailed(*price_request.args, workers=PRICING_WORKERS, progress=report, **options)
+            events.put(('result', result))
+        except _StreamClosed:
+            debug_log(f"Client disconnected; stopped pricing {price_request.ticker}")
+        except Exception as e:
+            events.put(('error', e))
+
+    with collect_timings() as timings:
+        timings.started = started
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+        try:
+            yield from _stream_events(events, price_request, timings if include_timings else None)
+        finally:
+            closed.set()
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint='price_option_stream')
+
+
+def _stream_events(events, price_request, timings=None):
+    """Turn a streamed run's queued progress, result and error into Server-Sent Events until it ends."""
+    while True:
+        kind, value = events.get()
+        if kind == 'progress':
+            yield _sse_event('progress', {
+                'us_option_price': value.us_price,
+                'eu_option_price': value.eu_price,
+                'us_price_se': value.us_se,
+                'eu_price_se': value.eu_se,
+                'total_paths': value.num_paths,
+                'converged': value.converged
+            })
+        elif kind == 'result':
+            payload = _price_payload(value, price_request)
+            if timings is not None:
+                payload['timings'] = timings.as_dict()
+            yield _sse_event('result', encode_arrays(payload, price_request.path_encoding))
+            return
+        elif isinstance(value, ValueError):
+            yield _sse_event('error', {'error': f'Invalid input data: {str(value)}'})
+            return
+        else:
+            yield _sse_event('error', {
+                'error': 'Error calculating option price. Please check the ticker symbol and try again.',
+                'details': str(value)
+            })
+            return
+
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event with a JSON data line."""
+    return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+
+
+def _price_payload(result, price_request):
+    """Build the /price_option response body for a PricingResult."""
+    # Get API usage statistics
+    api_stats = get_api_usage_stats()
+    
+    with timed('serialization'):
+        # Sample paths for frontend (limit for performance), picked before any conversion
+        sampled_paths, path_steps = sample_paths(result.paths, MAX_SAMPLE_PATHS, price_request.path_points)
+    
+    return {
+        'us_option_price': result.us_price,
+        'eu_option_price': result.eu_price,
+        'paths': sampled_paths,
+        'path_steps': path_steps,
+        'us_price_std': result.us_std,
+        'eu_price_std': result.eu_std,
+        'us_price_se': result.us_se,
+        'eu_price_se': result.eu_se,
+        'vol': result.volatility,
+        'dividends': result.dividends,
+        'api_usage': api_stats,
+        'ticker': price_request.ticker,
+        'strike_price': price_request.strike_price,
+        'time_to_expiry': price_request.time_to_expiry_days,
+        'option_type': price_request.call_or_put,
+        'scheme': price_request.scheme,
+        'mode': price_request.mode,
+        'engine': price_request.engine,
+        'total_paths': result.num_paths,
+        'converged': result.converged,
+        'policy_reused': result.policy_reused,
+        'greeks': result.greeks,
+        'sampled_paths': len(sampled_paths)
+    }
+
+
+def _json_response(payload, data, path_encoding=None):
+    """
+    Serialize a pricing response, adding the request's stage timings if asked for.
+
+    The body is MessagePack when the client prefers it (and msgpack is installed),
+    otherwise JSON with the payload's arrays in the requested path encoding.
+
+    The timings block covers every stage finished before the body is encoded; the
+    encoding itself is still recorded in the serialization stage metric.
+
+    Args:
+        payload: Response dict, possibly holding numpy arrays (sample paths)
+        data: Request JSON
+        path_encoding: JSON array format (the request's path_encoding field if None)
+    """
+    with timed('serialization'):
+        if _timings_requested(data):
+            payload['timings'] = g.timings.as_dict()
+        if msgpack is not None and request.accept_mimetypes.best_match(
+                ['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE:
+            return Response(pack_msgpack(payload), mimetype=MSGPACK_MIMETYPE)
+        return jsonify(encode_arrays(payload, path_encoding or str(data.get('path_encoding', 'list')).lower()))
+
+
+def _result_etag(result_key, price_request):
+    """
+    ETag of a memoized /price_option result in the representation negotiated for this request.
+
+    Returns:
+        The ETag value, or None if the result is not memoized (no result key)
+    """
+    if result_key is None:
+        return None
+    mimetype = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    representation = (result_key, price_request.path_points, price_request.path_encoding,
+                      mimetype if msgpack is not None else 'application/json')
+    return hashlib.sha256(repr(representation).encode()).hexdigest()[:32]
+
+
+@app.after_request
+def _compress_response(response):
+    """Compress large buffered responses with brotli or gzip, as the client accepts."""
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    body, encoding = compress(response.get_data(), request.accept_encodings)
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _timings_requested(data):
+    """Whether the request asks for per-stage timings (timings field or ?timings=1)."""
+    return bool(data.get('timings') or request.args.get('timings'))
+
+
+def _pricing_options(data):
+    """
+    Parse and validate the pricing options shared by /price_option, /price_ladder and /price_options.
+    
+    Returns:
+        Tuple of (mode, options, error message or None): options holds the scheme, seed, qmc,
+        antithetic, control_variate, lsm_basis, lsm_itm_only, exercise_frequency, richardson,
+        reuse_policy, engine and greeks keyword arguments of the pricing functions
+    """
+    mode = str(data.get('mode', 'full')).lower()
+    seed = data.get('seed')
+    exercise_frequency = data.get('exercise_frequency')
+    options = dict(
+        scheme=str(data.get('scheme', 'euler')).lower(),
+        seed=int(seed) if seed is not None else None,
+        qmc=bool(data.get('qmc', False)),
+        antithetic=bool(data.get('antithetic', False)),
+        control_variate=_control_variate_option(data.get('control_variate', False)),
+        lsm_basis=str(data.get('lsm_basis', 'monomial')).lower(),
+        lsm_itm_only=bool(data.get('lsm_itm_only', True)),
+        exercise_frequency=int(exercise_frequency) if exercise_frequency is not None else None,
+        richardson=bool(data.get('richardson', False)),
+        reuse_policy=bool(data.get('reuse_policy', False)),
+        engine=_engine_option(data, mode),
+        greeks=bool(data.get('greeks', False))
+    )
+    engine = options['engine']
+    if options['scheme'] not in SCHEME_STEPS_PER_YEAR:
+        return mode, options, f'Scheme must be one of {sorted(SCHEME_STEPS_PER_YEAR)}'
+    if mode not in PRICING_MODES:
+        return mode, options, f'mode must be one of {list(PRICING_MODES)}'
+    if engine not in ENGINES:
+        return mode, options, f'engine must be one of {list(ENGINES)}'
+    if mode == 'quick' and engine not in QUICK_ENGINES:
+        return mode, options, f'Quick mode engine must be one of {list(QUICK_ENGINES)}'
+    if options['greeks'] and engine != 'monte_carlo':
+        return mode, options, 'greeks require the monte_carlo engine'
+    if options['qmc'] and options['antithetic']:
+        return mode, options, 'Antithetic sampling cannot be combined with QMC'
+    if options['control_variate'] not in (False, True) + CONTROL_VARIATES:
+        return mode, options, f'control_variate must be a boolean or one of {list(CONTROL_VARIATES)}'
+    if options['lsm_basis'] not in LSM_BASES:
+        return mode, options, f'lsm_basis must be one of {list(LSM_BASES)}'
+    if options['exercise_frequency'] is not None and options['exercise_frequency'] <= 0:
+        return mode, options, 'exercise_frequency must be positive'
+    return mode, options, None
+
+
+def _path_options(data):
+    """
+    Parse the path_points and path_encoding fields.
+
+    Returns:
+        Tuple of (path_points or None, path_encoding, error message or None)
+    """
+    path_points = data.get('path_points')
+    path_points = int(path_points) if path_points is not None else None
+    path_encoding = str(data.get('path_encoding', 'list')).lower()
+    if path_points is not None and path_points < 3:
+        return path_points, path_encoding, 'path_points must be at least 3'
+    if path_encoding not in PATH_ENCODINGS:
+        return path_points, path_encoding, f'path_encoding must be one of {list(PATH_ENCODINGS)}'
+    return path_points, path_encoding, None
+
+
+def _control_variate_option(value):
+    """Parse the control_variate field: a boolean or a control variate name."""
+    return value.lower() if isinstance(value, str) else bool(value)
+
+
+def _engine_option(data, mode):
+    """Parse the engine field; quick mode defaults to the first closed-form engine."""
+    return str(data.get('engine', QUICK_ENGINES[0] if mode == 'quick' else 'monte_carlo')).lower()
+
+
+def _optional_float(value):
+    """Parse an optional numeric request field."""
+    return float(value) if value is not None else None
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Bounded in-process caches for the pricing service.
+Entries are evicted least-recently-used first once the configured size budget is exceeded,
+and can optionally expire after a fixed time to live. Concurrent identical calls can also be
+coalesced into one (SingleFlight).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import record_cache_lookup, record_coalesced_call
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its entries.
+
+    Entry sizes come from sizeof (1 per entry by default), so the same class
+    bounds a cache by entry count or, with e.g. an nbytes-based sizeof, by memory.
+    With ttl_seconds, an entry older than that is a miss and is dropped when looked up
+    (expired entries not looked up again are evicted like any other).
+    """
+
+    def __init__(self, max_size, sizeof=None, name=None, ttl_seconds=None):
+        """
+        Args:
+            max_size: Budget for the summed entry sizes
+            sizeof: Callable returning an entry's size (defaults to 1 per entry)
+            name: Cache name for the hit/miss metrics (not reported if None)
+            ttl_seconds: Lifetime of an entry (entries never expire if None)
+        """
+        self.max_size = max_size
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof or (lambda value: 1)
+        self._entries = OrderedDict()  # key -> (value, size, expiry time on the monotonic clock or None)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._size -= self._entries.pop(key)[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if self.name is not None:
+            record_cache_lookup(self.name, entry is not None)
+        return default if entry is None else entry[0]
+
+    def put(self, key, value):
+        """
+        Store value under key, evicting least recently used entries to fit.
+
+        Values larger than the whole budget are not cached.
+        """
+        size = self._sizeof(value)
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if size > self.max_size:
+                return
+            self._entries[key] = (value, size, expires)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        """Summed size of the cached entries."""
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it runs
+    wait for it and get its result, or its exception raised again. Nothing is kept
+    once the call finishes, so a later call for the key runs afresh (pair with an
+    LRUCache to also reuse finished results).
+    """
+
+    def __init__(self, name=None):
+        """
+        Args:
+            name: Operation name for the executed/shared call metrics (not reported if None)
+        """
+        self.name = name
+        self._calls = {}  # key -> _Call in flight
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), or the result of the call already running for key."""
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if not shared:
+                call = self._calls[key] = _Call()
+        if self.name is not None:
+            record_coalesced_call(self.name, shared)
+
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
+
+
+class _Call:
+    """A call in flight and, once done is set, its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
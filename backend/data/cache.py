@@ -8,6 +8,8 @@ from .providers.alphavantage_provider import AlphaVantageProvider
 from .providers.twelve_provider import TwelveProvider
 from .volatility_estimator import compute_std_of_log_returns
 from .dividend_forecaster import forecast_dividend_schedule
+from caching import LRUCache, SingleFlight
+from metrics import debug_log, record_cache_lookup, timed
 
 # Get configuration from environment variables
 ALPHAVANTAGE_API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
@@ -34,35 +36,56 @@ alphavantage_provider = AlphaVantageProvider(ALPHAVANTAGE_API_KEY)
 cache_config = CacheConfig()
 api_limits = APILimits()
 
+# Lifetime of the in-process copy of a ticker's data; stored data changes at most
+# daily, so this only bounds how late a process picks up another process's refresh
+STOCK_DATA_TTL_SECONDS = int(os.getenv('STOCK_DATA_TTL_SECONDS', 30))
+
+# Recently read ticker data, so repeated requests skip the Supabase read
+stock_data_cache = LRUCache(1024, name='stock_data', ttl_seconds=STOCK_DATA_TTL_SECONDS)
+
+# Concurrent lookups of one ticker share a single fetch (and its provider API calls)
+stock_data_fetches = SingleFlight(name='stock_data')
+
 def get_stock_data(ticker: str) -> TickerData:
-    """Get stock data with caching"""
+    """Get stock data with caching; reads are kept in process for STOCK_DATA_TTL_SECONDS and
+    concurrent calls for the same ticker share one fetch"""
     ticker = ticker.upper()
+    stock_data = stock_data_cache.get(ticker)
+    if stock_data is None:
+        stock_data = stock_data_fetches.do(ticker, _fetch_stock_data, ticker)
+        stock_data_cache.put(ticker, stock_data)
+    return stock_data
+
+def _fetch_stock_data(ticker: str) -> TickerData:
+    """Look up the cached data for a ticker and, if stale, refresh it from the providers and store it back"""
     now = datetime.now()
     
-    print(f"Fetching data for {ticker}...")
+    debug_log(f"Fetching data for {ticker}...")
     
     # Try to fetch from cache
-    cached_data = _get_cached_data(ticker)
+    with timed('cache_lookup'):
+        cached_data = _get_cached_data(ticker)
     if cached_data:
-        print(f"Found cached data for {ticker}")
+        debug_log(f"Found cached data for {ticker}")
     else:
-        print(f"No cached data found for {ticker}, will fetch fresh data")
+        debug_log(f"No cached data found for {ticker}, will fetch fresh data")
     
     # Determine what needs updating
     needs_price_update = _is_price_stale(cached_data, now)
     needs_dividend_update = _is_dividend_stale(cached_data, now)
+    record_cache_lookup('market_data', bool(cached_data) and not needs_price_update and not needs_dividend_update)
     
-    print(f"Price update needed: {needs_price_update}")
-    print(f"Dividend update needed: {needs_dividend_update}")
+    debug_log(f"Price update needed: {needs_price_update}")
+    debug_log(f"Dividend update needed: {needs_dividend_update}")
     
     # Check API limits
     if needs_price_update and api_limits.current_twelve_usage >= api_limits.twelve_data_daily_limit:
         needs_price_update = False
-        print("Price update skipped due to API limit")
+        debug_log("Price update skipped due to API limit")
         
     if needs_dividend_update and api_limits.current_alphavantage_usage >= api_limits.alphavantage_daily_limit:
         needs_dividend_update = False
-        print("Dividend update skipped due to API limit")
+        debug_log("Dividend update skipped due to API limit")
     
     # Get current data (from cache or fresh)
     current_price = cached_data.get("price") if cached_data and cached_data.get("price") is not None else 0.0
@@ -72,12 +95,13 @@ def get_stock_data(ticker: str) -> TickerData:
     # Fetch fresh data if needed
     if needs_price_update:
         try:
-            print(f"Fetching price data for {ticker} from Twelve Data...")
-            prices = twelve_provider.get_closing_prices(ticker)
+            debug_log(f"Fetching price data for {ticker} from Twelve Data...")
+            with timed('provider_fetch'):
+                prices = twelve_provider.get_closing_prices(ticker)
             current_price = prices[-1][1]
             volatility = compute_std_of_log_returns(prices)
             api_limits.current_twelve_usage += 1
-            print(f"Price data fetched: ${current_price:.2f}, Volatility: {volatility:.4f}")
+            debug_log(f"Price data fetched: ${current_price:.2f}, Volatility: {volatility:.4f}")
         except Exception as e:
             print(f"Error fetching price data: {e}")
             if not cached_data:
@@ -85,15 +109,16 @@ def get_stock_data(ticker: str) -> TickerData:
     
     if needs_dividend_update:
         try:
-            print(f"Fetching dividend data for {ticker} from Alpha Vantage...")
-            raw_divs = alphavantage_provider.get_dividend_data(ticker)
+            debug_log(f"Fetching dividend data for {ticker} from Alpha Vantage...")
+            with timed('provider_fetch'):
+                raw_divs = alphavantage_provider.get_dividend_data(ticker)
             dividend_schedule = forecast_dividend_schedule(raw_divs)
             api_limits.current_alphavantage_usage += 1
-            print(f"Dividend data fetched: {len(dividend_schedule.get('schedule', []))} dividends with valid dates")
+            debug_log(f"Dividend data fetched: {len(dividend_schedule.get('schedule', []))} dividends with valid dates")
             if dividend_schedule.get('schedule'):
-                print("Caching dividend schedule:")
+                debug_log("Caching dividend schedule:")
                 for i, (date, amount) in enumerate(dividend_schedule['schedule']):
-                    print(f"  {i+1}. {date}: ${amount:.4f}")
+                    debug_log(f"  {i+1}. {date}: ${amount:.4f}")
         except Exception as e:
             print(f"Error fetching dividend data: {e}")
             if not cached_data:
@@ -103,15 +128,18 @@ def get_stock_data(ticker: str) -> TickerData:
     last_price_update = now.isoformat() if needs_price_update else (cached_data.get("last_price_update") if cached_data else None)
     last_dividend_update = now.isoformat() if needs_dividend_update else (cached_data.get("last_dividend_update") if cached_data else None)
     
-    print(f"Updating cache for {ticker}...")
-    _upsert_stock_data(
-        ticker=ticker,
-        price=float(current_price) if current_price is not None else 0.0,
-        volatility=float(volatility) if volatility is not None else 0.0,
-        dividend_schedule=dividend_schedule if isinstance(dividend_schedule, dict) else {},
-        last_price_update=last_price_update,
-        last_dividend_update=last_dividend_update
-    )
+    # Data read fresh from the cache would be written back unchanged
+    if needs_price_update or needs_dividend_update:
+        debug_log(f"Updating cache for {ticker}...")
+        with timed('cache_write'):
+            _upsert_stock_data(
+                ticker=ticker,
+                price=float(current_price) if current_price is not None else 0.0,
+                volatility=float(volatility) if volatility is not None else 0.0,
+                dividend_schedule=dividend_schedule if isinstance(dividend_schedule, dict) else {},
+                last_price_update=last_price_update,
+                last_dividend_update=last_dividend_update
+            )
     
     return TickerData(
         ticker=ticker,
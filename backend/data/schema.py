@@ -11,6 +11,11 @@ class TickerData:
     last_price_update: Optional[str] = None  # Changed to string for JSON serialization
     last_dividend_update: Optional[str] = None  # Changed to string for JSON serialization
 
+    @property
+    def version(self) -> Tuple:
+        """Identifies this snapshot of the ticker's market data, for caches keyed on it."""
+        return (self.ticker, self.price, self.volatility, self.last_price_update, self.last_dividend_update)
+
 @dataclass
 class CacheConfig:
     price_cache_days: int = 1  # How many days to cache price data
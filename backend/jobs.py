@@ -0,0 +1,162 @@
+"""
+Asynchronous pricing jobs on a bounded local process pool.
+Jobs are submitted and polled by id; finished jobs are kept for a fixed time to live, then forgotten.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from pricing import path_cache, price_option_detailed
+
+# Worker processes, i.e. jobs running at once
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', os.cpu_count() or 1))
+
+# Seconds a finished job's result stays available
+JOB_RESULT_TTL_SECONDS = int(os.environ.get('JOB_RESULT_TTL_SECONDS', 15 * 60))
+
+# Queued plus running jobs accepted before submissions are refused
+MAX_PENDING_JOBS = 64
+
+# Path cache budget of each worker process; jobs rarely repeat a seeded run, so by
+# default workers cache nothing rather than each holding a PATH_CACHE_MAX_BYTES copy
+JOB_PATH_CACHE_MAX_BYTES = int(os.environ.get('JOB_PATH_CACHE_MAX_BYTES', 0))
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the queue already holds its maximum of unfinished jobs."""
+
+
+@dataclass
+class Job:
+    """A submitted job and its future."""
+    id: str
+    future: Future
+    context: Any  # Caller data kept with the job, e.g. the request it was submitted for
+    submitted_at: float  # Unix time
+    finished_at: Optional[float] = None  # Unix time, once the job has completed or failed
+
+    @property
+    def status(self) -> str:
+        """'queued', 'running', 'completed' or 'failed'."""
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.cancelled() or self.future.exception() is not None else 'completed'
+
+
+class JobQueue:
+    """
+    Thread-safe registry of jobs running on a dedicated process pool.
+
+    The pool is created on the first submission and rebuilt if a worker process
+    dies. Finished jobs are dropped JOB_RESULT_TTL_SECONDS after they finish;
+    expired jobs are purged whenever the queue is used.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, ttl_seconds=JOB_RESULT_TTL_SECONDS, max_pending=MAX_PENDING_JOBS,
+                 path_cache_max_bytes=JOB_PATH_CACHE_MAX_BYTES):
+        """
+        Args:
+            workers: Worker processes
+            ttl_seconds: How long finished jobs are kept
+            max_pending: Unfinished jobs accepted before submit raises JobQueueFull
+            path_cache_max_bytes: Path cache budget of each worker process
+        """
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self.path_cache_max_bytes = path_cache_max_bytes
+        self._executor = None
+        self._jobs = {}  # id -> Job, in submission order
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, context=None) -> Job:
+        """
+        Run fn(*args) in a worker process.
+
+        fn and its arguments must be picklable (fn a module-level function).
+
+        Returns:
+            The new Job
+
+        Raises:
+            JobQueueFull: max_pending jobs are already queued or running
+        """
+        with self._lock:
+            self._purge_expired()
+            pending = sum(not job.future.done() for job in self._jobs.values())
+            if pending >= self.max_pending:
+                raise JobQueueFull(f'Too many pending jobs ({pending}); try again later')
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died; jobs already in the broken pool fail, new ones get a fresh pool
+                self._executor = None
+                future = self._get_executor().submit(fn, *args)
+            job = Job(id=uuid.uuid4().hex, future=future, context=context, submitted_at=time.time())
+            self._jobs[job.id] = job
+        future.add_done_callback(lambda _: setattr(job, 'finished_at', time.time()))
+        return job
+
+    def get(self, job_id) -> Optional[Job]:
+        """Return the job with this id, or None if it is unknown or has expired."""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool (cancelling queued jobs) and forget every job."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+            self._jobs.clear()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _get_executor(self):
+        """Create the process pool on first use (caller holds the lock)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.path_cache_max_bytes,))
+        return self._executor
+
+    def _purge_expired(self):
+        """Drop jobs that finished more than ttl_seconds ago (caller holds the lock)."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def _init_worker(path_cache_max_bytes):
+    """Worker process setup: drop any path sets inherited from the parent and apply the worker's budget."""
+    path_cache.clear()
+    path_cache.max_size = path_cache_max_bytes
+
+
+def run_pricing_job(args, options, keep_paths):
+    """
+    Job body: price one option in a worker process.
+
+    The job pool supplies the parallelism, so each job simulates on a single
+    core. Only the leading keep_paths paths are sent back with the result.
+
+    Args:
+        args: Positional arguments for price_option_detailed
+        options: Keyword arguments for price_option_detailed
+        keep_paths: Number of simulated paths to return
+
+    Returns:
+        PricingResult
+    """
+    result = price_option_detailed(*args, **{**options, 'workers': 1})
+    result.paths = result.paths[:keep_paths]
+    return result
@@ -0,0 +1,190 @@
+"""
+Lightweight instrumentation for the pricing service.
+Per-stage timing histograms, simulation and cache counters rendered in the Prometheus text format,
+per-request timing collection, and the debug flag that gates console output.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Console output and progress bars are only shown with PRICER_DEBUG=1
+DEBUG = os.environ.get('PRICER_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# Histogram buckets for durations, in seconds
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def debug_log(*args, **kwargs):
+    """print() that only writes when the debug flag is set."""
+    if DEBUG:
+        print(*args, **kwargs)
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.label_names), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, key)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name, help_text, label_names=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets + ('+Inf',), series[:-2] + [series[-2]]):
+                    labels = _format_labels(self.label_names, key, [('le', bound)])
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.label_names, key)
+                lines.append(f'{self.name}_count{labels} {series[-2]}')
+                lines.append(f'{self.name}_sum{labels} {series[-1]}')
+        return lines
+
+
+STAGE_SECONDS = Histogram('pricer_stage_duration_seconds', 'Time spent in each pricing stage per request', ('stage',))
+REQUEST_SECONDS = Histogram('pricer_request_duration_seconds', 'API request handling time', ('endpoint',))
+SIMULATED_PATHS = Counter('pricer_simulated_paths_total', 'Monte Carlo paths simulated')
+SIMULATED_STEPS = Counter('pricer_simulated_steps_total', 'Path time steps simulated (paths x steps)')
+CACHE_REQUESTS = Counter('pricer_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+COALESCED_CALLS = Counter('pricer_coalesced_calls_total', 'Calls by whether they ran or shared an in-flight call',
+                          ('operation', 'result'))
+
+_REGISTRY = (STAGE_SECONDS, REQUEST_SECONDS, SIMULATED_PATHS, SIMULATED_STEPS, CACHE_REQUESTS, COALESCED_CALLS)
+
+_current_timings = ContextVar('pricer_request_timings', default=None)
+
+
+class RequestTimings:
+    """Stage durations and simulation counts accumulated over one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}  # stage -> seconds, summed over every occurrence
+        self.paths = 0
+        self.steps = 0
+
+    def as_dict(self):
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            'paths': self.paths,
+            'steps': self.steps
+        }
+
+
+@contextmanager
+def collect_timings():
+    """
+    Collect stage timings for the code run inside the block (one request).
+
+    Stage totals are observed into the stage histogram when the block exits, so
+    each request contributes one observation per stage.
+
+    Yields:
+        RequestTimings
+    """
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+        for stage, seconds in timings.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+@contextmanager
+def timed(stage):
+    """
+    Time the block as one occurrence of a pricing stage.
+
+    Inside collect_timings the duration is added to the request's stage total;
+    otherwise it is observed directly.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.stages[stage] = timings.stages.get(stage, 0.0) + elapsed
+        else:
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+
+
+def record_simulation(num_paths, num_steps):
+    """Count simulated paths and time steps."""
+    SIMULATED_PATHS.inc(num_paths)
+    SIMULATED_STEPS.inc(num_paths * num_steps)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.paths += num_paths
+        timings.steps += num_paths * num_steps
+
+
+def record_cache_lookup(cache, hit):
+    """Count a cache hit or miss."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def record_coalesced_call(operation, shared):
+    """Count a call that ran itself or shared another caller's in-flight call."""
+    COALESCED_CALLS.inc(operation=operation, result='shared' if shared else 'executed')
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
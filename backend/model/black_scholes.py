@@ -1,23 +1,37 @@
 """
 Black-Scholes option pricing model implementation.
-Provides both analytical pricing and Monte Carlo simulation for European options.
+Provides analytical pricing, Greeks and implied volatilities, and Monte Carlo simulation for
+European options, and closed-form approximations of American option prices.
 """
 
 import math
 import numpy as np
+from scipy.special import ndtr
+
+from .mc_statistics import mc_estimate
+
+# Newton iterations cap for the Barone-Adesi-Whaley critical price
+BARONE_ADESI_WHALEY_ITERATIONS = 50
+
+# Iterations cap and relative tolerance (on total volatility) of the implied volatility solver
+IMPLIED_VOL_ITERATIONS = 100
+IMPLIED_VOL_TOLERANCE = 1e-12
+
+# Gauss-Legendre rule for the bivariate normal CDF
+_bivariate_nodes, _bivariate_weights = np.polynomial.legendre.leggauss(24)
 
 
 def normal_cdf(x):
     """
-    Cumulative normal distribution function using error function approximation.
+    Cumulative normal distribution function.
     
     Args:
-        x: Input value
+        x: Input value or array of values
         
     Returns:
         Cumulative probability P(X <= x) for standard normal distribution
     """
-    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    return ndtr(x)
 
 
 def black_scholes(call_or_put, stock_price, strike_price, time_to_expiry, volatility, risk_free_rate, dividend_yield=0.0):
@@ -47,7 +61,386 @@ def black_scholes(call_or_put, stock_price, strike_price, time_to_expiry, volati
         raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
 
 
-def price_european_option(call_or_put, paths, strike_price, risk_free_rate, time_to_expiry):
+def black_scholes_prices(call_or_put, stock_price, strike_price, time_to_expiry, volatility, risk_free_rate,
+                         dividend_yield=0.0):
+    """
+    Vectorized Black-Scholes European prices.
+
+    Same formula as black_scholes, with every numeric argument allowed to be an
+    array (broadcast together); time_to_expiry must be positive.
+
+    Returns:
+        np.ndarray of option prices
+    """
+    stock_price = np.asarray(stock_price, dtype=float)
+    sqrt_t = np.sqrt(time_to_expiry)
+    d1 = (np.log(stock_price / strike_price) + (risk_free_rate - dividend_yield + 0.5 * volatility ** 2) * time_to_expiry) / (volatility * sqrt_t)
+    d2 = d1 - volatility * sqrt_t
+    forward_spot = stock_price * np.exp(-dividend_yield * time_to_expiry)
+    discounted_strike = strike_price * np.exp(-risk_free_rate * time_to_expiry)
+
+    if call_or_put == 'call':
+        return forward_spot * ndtr(d1) - discounted_strike * ndtr(d2)
+    elif call_or_put == 'put':
+        return discounted_strike * ndtr(-d2) - forward_spot * ndtr(-d1)
+    else:
+        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+
+
+def black_scholes_greeks(call_or_put, stock_price, strike_price, time_to_expiry, volatility, risk_free_rate,
+                         dividend_yield=0.0):
+    """
+    Vectorized Black-Scholes European prices and analytic Greeks in one pass.
+
+    Every numeric argument may be an array (broadcast together), and so may
+    call_or_put (an array of 'call' / 'put'), so a whole chain or surface is
+    priced at once; time_to_expiry must be positive. Theta is the change in value
+    per year of calendar time (-dV/dT), vega and rho are per unit of volatility
+    and rate.
+
+    Args:
+        As for black_scholes_prices
+
+    Returns:
+        dict of np.ndarray with keys 'price', 'delta', 'gamma', 'vega', 'theta' and 'rho'
+    """
+    sign = np.where(_call_flags(call_or_put), 1.0, -1.0)
+    S, K, T, sigma, r, q, sign = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        stock_price, strike_price, time_to_expiry, volatility, risk_free_rate, dividend_yield, sign)))
+    sqrt_t = np.sqrt(T)
+    total_vol = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / total_vol
+    d2 = d1 - total_vol
+    forward_spot = S * np.exp(-q * T)
+    discounted_strike = K * np.exp(-r * T)
+    spot_prob, strike_prob = ndtr(sign * d1), ndtr(sign * d2)
+    density = forward_spot * np.exp(-0.5 * d1 ** 2) / np.sqrt(2.0 * np.pi)  # S e^{-qT} phi(d1)
+
+    return {
+        'price': sign * (forward_spot * spot_prob - discounted_strike * strike_prob),
+        'delta': sign * np.exp(-q * T) * spot_prob,
+        'gamma': density / (S ** 2 * total_vol),
+        'vega': density * sqrt_t,
+        'theta': (-0.5 * density * sigma / sqrt_t
+                  + sign * (q * forward_spot * spot_prob - r * discounted_strike * strike_prob)),
+        'rho': sign * T * discounted_strike * strike_prob,
+    }
+
+
+def implied_volatility(call_or_put, option_price, stock_price, strike_price, time_to_expiry, risk_free_rate,
+                       dividend_yield=0.0, tolerance=IMPLIED_VOL_TOLERANCE, max_iterations=IMPLIED_VOL_ITERATIONS):
+    """
+    Batched Black-Scholes implied volatility of European option prices.
+
+    Every quote is turned into the out-of-the-money option of its strike by
+    put-call parity (its price carries no intrinsic value to cancel) and solved on
+    the undiscounted forward price, e.g. C(s) = F N(d1) - K N(d2), in total
+    volatility s = sigma sqrt(T). The Corrado-Miller closed form gives the initial guess, and
+    Halley steps (with the analytic vega and volga) refine all quotes at once. Each
+    quote keeps a bracket [lower, upper] around its root, and a step that leaves it
+    falls back to bisection, so the iteration converges even far from the money.
+
+    Args:
+        call_or_put: Option type ('call' or 'put'), or an array of them
+        option_price: Market price or array of market prices
+        stock_price, strike_price, time_to_expiry, risk_free_rate, dividend_yield:
+            As for black_scholes_prices (broadcast against option_price)
+        tolerance: Relative change in total volatility at which a quote has converged
+        max_iterations: Iterations cap
+
+    Returns:
+        np.ndarray of implied volatilities, NaN where the price violates the
+        no-arbitrage bounds
+    """
+    is_call = _call_flags(call_or_put)
+    price, S, K, T, r, q, is_call = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        option_price, stock_price, strike_price, time_to_expiry, risk_free_rate, dividend_yield, is_call)))
+    shape = price.shape
+    price, S, K, T, r, q, is_call = (value.ravel() for value in (price, S, K, T, r, q, is_call))
+    if np.any(T <= 0):
+        raise ValueError("time_to_expiry must be positive")
+    forward = S * np.exp((r - q) * T)
+    quote_sign = np.where(is_call == 1.0, 1.0, -1.0)
+    otm_sign = np.where(K >= forward, 1.0, -1.0)  # Out-of-the-money call (+1) or put (-1)
+    converted = quote_sign != otm_sign
+    target = price * np.exp(r * T) - np.where(converted, quote_sign * (forward - K), 0.0)
+    ceiling = np.where(otm_sign > 0, forward, K)
+    # Parity can round a quote at either no-arbitrage bound back inside it: the time value left after
+    # subtracting the intrinsic value must exceed that rounding, and the upper bound is checked on the quote
+    rounding = np.where(converted, 4.0 * np.finfo(float).eps * (target + forward + K), 0.0)
+    quote_ceiling = np.where(quote_sign > 0, S * np.exp(-q * T), K * np.exp(-r * T))
+    valid = (target > rounding) & (target < ceiling) & (price < quote_ceiling)
+    target = np.where(valid, target, 0.5 * ceiling)  # Placeholder for invalid quotes
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_moneyness = np.log(forward / K)
+        total_vol = _corrado_miller(target + np.maximum(forward - K, 0.0), forward, K)
+        # Fall back to the inflection point of C(s), from which Newton converges monotonically
+        inflection = np.sqrt(2.0 * np.abs(log_moneyness))
+        total_vol = np.where(np.isfinite(total_vol) & (total_vol > 0), total_vol,
+                             np.where(inflection > 0, inflection, np.sqrt(2.0 * np.pi) * target / forward))
+        lower, upper = np.zeros_like(total_vol), np.full_like(total_vol, np.inf)
+        active = valid.copy()
+
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            s = total_vol[active]
+            x, F, strike, goal, sign = (value[active] for value in (log_moneyness, forward, K, target, otm_sign))
+            d1 = x / s + 0.5 * s
+            d2 = d1 - s
+            error = sign * (F * ndtr(sign * d1) - strike * ndtr(sign * d2)) - goal
+            vega = F * np.exp(-0.5 * d1 ** 2) / np.sqrt(2.0 * np.pi)
+            lo = np.where(error < 0, s, lower[active])
+            hi = np.where(error > 0, s, upper[active])
+
+            newton = error / vega
+            halley = 1.0 - 0.5 * newton * d1 * d2 / s  # 1 - f f'' / (2 f'^2), as volga = vega d1 d2 / s
+            step = np.where(halley > 0.5, newton / halley, newton)
+            updated = s - step
+            bisect = np.where(np.isfinite(hi), 0.5 * (lo + hi), 2.0 * s)
+            updated = np.where(np.isfinite(updated) & (updated > lo) & (updated < hi), updated, bisect)
+
+            total_vol[active], lower[active], upper[active] = updated, lo, hi
+            done = (np.abs(updated - s) <= tolerance * s) | (error == 0)
+            active[np.flatnonzero(active)[done]] = False
+
+    return np.where(valid, total_vol / np.sqrt(T), np.nan).reshape(shape)
+
+
+def _corrado_miller(call_price, forward, strike):
+    """Corrado & Miller (1996) approximation of the total volatility of an undiscounted call price."""
+    half_gap = 0.5 * (forward - strike)
+    excess = call_price - half_gap
+    discriminant = np.maximum(excess ** 2 - (forward - strike) ** 2 / np.pi, 0.0)
+    return np.sqrt(2.0 * np.pi) / (forward + strike) * (excess + np.sqrt(discriminant))
+
+
+def _call_flags(call_or_put):
+    """Validate an option type or array of option types; True where it is a call."""
+    types = np.asarray(call_or_put)
+    if not np.all(np.isin(types, ('call', 'put'))):
+        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+    return types == 'call'
+
+
+def barone_adesi_whaley(call_or_put, stock_price, strike_price, time_to_expiry, volatility, risk_free_rate,
+                        dividend_yield=0.0):
+    """
+    Barone-Adesi & Whaley (1987) quadratic approximation of the American option price.
+
+    The early-exercise premium is approximated by a power of S/S*, with the critical
+    price S* found by Newton iterations run on all contracts at once. Every numeric
+    argument may be an array (broadcast together); time_to_expiry must be positive.
+
+    Args:
+        As for black_scholes_prices
+
+    Returns:
+        np.ndarray of option prices
+    """
+    if call_or_put not in ('call', 'put'):
+        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+    S, K, T, sigma, r, q = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        stock_price, strike_price, time_to_expiry, volatility, risk_free_rate, dividend_yield)))
+    european = black_scholes_prices(call_or_put, S, K, T, sigma, r, q)
+    is_call = call_or_put == 'call'
+    b = r - q  # Cost of carry
+    sqrt_t = np.sqrt(T)
+    carry_discount = np.exp((b - r) * T)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        M, N = 2.0 * r / sigma ** 2, 2.0 * b / sigma ** 2
+        sign = 1.0 if is_call else -1.0
+        exponent = 0.5 * (1.0 - N + sign * np.sqrt((N - 1.0) ** 2 + 4.0 * M / -np.expm1(-r * T)))
+        perpetual = 0.5 * (1.0 - N + sign * np.sqrt((N - 1.0) ** 2 + 4.0 * M))
+        critical_infinite = K / (1.0 - 1.0 / perpetual)
+
+        # Seed value for the critical price, then Newton iterations on
+        # S* - K = c(S*) + (1 - e^{(b-r)T} N(d1(S*))) S* / q2 (calls; mirrored for puts)
+        if is_call:
+            critical = K + (critical_infinite - K) * -np.expm1(-(b * T + 2.0 * sigma * sqrt_t) * K / (critical_infinite - K))
+        else:
+            critical = critical_infinite + (K - critical_infinite) * np.exp((b * T - 2.0 * sigma * sqrt_t) * K / (K - critical_infinite))
+        for _ in range(BARONE_ADESI_WHALEY_ITERATIONS):
+            d1 = (np.log(critical / K) + (b + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+            value = black_scholes_prices(call_or_put, critical, K, T, sigma, r, q)
+            delta = carry_discount * ndtr(sign * d1)
+            density = carry_discount * np.exp(-0.5 * d1 ** 2) / np.sqrt(2.0 * np.pi) / (sigma * sqrt_t)
+            if is_call:
+                rhs = value + (1.0 - delta) * critical / exponent
+                slope = delta * (1.0 - 1.0 / exponent) + (1.0 - density) / exponent
+                updated = (K + rhs - slope * critical) / (1.0 - slope)
+            else:
+                rhs = value - (1.0 - delta) * critical / exponent
+                slope = -delta * (1.0 - 1.0 / exponent) - (1.0 + density) / exponent
+                updated = (K - rhs + slope * critical) / (1.0 + slope)
+            converged = np.abs(updated - critical) <= 1e-8 * K
+            critical = updated
+            if np.all(converged | ~np.isfinite(critical)):
+                break
+
+        d1 = (np.log(critical / K) + (b + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        premium = sign * critical / exponent * (1.0 - carry_discount * ndtr(sign * d1))
+        if is_call:
+            american = np.where(S < critical, european + premium * (S / critical) ** exponent, S - K)
+            early_exercise = b < r  # Without dividends an American call is never exercised early
+        else:
+            american = np.where(S > critical, european + premium * (S / critical) ** exponent, K - S)
+            early_exercise = r > 0
+    return np.where(early_exercise & np.isfinite(american), np.maximum(american, european), european)
+
+
+def bjerksund_stensland(call_or_put, stock_price, strike_price, time_to_expiry, volatility, risk_free_rate,
+                        dividend_yield=0.0):
+    """
+    Bjerksund & Stensland (2002) approximation of the American option price.
+
+    The exercise boundary is approximated by two flat segments, which gives a
+    closed-form lower bound on the American price (in terms of the univariate and
+    bivariate normal CDFs). Puts use the put-call transformation
+    P(S, K, T, r, b) = C(K, S, T, r - b, -b). Every numeric argument may be an
+    array (broadcast together); time_to_expiry must be positive.
+
+    Args:
+        As for black_scholes_prices
+
+    Returns:
+        np.ndarray of option prices
+    """
+    if call_or_put not in ('call', 'put'):
+        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+    S, K, T, sigma, r, q = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        stock_price, strike_price, time_to_expiry, volatility, risk_free_rate, dividend_yield)))
+    european = black_scholes_prices(call_or_put, S, K, T, sigma, r, q)
+    b = r - q
+    if call_or_put == 'put':
+        S, K, r, b = K, S, r - b, -b
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        beta = (0.5 - b / sigma ** 2) + np.sqrt((b / sigma ** 2 - 0.5) ** 2 + 2.0 * r / sigma ** 2)
+        boundary_infinite = beta / (beta - 1.0) * K
+        boundary_zero = np.maximum(K, r / (r - b) * K)
+        t1 = 0.5 * (np.sqrt(5.0) - 1.0) * T
+        spread = K ** 2 / ((boundary_infinite - boundary_zero) * boundary_zero)
+        I1 = boundary_zero + (boundary_infinite - boundary_zero) * -np.expm1(-(b * t1 + 2.0 * sigma * np.sqrt(t1)) * spread)
+        I2 = boundary_zero + (boundary_infinite - boundary_zero) * -np.expm1(-(b * T + 2.0 * sigma * np.sqrt(T)) * spread)
+        alpha1 = (I1 - K) * I1 ** -beta
+        alpha2 = (I2 - K) * I2 ** -beta
+
+        # The phi and psi terms of the formula, each evaluated for all its (gamma, H) pairs at once
+        phi = _bjerksund_phi(S, t1, *_stack_terms((beta, I2), (1.0, I2), (1.0, I1), (0.0, I2), (0.0, I1), (beta, I1)),
+                             I2, r, b, sigma)
+        psi = _bjerksund_psi(S, T, *_stack_terms((beta, I1), (1.0, I1), (1.0, K), (0.0, I1), (0.0, K)),
+                             I2, I1, t1, r, b, sigma)
+        call = (alpha2 * S ** beta - alpha2 * phi[0] + phi[1] - phi[2] - K * phi[3] + K * phi[4]
+                + alpha1 * phi[5] - alpha1 * psi[0] + psi[1] - psi[2] - K * psi[3] + K * psi[4])
+        american = np.where(S >= I2, S - K, call)
+    early_exercise = (b < r) & np.isfinite(american)  # Otherwise the (transformed) call is never exercised early
+    return np.where(early_exercise, np.maximum(american, european), european)
+
+
+def _stack_terms(*terms):
+    """Stack (gamma, H) pairs along a new leading axis; H values are contract-shaped arrays."""
+    gammas, barriers = zip(*terms)
+    barriers = np.stack(barriers)
+    zeros = np.zeros_like(barriers[0])
+    return np.stack([gamma + zeros for gamma in gammas]), barriers
+
+
+def _bjerksund_phi(S, T, gamma, H, I, r, b, sigma):
+    """The phi function of Bjerksund & Stensland: a discounted power claim knocked out at I."""
+    lam = (-r + gamma * b + 0.5 * gamma * (gamma - 1.0) * sigma ** 2) * T
+    sqrt_t = sigma * np.sqrt(T)
+    d = -(np.log(S / H) + (b + (gamma - 0.5) * sigma ** 2) * T) / sqrt_t
+    kappa = 2.0 * b / sigma ** 2 + 2.0 * gamma - 1.0
+    return np.exp(lam) * S ** gamma * (ndtr(d) - (I / S) ** kappa * ndtr(d - 2.0 * np.log(I / S) / sqrt_t))
+
+
+def _bjerksund_psi(S, T, gamma, H, I2, I1, t1, r, b, sigma):
+    """The psi function of Bjerksund & Stensland 2002: the two-period analogue of phi."""
+    drift = (b + (gamma - 0.5) * sigma ** 2)
+    root_t1, root_t = sigma * np.sqrt(t1), sigma * np.sqrt(T)
+    e1 = (np.log(S / I1) + drift * t1) / root_t1
+    e2 = (np.log(I2 ** 2 / (S * I1)) + drift * t1) / root_t1
+    e3 = (np.log(S / I1) - drift * t1) / root_t1
+    e4 = (np.log(I2 ** 2 / (S * I1)) - drift * t1) / root_t1
+    f1 = (np.log(S / H) + drift * T) / root_t
+    f2 = (np.log(I2 ** 2 / (S * H)) + drift * T) / root_t
+    f3 = (np.log(I1 ** 2 / (S * H)) + drift * T) / root_t
+    f4 = (np.log(S * I1 ** 2 / (H * I2 ** 2)) + drift * T) / root_t
+    rho = np.sqrt(t1 / T)
+    # The four bivariate probabilities in one call
+    lower_limits = -np.stack([e1, e2, e3, e4])
+    signs = np.array([1.0, 1.0, -1.0, -1.0]).reshape((4,) + (1,) * (lower_limits.ndim - 1))
+    cdf = bivariate_normal_cdf(lower_limits, -np.stack([f1, f2, f3, f4]), signs * rho)
+    lam = -r + gamma * b + 0.5 * gamma * (gamma - 1.0) * sigma ** 2
+    kappa = 2.0 * b / sigma ** 2 + 2.0 * gamma - 1.0
+    return np.exp(lam * T) * S ** gamma * (
+        cdf[0] - (I2 / S) ** kappa * cdf[1] - (I1 / S) ** kappa * cdf[2] + (I1 / I2) ** kappa * cdf[3]
+    )
+
+
+def bivariate_normal_cdf(h, k, rho):
+    """
+    Vectorized standard bivariate normal CDF P(X <= h, Y <= k) with correlation rho.
+
+    Integrates d/drho of the CDF from 0 to rho (Drezner & Wesolowsky, 1990) on a
+    Gauss-Legendre grid in arcsin(rho), accurate to about 1e-10 for |rho| < 0.95.
+    """
+    h, k, rho = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (h, k, rho)))
+    angle = np.arcsin(rho)[..., np.newaxis]
+    theta = 0.5 * angle * (_bivariate_nodes + 1.0)
+    hk = (h * k)[..., np.newaxis]
+    squares = (0.5 * (h ** 2 + k ** 2))[..., np.newaxis]
+    integrand = np.exp((hk * np.sin(theta) - squares) / np.cos(theta) ** 2)
+    return ndtr(h) * ndtr(k) + 0.5 * angle[..., 0] / (2.0 * np.pi) * (integrand @ _bivariate_weights)
+
+
+def european_payoffs(call_or_put, terminal_prices, strike_price):
+    """
+    Undiscounted European payoffs for an array of terminal stock prices.
+
+    Args:
+        call_or_put: Option type ('call' or 'put')
+        terminal_prices: Array of stock prices at expiry
+        strike_price: Option strike price
+
+    Returns:
+        np.ndarray: Payoff per terminal price
+    """
+    if call_or_put == 'call':
+        return np.maximum(0, terminal_prices - strike_price)
+    elif call_or_put == 'put':
+        return np.maximum(0, strike_price - terminal_prices)
+    else:
+        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+
+
+def gbm_terminal_prices(initial_price, risk_free_rate, volatility, time_to_expiry, brownian_terminal):
+    """
+    Terminal prices of geometric Brownian motion driven by given Brownian values W_T.
+
+    Fed with the W_T of simulated Heston paths, these are companion paths whose
+    discounted payoff has the exact Black-Scholes price as its expectation, making
+    them a control variate for the Heston payoffs.
+
+    Args:
+        initial_price: Initial stock price (net of the PV of discrete dividends, if any)
+        risk_free_rate: Risk-free interest rate
+        volatility: Constant annualized volatility
+        time_to_expiry: Time to expiry in years
+        brownian_terminal: Array of terminal Brownian values W_T
+
+    Returns:
+        np.ndarray: Companion terminal prices
+    """
+    drift = (risk_free_rate - 0.5 * volatility ** 2) * time_to_expiry
+    return initial_price * np.exp(drift + volatility * np.asarray(brownian_terminal))
+
+
+def price_european_option(call_or_put, paths, strike_price, risk_free_rate, time_to_expiry, replications=None,
+                          antithetic=False):
     """
     Price European option using Monte Carlo simulation on final path values.
     
@@ -60,25 +453,21 @@ def price_european_option(call_or_put, paths, strike_price, risk_free_rate, time
         strike_price: Option strike price
         risk_free_rate: Risk-free interest rate
         time_to_expiry: Time to expiry in years
+        replications: For randomized QMC paths, the number of independent replications
+            stored as consecutive equal-sized row blocks; the standard error is then
+            taken from the spread of the replication means
+        antithetic: Paths are antithetic pairs (2k, 2k+1)
         
     Returns:
         Tuple of (option_price, standard_error)
     """
-    paths = np.array(paths)
+    paths = np.asarray(paths)
     
     # Calculate payoffs at expiry
-    if call_or_put == 'call':
-        payoffs = np.maximum(0, paths[:, -1] - strike_price)
-    elif call_or_put == 'put':
-        payoffs = np.maximum(0, strike_price - paths[:, -1])
-    else:
-        raise ValueError(f'Invalid option type: {call_or_put}. Must be "call" or "put"')
+    payoffs = european_payoffs(call_or_put, paths[:, -1], strike_price)
     
     # Discount payoffs to present value
     discounted_payoffs = payoffs * np.exp(-risk_free_rate * time_to_expiry)
     
     # Calculate statistics
-    option_price = np.mean(discounted_payoffs)
-    standard_error = np.std(discounted_payoffs, ddof=1) / np.sqrt(len(discounted_payoffs))
-    
-    return option_price, standard_error
\ No newline at end of file
+    return mc_estimate(discounted_payoffs, antithetic=antithetic, replications=replications)
@@ -0,0 +1,83 @@
+"""
+Monte Carlo Greeks from the pricing simulation itself: pathwise delta and vega, and a mixed
+likelihood-ratio / pathwise gamma, evaluated at each path's exercise time.
+"""
+
+import numpy as np
+
+from .heston_model import MIN_PRICE
+
+# Greeks estimated per path, in response order
+GREEKS = ('delta', 'gamma', 'vega')
+
+
+def spot_tangents(paths, dividend_days=None):
+    """
+    Pathwise derivatives dS_t/dS_0 of simulated Heston paths.
+
+    Both discretizations multiply the price by a factor that does not depend on it
+    and cash dividends are subtracted afterwards, so every S_t is affine in S_0 and
+    its tangent is the running product of the factors (S_t + D_t) / S_{t-1}. A path
+    floored at MIN_PRICE on an ex-dividend step no longer moves with S_0.
+
+    Args:
+        paths: (num_sims, num_steps) simulated prices
+        dividend_days: Dividend paid on each time step, as passed to the simulation
+
+    Returns:
+        np.ndarray: Tangents shaped like paths
+    """
+    num_sims, num_steps = paths.shape
+    dividends = np.zeros(num_steps)
+    if dividend_days is not None:
+        count = min(len(dividend_days), num_steps)
+        dividends[1:count] = dividend_days[1:count]  # No dividend is applied at t = 0
+
+    tangents = np.empty_like(paths)
+    tangents[:, 0] = 1.0
+    factors = tangents[:, 1:]
+    np.add(paths[:, 1:], dividends[1:], out=factors)
+    factors /= paths[:, :-1]
+    factors[(paths[:, 1:] <= MIN_PRICE) & (dividends[1:] > 0)] = 0.0
+    np.cumprod(factors, axis=1, out=factors)
+    return tangents
+
+
+def exercise_greeks(call_or_put, paths, exercise_step, discount, spot_tangent, vega_tangent, spot_scores):
+    """
+    Per-path delta, gamma and vega samples of a claim paying its intrinsic value at each path's exercise step.
+
+    The exercise rule is held fixed: the optimal exercise region does not depend on
+    S_0 or on the path's past, and at the boundary exercise and continuation have the
+    same value, so moving it has no first-order effect. The derivative of the
+    payoff +/-(S_tau - K) is then +/- the tangent at tau, which gives pathwise delta
+    and vega (Longstaff-Schwartz consistent for American claims, European ones
+    simply exercise at expiry).
+
+    The delta integrand jumps where the claim starts paying, so gamma differentiates
+    its expectation by the likelihood ratio instead: S_0 enters the density of a path
+    only through the first step, whose score also picks up the explicit 1/S_0 in the
+    first tangent factor. The integrand's mean is used as a baseline for the score
+    term, which has zero mean, to cut the variance.
+
+    Args:
+        call_or_put: Option type ('call' or 'put')
+        paths: (num_sims, num_steps) simulated prices
+        exercise_step: Time step at which each path pays
+        discount: Discount factor to time 0 of each path's payment, 0 where it pays nothing
+        spot_tangent: dS_t/dS_0, shaped like paths
+        vega_tangent: dS_t/dsigma, shaped like paths
+        spot_scores: S_0 * d/dS_0 of the log-density of each path's first step
+
+    Returns:
+        dict mapping each name in GREEKS to per-path samples
+    """
+    rows = np.arange(len(paths))
+    weight = discount if call_or_put == 'call' else -discount
+    delta = weight * spot_tangent[rows, exercise_step]
+    baseline = delta.mean() if len(delta) else 0.0
+    return {
+        'delta': delta,
+        'gamma': ((delta - baseline) * spot_scores - delta) / paths[:, 0],
+        'vega': weight * vega_tangent[rows, exercise_step],
+    }
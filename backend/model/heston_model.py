@@ -3,50 +3,336 @@ Heston stochastic volatility model implementation.
 Generates Monte Carlo paths for option pricing with stochastic volatility.
 """
 
+from functools import lru_cache
+
 import numpy as np
-import tqdm
+from scipy.special import ndtr, ndtri
+from scipy.stats import qmc
 
 # Trading days per year
 TRADING_DAYS_PER_YEAR = 252
 
-def get_brownian_motion(dt, size):
+# Lower bounds applied during the Euler discretization
+VARIANCE_FLOOR = 0.01
+MIN_PRICE = 0.01
+
+# Andersen's switching threshold between the quadratic and exponential QE branches
+QE_PSI_THRESHOLD = 1.5
+
+# Paths simulated per block; fixes the random-stream layout for streaming and parallel runs
+DEFAULT_BLOCK_SIZE = 2500
+
+
+def make_rng(seed=None, bit_generator='pcg64'):
+    """
+    Create a NumPy random Generator for path simulation.
+
+    Args:
+        seed: Integer seed, SeedSequence, or an existing Generator (returned unchanged)
+        bit_generator: 'pcg64' (default) or 'philox'
+
+    Returns:
+        np.random.Generator
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if bit_generator == 'pcg64':
+        return np.random.Generator(np.random.PCG64(seed))
+    if bit_generator == 'philox':
+        return np.random.Generator(np.random.Philox(seed))
+    raise ValueError(f"Invalid bit_generator: {bit_generator}. Must be 'pcg64' or 'philox'")
+
+
+def cholesky_2x2(correlation):
+    """
+    Cholesky factor of the 2x2 correlation matrix [[1, rho], [rho, 1]].
+
+    Args:
+        correlation: Correlation coefficient rho
+
+    Returns:
+        np.ndarray: Lower triangular factor [[1, 0], [rho, sqrt(1 - rho^2)]]
+    """
+    if not -1.0 <= correlation <= 1.0:
+        raise ValueError(f"Correlation must be between -1 and 1, got {correlation}")
+    return np.array([[1.0, 0.0], [correlation, np.sqrt(1.0 - correlation ** 2)]])
+
+
+def get_brownian_motion(dt, size, rng=None):
     '''
     Generate increments of a Wiener process.
     Args:
         dt (float): Time step.
         size (int): Number of increments.
+        rng: Optional np.random.Generator or seed
     Returns:
         np.ndarray: Array of Wiener process increments.
     '''
-    return np.random.normal(0, np.sqrt(dt), size)
+    return make_rng(rng).normal(0, np.sqrt(dt), size)
+
 
-def generate_correlated_brownians(dt, size, correlation):
+def generate_correlated_brownians(dt, size, correlation, rng=None):
     """
     Generate correlated Wiener process increments for asset price and volatility.
-    
+
     Args:
         dt: Time step size
         size: Number of increments (num_sims, num_steps)
         correlation: Correlation coefficient between asset and volatility processes
-        
+        rng: Optional np.random.Generator or seed
+
     Returns:
         Tuple of (asset_brownian, volatility_brownian) increments
     """
-    corr_matrix = np.array([[1.0, correlation], [correlation, 1.0]])
-    brownian_increments = np.random.multivariate_normal(
-        np.array([0, 0]), cov=corr_matrix, size=size
-    ) * np.sqrt(dt)
-    return brownian_increments[:, :, 0], brownian_increments[:, :, 1]
+    rng = make_rng(rng)
+    chol = cholesky_2x2(float(correlation))
+    size = (size,) if np.isscalar(size) else tuple(size)
+    normals = rng.standard_normal((2,) + size)
+    sqrt_dt = np.sqrt(dt)
+    asset_brownian = normals[0] * sqrt_dt
+    vol_brownian = (chol[1, 0] * normals[0] + chol[1, 1] * normals[1]) * sqrt_dt
+    return asset_brownian, vol_brownian
+
+
+def num_time_steps(time_to_expiry, steps_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Number of grid points (including t=0) used to simulate a path to expiry.
+
+    Args:
+        time_to_expiry: Time to expiry in years
+        steps_per_year: Grid resolution (252 = daily, 52 = weekly)
+
+    Returns:
+        int: Number of time points, at least 2
+    """
+    return max(int(time_to_expiry * steps_per_year), 2)
+
+
+def _make_euler_step(num_sims, dt, risk_free_rate, mean_reversion_rate, vol_of_vol,
+                     long_term_variance, correlation):
+    """
+    Build an in-place Euler step with the historical variance floor.
+
+    The returned function advances prices and variance by one time step from a pair
+    of independent standard normals, writing into preallocated buffers. If a
+    brownian accumulator is passed, the step's asset Brownian increment is added to it.
+    Tangents and the spot score are described in _simulate_into.
+    """
+    sqrt_dt = np.sqrt(dt)
+    chol = cholesky_2x2(float(correlation))
+    rho, rho_bar = chol[1]
+    work = np.empty((2, num_sims))
 
-def generate_paths(num_sims, initial_price, risk_free_rate, initial_volatility, 
-                  time_to_expiry, mean_reversion_rate, vol_of_vol, long_term_variance, 
-                  correlation, dividend_days=None):
+    # Risk-neutral drift: mu = risk-free rate (no dividend yield adjustment for discrete dividends)
+    growth = 1.0 + risk_free_rate * dt
+    variance_decay = 1.0 - mean_reversion_rate * dt
+    variance_pull = mean_reversion_rate * long_term_variance * dt
+    pull_tangent = mean_reversion_rate * dt * 2.0 * np.sqrt(long_term_variance)  # d(variance_pull)/dsigma
+
+    def step(prev_prices, prices, variance, asset_normals, vol_normals, brownian=None, tangents=None,
+             spot_score=None):
+        current_vol, scratch = work
+
+        if brownian is not None:
+            np.multiply(asset_normals, sqrt_dt, out=scratch)
+            brownian += scratch
+
+        # Correlate the variance shock with the asset shock: z_v = rho*z_s + sqrt(1-rho^2)*z_v
+        vol_normals *= chol[1, 1]
+        np.multiply(asset_normals, chol[1, 0], out=scratch)
+        vol_normals += scratch
+
+        np.maximum(variance, VARIANCE_FLOOR, out=current_vol)
+        np.sqrt(current_vol, out=current_vol)  # Ensure positive volatility
+
+        if spot_score is not None:
+            # Given the variance shock w, z = rho*w + rho_bar*u and the new price is normal
+            # with mean S*(growth + vol*rho*w*sqrt_dt) and standard deviation S*vol*rho_bar*sqrt_dt
+            independent = (asset_normals - rho * vol_normals) / rho_bar
+            conditional_growth = growth + current_vol * rho * sqrt_dt * vol_normals
+            spot_score[:] = independent ** 2 - 1.0 + independent * conditional_growth / (current_vol * rho_bar * sqrt_dt)
+
+        # Asset price evolution (risk-neutral SDE): S_t = S_{t-1} * (1 + r*dt + vol*dW)
+        np.multiply(current_vol, asset_normals, out=scratch)
+        scratch *= sqrt_dt
+        scratch += growth
+        np.multiply(prev_prices, scratch, out=prices)
+
+        if tangents is not None:
+            prev_vega, vega, variance_tangent = tangents
+            vol_tangent = np.where(variance > VARIANCE_FLOOR, 0.5 * variance_tangent / current_vol, 0.0)
+            np.multiply(prev_vega, scratch, out=vega)
+            vega += prev_prices * vol_tangent * asset_normals * sqrt_dt
+            variance_tangent *= variance_decay
+            variance_tangent += pull_tangent
+            variance_tangent += vol_of_vol * sqrt_dt * vol_normals * vol_tangent
+
+        # Variance evolution (Heston volatility process)
+        np.multiply(current_vol, vol_normals, out=scratch)
+        scratch *= vol_of_vol * sqrt_dt
+        variance *= variance_decay
+        variance += variance_pull
+        variance += scratch
+
+        # Ensure variance stays positive
+        np.maximum(variance, VARIANCE_FLOOR, out=variance)
+        if tangents is not None:
+            variance_tangent[variance <= VARIANCE_FLOOR] = 0.0
+
+    return step
+
+
+def _make_qe_step(num_sims, dt, risk_free_rate, mean_reversion_rate, vol_of_vol,
+                  long_term_variance, correlation, psi_threshold=QE_PSI_THRESHOLD):
+    """
+    Build an in-place Andersen (2008) quadratic-exponential step.
+
+    Variance is sampled from the moment-matched quadratic or exponential law, and
+    log-prices use the central (gamma1 = gamma2 = 1/2) discretization with the
+    martingale correction, so E[S_t] = S_0 * exp(r*t) holds on any grid between
+    dividends. The asset normal is the independent component: correlation enters
+    through the K1/K2 terms rather than a Cholesky factor, so the Brownian handed to
+    a brownian accumulator is rho*Z_v + sqrt(1 - rho^2)*Z. Tangents differentiate
+    each branch's moment-matched sample; see _simulate_into.
+    """
+    kappa, theta, xi, rho = mean_reversion_rate, long_term_variance, vol_of_vol, correlation
+    sqrt_dt = np.sqrt(dt)
+    rho_bar = np.sqrt(1.0 - rho ** 2)
+    decay = np.exp(-kappa * dt)
+    mean_pull = theta * (1.0 - decay)
+    var_coef = xi ** 2 * decay * (1.0 - decay) / kappa
+    var_const = theta * xi ** 2 * (1.0 - decay) ** 2 / (2.0 * kappa)
+
+    # K1 cancels against the martingale-corrected K0*, so only K2..K4 are needed
+    k2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+    k3 = 0.5 * dt * (1.0 - rho ** 2)
+    k4 = k3
+    exponent = k2 + 0.5 * k4  # A in Andersen's notation
+
+    # Derivatives of the theta-dependent terms for a parallel shift of sqrt(theta)
+    theta_tangent = 2.0 * np.sqrt(theta)
+    mean_pull_tangent = (1.0 - decay) * theta_tangent
+    var_const_tangent = xi ** 2 * (1.0 - decay) ** 2 / (2.0 * kappa) * theta_tangent
+
+    work = np.empty((5, num_sims))
+
+    def step(prev_prices, prices, variance, asset_normals, vol_normals, brownian=None, tangents=None,
+             spot_score=None):
+        # drift holds K0* (martingale-corrected) per path before the log-price terms are added
+        mean, psi, next_variance, drift, scratch = work
+
+        if brownian is not None:
+            np.multiply(vol_normals, rho * sqrt_dt, out=scratch)
+            brownian += scratch
+            np.multiply(asset_normals, rho_bar * sqrt_dt, out=scratch)
+            brownian += scratch
+
+        # Conditional mean and variance of v_{t+dt}
+        np.multiply(variance, decay, out=mean)
+        mean += mean_pull
+        np.multiply(variance, var_coef, out=psi)
+        psi += var_const
+        psi /= mean * mean
+
+        if tangents is not None:
+            prev_vega, vega, variance_tangent = tangents
+            mean_tangent = decay * variance_tangent + mean_pull_tangent
+            psi_tangent = (var_coef * variance_tangent + var_const_tangent) / (mean * mean) - 2.0 * psi * mean_tangent / mean
+            next_tangent, drift_tangent = np.zeros((2, len(variance)))
+
+        quadratic = psi <= psi_threshold
+        if quadratic.any():
+            inv_psi = 2.0 / psi[quadratic]
+            root = np.sqrt(inv_psi) * np.sqrt(inv_psi - 1.0)
+            b2 = inv_psi - 1.0 + root
+            a = mean[quadratic] / (1.0 + b2)
+            shifted = np.sqrt(b2) + vol_normals[quadratic]
+            next_variance[quadratic] = a * shifted ** 2
+            one_minus = 1.0 - 2.0 * exponent * a
+            drift[quadratic] = -exponent * b2 * a / one_minus + 0.5 * np.log(one_minus)
+            if tangents is not None:
+                inv_psi_tangent = -inv_psi * psi_tangent[quadratic] / psi[quadratic]
+                b2_tangent = inv_psi_tangent * (1.0 + (inv_psi - 0.5) / root)
+                a_tangent = (mean_tangent[quadratic] - a * b2_tangent) / (1.0 + b2)
+                next_tangent[quadratic] = a_tangent * shifted ** 2 + a * shifted * b2_tangent / np.sqrt(b2)
+                one_minus_tangent = -2.0 * exponent * a_tangent
+                drift_tangent[quadratic] = (
+                    -exponent * (b2_tangent * a + b2 * a_tangent) / one_minus
+                    + exponent * b2 * a * one_minus_tangent / one_minus ** 2
+                    + 0.5 * one_minus_tangent / one_minus
+                )
+
+        exponential = ~quadratic
+        if exponential.any():
+            psi_e = psi[exponential]
+            p = (psi_e - 1.0) / (psi_e + 1.0)
+            beta = (1.0 - p) / mean[exponential]
+            # 1 - U computed as Phi(-z) keeps precision in the upper tail
+            survival = ndtr(-vol_normals[exponential])
+            next_variance[exponential] = np.where(
+                survival >= 1.0 - p, 0.0, np.log((1.0 - p) / np.maximum(survival, 1e-300)) / beta
+            )
+            gap = beta - exponent
+            drift[exponential] = -np.log(p + beta * (1.0 - p) / gap)
+            if tangents is not None:
+                p_tangent = 2.0 * psi_tangent[exponential] / (psi_e + 1.0) ** 2
+                beta_tangent = (-p_tangent - beta * mean_tangent[exponential]) / mean[exponential]
+                sampled = next_variance[exponential]
+                next_tangent[exponential] = np.where(
+                    sampled > 0.0, (-p_tangent / (1.0 - p) - sampled * beta_tangent) / beta, 0.0
+                )
+                mixture_tangent = (p_tangent + (beta_tangent * (1.0 - p) - beta * p_tangent) / gap
+                                   - beta * (1.0 - p) * beta_tangent / gap ** 2)
+                drift_tangent[exponential] = -mixture_tangent / (p + beta * (1.0 - p) / gap)
+
+        # ln S' = ln S + r*dt + K0* + K1*v + K2*v' + sqrt(K3*v + K4*v') * Z
+        drift += risk_free_rate * dt - 0.5 * k3 * variance
+        np.multiply(next_variance, k2, out=scratch)
+        drift += scratch
+        np.multiply(variance, k3, out=scratch)
+        scratch += k4 * next_variance
+        np.sqrt(scratch, out=scratch)
+        if spot_score is not None:
+            # Given both variances the log-price is normal with standard deviation scratch
+            np.divide(asset_normals, scratch, out=spot_score)
+        if tangents is not None:
+            drift_tangent += k2 * next_tangent - 0.5 * k3 * variance_tangent
+            diffusion_tangent = asset_normals * (k3 * variance_tangent + k4 * next_tangent)
+            drift_tangent += np.divide(diffusion_tangent, 2.0 * scratch, out=np.zeros_like(scratch), where=scratch > 0)
+        scratch *= asset_normals
+        drift += scratch
+        np.exp(drift, out=drift)
+        np.multiply(prev_prices, drift, out=prices)
+
+        if tangents is not None:
+            np.multiply(prev_vega, drift, out=vega)
+            vega += prices * drift_tangent
+            variance_tangent[:] = next_tangent
+        variance[:] = next_variance
+
+    return step
+
+
+_STEP_BUILDERS = {
+    'euler': _make_euler_step,
+    'qe': _make_qe_step,
+}
+
+
+def generate_paths(num_sims, initial_price, risk_free_rate, initial_volatility,
+                  time_to_expiry, mean_reversion_rate, vol_of_vol, long_term_variance,
+                  correlation, dividend_days=None, rng=None, scheme='euler',
+                  steps_per_year=TRADING_DAYS_PER_YEAR, antithetic=False, return_brownian=False,
+                  return_sensitivities=False):
     """
     Generate Monte Carlo paths using Heston stochastic volatility model.
-    
+
     Implements risk-neutral pricing with discrete dividend adjustments and stochastic volatility.
     The Heston model allows volatility to follow its own stochastic process.
-    
+
+    Normals are drawn one time step at a time from a numpy Generator into reusable
+    buffers, so the only allocation that scales with num_steps is the returned path matrix.
+
     Args:
         num_sims: Number of simulation paths
         initial_price: Initial stock price
@@ -57,51 +343,317 @@ def generate_paths(num_sims, initial_price, risk_free_rate, initial_volatility,
         vol_of_vol: Volatility of volatility parameter
         long_term_variance: Long-term variance level (theta)
         correlation: Correlation between asset and volatility processes
-        dividend_days: Dividend payments on each trading day (discrete payments)
-        
+        dividend_days: Dividend payments on each time step (discrete payments)
+        rng: Optional np.random.Generator or seed (fresh entropy if None)
+        scheme: 'euler' (floored Euler, needs a daily grid) or 'qe' (Andersen
+            quadratic-exponential, accurate on weekly or coarser grids)
+        steps_per_year: Time grid resolution; dividend_days must use the same grid
+        antithetic: Simulate antithetic pairs (paths 2k and 2k+1 use negated normals);
+            num_sims must be even
+        return_brownian: Also return each path's terminal asset Brownian W_T, which
+            drives a Black-Scholes-consistent companion path for control variates
+        return_sensitivities: Also return the volatility tangents dS_t/dsigma (shaped
+            like price_paths) and the first-step spot scores; see _simulate_into
+
     Returns:
-        Tuple of (time_points, price_paths)
+        Tuple of (time_points, price_paths), plus brownian_terminal if return_brownian,
+        plus (vega_tangents, spot_scores) if return_sensitivities
     """
-    num_steps = int(time_to_expiry * TRADING_DAYS_PER_YEAR)
+    if scheme not in _STEP_BUILDERS:
+        raise ValueError(f"Invalid scheme: {scheme}. Must be one of {sorted(_STEP_BUILDERS)}")
+
+    rng = make_rng(rng)
+    num_steps = num_time_steps(time_to_expiry, steps_per_year)
     time_points = np.linspace(0, time_to_expiry, num_steps)
     dt = time_points[1]
-    
-    # Initialize paths and volatility
-    paths = np.full((num_sims, num_steps), float(initial_price))
-    variance = np.full(num_sims, float(initial_volatility ** 2))
-    
-    # Generate correlated Brownian motions
-    asset_brownian, vol_brownian = generate_correlated_brownians(
-        dt, (num_sims, num_steps - 1), float(correlation)
+
+    # Paths are stored time-major so each step writes one contiguous row;
+    # the transpose handed back is a (num_sims, num_steps) view.
+    paths = np.empty((num_steps, num_sims))
+    step = _STEP_BUILDERS[scheme](
+        num_sims, dt, risk_free_rate, mean_reversion_rate, vol_of_vol,
+        long_term_variance, float(correlation)
     )
-    
-    # Risk-neutral drift: mu = risk-free rate (no dividend yield adjustment for discrete dividends)
-    risk_neutral_drift = risk_free_rate
-    
-    # Generate paths
-    for t in tqdm.trange(1, num_steps, desc="Generating paths"):
-        current_prices = paths[:, t - 1]
-        current_vol = np.sqrt(np.maximum(variance, 0.01))  # Ensure positive volatility
-        
-        # Asset price evolution (risk-neutral SDE)
-        drift_term = risk_neutral_drift * current_prices * dt
-        diffusion_term = current_vol * current_prices * asset_brownian[:, t - 1]
-        paths[:, t] = current_prices + drift_term + diffusion_term
-        
-        # Variance evolution (Heston volatility process)
-        variance_drift = mean_reversion_rate * (long_term_variance - variance) * dt
-        variance_diffusion = vol_of_vol * current_vol * vol_brownian[:, t - 1]
-        variance += variance_drift + variance_diffusion
-        
-        # Ensure variance stays positive
-        variance = np.maximum(variance, 0.01)
-        
+    brownian = np.empty(num_sims) if return_brownian else None
+    sensitivities = (np.empty_like(paths), np.empty(num_sims)) if return_sensitivities else None
+    _simulate_into(paths, initial_price, initial_volatility, step, rng, dividend_days,
+                   antithetic=antithetic, brownian=brownian, sensitivities=sensitivities)
+
+    results = (time_points, paths.T)
+    if return_brownian:
+        results += (brownian,)
+    if return_sensitivities:
+        results += (sensitivities[0].T, sensitivities[1])
+    return results
+
+
+def _simulate_into(paths, initial_price, initial_volatility, step, rng, dividend_days,
+                   qmc_normals=None, antithetic=False, brownian=None, sensitivities=None):
+    """
+    Fill a time-major (num_steps, num_sims) buffer with simulated prices.
+
+    Args:
+        paths: Output buffer, overwritten in place
+        initial_price: Initial stock price
+        initial_volatility: Initial volatility
+        step: In-place step function from one of the _STEP_BUILDERS
+        rng: np.random.Generator driving the simulation (unused with qmc_normals)
+        dividend_days: Dividend payments on each time step (or None)
+        qmc_normals: Optional precomputed (num_steps - 1, 2, num_sims) normals
+        antithetic: Pair path 2k+1 with path 2k using negated normals
+        brownian: Optional (num_sims,) buffer that receives the terminal asset Brownian W_T
+        sensitivities: Optional (vega_tangents, spot_scores) buffers, shaped like paths and
+            (num_sims,). vega_tangents receives the pathwise derivatives dS_t/dsigma for a
+            parallel shift sigma of the initial volatility and of sqrt(long-term variance),
+            propagated through each step with its normals held fixed. spot_scores receives
+            S_0 * d/dS_0 of the log-density of the first step, the only place S_0 enters
+            the density of a path, for likelihood-ratio estimators.
+    """
+    num_steps, num_sims = paths.shape
+    if antithetic and num_sims % 2:
+        raise ValueError("Antithetic sampling needs an even number of paths")
+    paths[0] = float(initial_price)
+    variance = np.full(num_sims, float(initial_volatility ** 2))
+    normals = np.empty((2, num_sims))
+    half_normals = np.empty((2, num_sims // 2)) if antithetic else None
+    if brownian is not None:
+        brownian[...] = 0.0
+    vega_tangents, spot_scores = sensitivities if sensitivities is not None else (None, None)
+    if sensitivities is not None:
+        vega_tangents[0] = 0.0
+        variance_tangent = np.full(num_sims, 2.0 * float(initial_volatility))
+
+    for t in range(1, num_steps):
+        if qmc_normals is not None:
+            normals[...] = qmc_normals[t - 1]  # Steps modify their normals in place
+        elif antithetic:
+            rng.standard_normal(out=half_normals)
+            normals[:, 0::2] = half_normals
+            np.negative(half_normals, out=normals[:, 1::2])
+        else:
+            rng.standard_normal(out=normals)
+        tangents = (vega_tangents[t - 1], vega_tangents[t], variance_tangent) if sensitivities is not None else None
+        step(paths[t - 1], paths[t], variance, normals[0], normals[1], brownian, tangents,
+             spot_scores if t == 1 else None)
+
         # Apply discrete dividend if any on this day
         # The stock price drops by the dividend amount on the ex-dividend date
         if dividend_days is not None and t < len(dividend_days) and dividend_days[t] > 0:
-            dividend_amount = dividend_days[t]
-            # Subtract the dividend amount from the stock price
-            paths[:, t] = np.maximum(paths[:, t] - dividend_amount, 0.01)
-    
-    return time_points, paths
-    
\ No newline at end of file
+            paths[t] -= dividend_days[t]
+            if sensitivities is not None:
+                vega_tangents[t][paths[t] < MIN_PRICE] = 0.0  # Floored prices no longer move with sigma
+            np.maximum(paths[t], MIN_PRICE, out=paths[t])
+
+
+def split_into_blocks(num_sims, block_size, seed=None):
+    """
+    Split a simulation into fixed-size blocks, each with its own random stream.
+
+    Block i always covers the same path indices and draws from the i-th
+    SeedSequence child of seed, so a block's paths depend only on (seed, i)
+    and not on how or where the blocks are executed.
+
+    Args:
+        num_sims: Total number of simulation paths
+        block_size: Paths per block (the last block may be smaller)
+        seed: Integer seed or SeedSequence (fresh entropy if None)
+
+    Returns:
+        List of (block_num_sims, SeedSequence) tuples
+    """
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    num_blocks = -(-num_sims // block_size)
+    sizes = [min(block_size, num_sims - i * block_size) for i in range(num_blocks)]
+    return list(zip(sizes, seed_seq.spawn(num_blocks)))
+
+
+def iter_path_blocks(num_sims, initial_price, risk_free_rate, initial_volatility,
+                     time_to_expiry, mean_reversion_rate, vol_of_vol, long_term_variance,
+                     correlation, dividend_days=None, seed=None, scheme='euler',
+                     steps_per_year=TRADING_DAYS_PER_YEAR, block_size=DEFAULT_BLOCK_SIZE,
+                     antithetic=False, return_brownian=False, return_sensitivities=False):
+    """
+    Stream Heston paths in fixed-size blocks instead of one num_sims x num_steps matrix.
+
+    Peak memory is O(block_size * num_steps) regardless of num_sims. Each yielded
+    block is a (block_num_sims, num_steps) view into a buffer that is overwritten
+    by the next block, so copy anything that must outlive the iteration.
+
+    Args:
+        num_sims: Total number of simulation paths
+        initial_price .. dividend_days: As in generate_paths
+        seed: Integer seed or SeedSequence; see split_into_blocks
+        scheme: 'euler' or 'qe'
+        steps_per_year: Time grid resolution
+        block_size: Paths per block (must be even with antithetic)
+        antithetic: Simulate antithetic pairs, as in generate_paths
+        return_brownian: Also yield each block's terminal asset Brownians
+        return_sensitivities: Also yield each block's vega tangents and spot scores, as in generate_paths
+
+    Yields:
+        np.ndarray: Price paths for one block, or a tuple of the paths, brownian_terminal
+        (if return_brownian) and vega_tangents, spot_scores (if return_sensitivities)
+    """
+    if scheme not in _STEP_BUILDERS:
+        raise ValueError(f"Invalid scheme: {scheme}. Must be one of {sorted(_STEP_BUILDERS)}")
+
+    num_steps = num_time_steps(time_to_expiry, steps_per_year)
+    dt = time_to_expiry / (num_steps - 1)
+    buffer = np.empty((num_steps, min(block_size, num_sims)))
+    brownian_buffer = np.empty(buffer.shape[1]) if return_brownian else None
+    sensitivity_buffers = (np.empty_like(buffer), np.empty(buffer.shape[1])) if return_sensitivities else None
+    steps = {}
+
+    for block_num_sims, block_seed in split_into_blocks(num_sims, block_size, seed):
+        if block_num_sims not in steps:
+            steps[block_num_sims] = _STEP_BUILDERS[scheme](
+                block_num_sims, dt, risk_free_rate, mean_reversion_rate, vol_of_vol,
+                long_term_variance, float(correlation)
+            )
+        block = buffer[:, :block_num_sims]
+        brownian = brownian_buffer[:block_num_sims] if return_brownian else None
+        sensitivities = None
+        if return_sensitivities:
+            sensitivities = (sensitivity_buffers[0][:, :block_num_sims], sensitivity_buffers[1][:block_num_sims])
+        _simulate_into(block, initial_price, initial_volatility, steps[block_num_sims],
+                       make_rng(block_seed), dividend_days, antithetic=antithetic, brownian=brownian,
+                       sensitivities=sensitivities)
+        results = (block.T,)
+        if return_brownian:
+            results += (brownian,)
+        if return_sensitivities:
+            results += (sensitivities[0].T, sensitivities[1])
+        yield results if len(results) > 1 else block.T
+
+
+@lru_cache(maxsize=32)
+def _brownian_bridge_plan(num_increments):
+    """
+    Order in which a Brownian bridge fills the grid points 1..num_increments.
+
+    The terminal point comes first, then midpoints breadth-first, so the leading
+    (best distributed) QMC dimensions drive the coarse shape of each path.
+
+    Returns:
+        Tuple of (target, left, right, left_weight, right_weight, std) per normal
+    """
+    plan = [(num_increments, 0, 0, 0.0, 0.0, np.sqrt(num_increments))]
+    intervals = [(0, num_increments)]
+    while intervals:
+        next_intervals = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            mid = (left + right) // 2
+            plan.append((
+                mid, left, right,
+                (right - mid) / (right - left),
+                (mid - left) / (right - left),
+                np.sqrt((mid - left) * (right - mid) / (right - left)),
+            ))
+            next_intervals.extend([(left, mid), (mid, right)])
+        intervals = next_intervals
+    return tuple(plan)
+
+
+def brownian_bridge_increments(normals):
+    """
+    Turn standard normals in bridge order into standard normal path increments.
+
+    Args:
+        normals: (num_sims, num_increments) array; column k feeds the k-th bridge point
+
+    Returns:
+        np.ndarray: (num_sims, num_increments) unit-variance increments W_t - W_{t-1}
+    """
+    num_sims, num_increments = normals.shape
+    brownian = np.zeros((num_increments + 1, num_sims))
+    for k, (target, left, right, left_weight, right_weight, std) in enumerate(_brownian_bridge_plan(num_increments)):
+        brownian[target] = std * normals[:, k]
+        if left_weight:
+            brownian[target] += left_weight * brownian[left]
+        if right_weight:
+            brownian[target] += right_weight * brownian[right]
+    return np.diff(brownian, axis=0).T
+
+
+def sobol_bridge_normals(num_sims, num_increments, rng=None):
+    """
+    Scrambled Sobol normals for the asset and variance Brownians via Brownian bridges.
+
+    Sobol dimensions are interleaved between the two Brownians so both get the
+    low, well-distributed dimensions for their terminal and midpoint values.
+
+    Args:
+        num_sims: Number of points (a power of 2 keeps Sobol balance properties)
+        num_increments: Time steps per path
+        rng: np.random.Generator or seed used for the Owen scrambling
+
+    Returns:
+        np.ndarray: (num_increments, 2, num_sims) independent normal increments
+    """
+    sampler = qmc.Sobol(d=2 * num_increments, scramble=True, seed=make_rng(rng))
+    uniforms = sampler.random(num_sims)
+    tiny = np.finfo(float).eps
+    normals = ndtri(np.clip(uniforms, tiny, 1.0 - tiny))
+    asset = brownian_bridge_increments(normals[:, 0::2])
+    variance = brownian_bridge_increments(normals[:, 1::2])
+    return np.stack([asset.T, variance.T], axis=1)
+
+
+def generate_qmc_paths(num_sims, initial_price, risk_free_rate, initial_volatility,
+                       time_to_expiry, mean_reversion_rate, vol_of_vol, long_term_variance,
+                       correlation, dividend_days=None, seed=None, scheme='euler',
+                       steps_per_year=TRADING_DAYS_PER_YEAR, replications=1, return_brownian=False,
+                       return_sensitivities=False):
+    """
+    Generate Heston paths driven by scrambled Sobol points (randomized QMC).
+
+    Each replication uses an independently scrambled Sobol sequence, so the
+    replication means are i.i.d. and their spread gives a valid error estimate.
+
+    Args:
+        num_sims: Paths per replication (a power of 2 is recommended)
+        initial_price .. dividend_days: As in generate_paths
+        seed: Integer seed or SeedSequence for the scrambles (fresh entropy if None)
+        scheme: 'euler' or 'qe'
+        steps_per_year: Time grid resolution
+        replications: Number of independent scrambles
+        return_brownian: Also return each path's terminal asset Brownian W_T
+        return_sensitivities: Also return the vega tangents and spot scores, as in generate_paths
+
+    Returns:
+        Tuple of (time_points, price_paths), plus brownian_terminal if return_brownian,
+        plus (vega_tangents, spot_scores) if return_sensitivities;
+        replication r occupies rows r*num_sims to (r+1)*num_sims - 1
+    """
+    if scheme not in _STEP_BUILDERS:
+        raise ValueError(f"Invalid scheme: {scheme}. Must be one of {sorted(_STEP_BUILDERS)}")
+
+    num_steps = num_time_steps(time_to_expiry, steps_per_year)
+    time_points = np.linspace(0, time_to_expiry, num_steps)
+    dt = time_points[1]
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    paths = np.empty((num_steps, replications * num_sims))
+    brownian = np.empty(replications * num_sims) if return_brownian else None
+    sensitivities = (np.empty_like(paths), np.empty(replications * num_sims)) if return_sensitivities else None
+    step = _STEP_BUILDERS[scheme](
+        num_sims, dt, risk_free_rate, mean_reversion_rate, vol_of_vol,
+        long_term_variance, float(correlation)
+    )
+    for r, scramble_seed in enumerate(seed_seq.spawn(replications)):
+        normals = sobol_bridge_normals(num_sims, num_steps - 1, rng=scramble_seed)
+        rows = slice(r * num_sims, (r + 1) * num_sims)
+        _simulate_into(paths[:, rows], initial_price, initial_volatility, step, None, dividend_days,
+                       qmc_normals=normals, brownian=brownian[rows] if return_brownian else None,
+                       sensitivities=(sensitivities[0][:, rows], sensitivities[1][rows]) if return_sensitivities else None)
+
+    results = (time_points, paths.T)
+    if return_brownian:
+        results += (brownian,)
+    if return_sensitivities:
+        results += (sensitivities[0].T, sensitivities[1])
+    return results
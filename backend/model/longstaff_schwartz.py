@@ -1,66 +1,269 @@
 import numpy as np
 import tqdm
-import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Optional
+
+from .black_scholes import black_scholes_prices
+
+# Regression bases for the continuation value: monomials or weighted Laguerre
+# polynomials in S/K, or monomials plus the Black-Scholes European value
+LSM_BASES = ('monomial', 'laguerre', 'european')
+
+
+@dataclass
+class ExercisePolicy:
+    """
+    Fitted Longstaff-Schwartz exercise rule: the regression coefficients of every exercise step.
+
+    Applied with apply_exercise_policy, it prices new paths on the same time grid
+    without any regression.
+    """
+    option_type: str
+    K: float
+    r: float
+    T: float
+    num_steps: int  # Time steps of the paths it was fitted on
+    basis: str
+    degree: int
+    volatility: Optional[float]  # Black-Scholes volatility for the 'european' basis
+    steps: np.ndarray  # Exercise steps, ascending
+    coefficients: np.ndarray  # Coefficients per exercise step (rows of NaN where nothing was in the money)
+
+    @property
+    def nbytes(self) -> int:
+        return self.steps.nbytes + self.coefficients.nbytes
+
 
 # https://www.youtube.com/watch?v=--Il6rgtVjM
 # https://people.math.ethz.ch/~hjfurrer/teaching/LongstaffSchwartzAmericanOptionsLeastSquareMonteCarlo.pdf
-def longstaff_schwartz(S, K, r, T, option_type='call', dividend_present_val=None):
+def longstaff_schwartz_cashflows(S, K, r, T, option_type='call', dividend_present_val=None, progress=False,
+                                 basis='monomial', degree=2, itm_only=True, volatility=None,
+                                 exercise_steps=None, return_stopping_times=False, return_policy=False):
     """
-    Longstaff-Schwartz American option pricing method for call or put options.
-    
+    Per-path cashflows of the Longstaff-Schwartz exercise policy, discounted to time 0.
+
+    The exercise rule is fitted on the given paths, so the mean of the returned
+    values is the Longstaff-Schwartz price of that path set. Continuation values
+    are regressed on a basis in the moneyness S/K (with cashflows also in units of
+    K), which keeps the small normal equations well conditioned at any price level.
+
+    The backward induction keeps only each path's cashflow, discounted to the
+    current step, and its exercise step; intrinsic values are computed one time
+    step at a time. Working memory is O(num_sims) on top of the paths themselves.
+
+    With exercise_steps the option is Bermudan: exercise is only considered (and
+    regressions only run) on those time steps, plus expiry.
+
     Args:
     S (np.ndarray): Price matrix, where each row represents a price path.
     K (float): Strike price of the option.
     r (float): Risk-free interest rate.
     T (float): Time to maturity.
     option_type (str): 'call' for call option or 'put' for put option.
-    dividend_present_val (np.ndarray): Discounted payoff of future dividends per path.
-    
+    dividend_present_val (np.ndarray): Discounted payoff of future dividends per path
+        (one value per path, or one per path and time step).
+    progress (bool): Show a progress bar over the backward induction.
+    basis (str): Regression basis, one of LSM_BASES.
+    degree (int): Polynomial degree of the basis.
+    itm_only (bool): Regress on in-the-money paths only (as in the original paper) rather than all paths.
+    volatility (float): Black-Scholes volatility for the 'european' basis.
+    exercise_steps (array-like): Time steps on which early exercise is allowed (every step if None).
+    return_stopping_times (bool): Also return each path's exercise step.
+    return_policy (bool): Also return the fitted ExercisePolicy.
+
     Returns:
-    tuple: Option price and standard error.
+    np.ndarray: Discounted cashflow of each path, followed with return_stopping_times by
+        the time step at which each path is exercised (num_steps - 1 if it is held to
+        expiry, including when it expires worthless) and with return_policy by the
+        ExercisePolicy.
     """
-
+    if option_type not in ('put', 'call'):
+        raise ValueError("Invalid option_type. Use 'put' or 'call'.")
+    if basis not in LSM_BASES:
+        raise ValueError(f"basis must be one of {list(LSM_BASES)}")
+    if basis == 'european' and volatility is None:
+        raise ValueError("The 'european' basis needs a volatility")
     num_sims, num_steps = S.shape
     dt = T / num_steps  # Time interval
     df = np.exp(-r * dt) # Discount factor per time interval
 
-    if option_type == 'put':
-        exercise_value = np.maximum(K - S, 0) # Intrinsic values for put option
-    elif option_type == 'call':
-        exercise_value = S - K # Intrinsic values for call option
-        if dividend_present_val is not None and isinstance(dividend_present_val, np.ndarray):
-            if dividend_present_val.ndim == 1:
-                exercise_value = exercise_value + dividend_present_val[:, np.newaxis]
-            else:
-                exercise_value = exercise_value + dividend_present_val
-        exercise_value = np.maximum(exercise_value, 0)
-    else:
-        raise ValueError("Invalid option_type. Use 'put' or 'call'.")
+    exercise_value = np.empty(num_sims)
+
+    # Cashflow of each path under the policy, discounted to the current time step
+    cashflow = _intrinsic_values(S, num_steps - 1, K, option_type, dividend_present_val, exercise_value).copy() # No continuation value on final day, it equals exercise value
+    stopping_step = np.full(num_sims, num_steps - 1)
+
+    continuation = _make_continuation_estimator(num_sims, basis, degree)
+    european = None
 
-    cashflow = np.zeros_like(exercise_value)
-    cashflow[:, -1] = exercise_value[:, -1] # No continuation value on final day, it equals exercise value
+    if exercise_steps is None:
+        exercise_steps = np.arange(num_steps - 1)
+    else:
+        exercise_steps = np.unique(exercise_steps)
+        exercise_steps = exercise_steps[(exercise_steps >= 0) & (exercise_steps < num_steps - 1)]
+    coefficients = np.full((len(exercise_steps), continuation.num_basis), np.nan)
 
-    for t in tqdm.trange(num_steps - 2, -1, -1):
-        itm = exercise_value[:, t] > 0 # Matrix set to true where price is in the money
+    previous = num_steps - 1
+    for i in (tqdm.trange if progress else range)(len(exercise_steps) - 1, -1, -1):
+        t = exercise_steps[i]
+        cashflow *= df ** (previous - t)  # Discount the future cashflows back to this time step
+        previous = t
+        _intrinsic_values(S, t, K, option_type, dividend_present_val, exercise_value)
+        itm = exercise_value > 0 # Set to true where price is in the money
+        rows = itm if itm_only else slice(None)
         
-        if np.count_nonzero(itm) > 0:
-            regression = np.polyfit(S[itm, t], cashflow[itm, t + 1] * df, 2) # Fit a polynomial to the prices vs their cashflows using least squares method
-            continuation_value = np.polyval(regression, S[itm, t]) # Use polynomial to estimate the continuation value
-        else:
-            continuation_value = np.zeros(np.count_nonzero(itm))  # Fix: use correct shape for empty array
+        if np.count_nonzero(itm) == 0:
+            continue
+        if basis == 'european':
+            european = black_scholes_prices(option_type, S[rows, t], K, T - t * dt, volatility, r) / K
+        # Least-squares estimate of the discounted future cashflows from the current prices
+        fitted, coefficients[i] = continuation(S[rows, t] / K, cashflow[rows] / K, european)
+        continuation_value = K * fitted
+        if not itm_only:
+            continuation_value = continuation_value[itm]
         
         # Exercise holds whether it is optimal exercise for each path on this timestep
-        exercise = np.zeros(len(itm), dtype=bool) 
-        exercise[itm] = exercise_value[itm, t] > continuation_value
+        exercise = np.flatnonzero(itm)[exercise_value[itm] > continuation_value]
+        cashflow[exercise] = exercise_value[exercise]  # Exercising replaces the path's later cashflow
+        stopping_step[exercise] = t
+
+    if previous > 0:
+        cashflow *= df ** previous  # Back to time 0 when the first exercise date is later
+
+    results = (cashflow,)
+    if return_stopping_times:
+        results += (stopping_step,)
+    if return_policy:
+        results += (ExercisePolicy(option_type, K, r, T, num_steps, basis, degree, volatility,
+                                   exercise_steps, coefficients),)
+    return results if len(results) > 1 else cashflow
+
+
+def apply_exercise_policy(S, policy, dividend_present_val=None, return_stopping_times=False):
+    """
+    Per-path discounted cashflows of a fitted exercise policy on new paths, in one forward pass.
+
+    Each path is exercised at the first exercise step where its intrinsic value
+    beats the policy's continuation estimate. No regression is run, and because
+    the policy was fitted on other paths the mean is a low-biased (out-of-sample)
+    estimate of the American price, complementing the high-biased in-sample fit.
+
+    Args:
+    S (np.ndarray): Price matrix on the policy's time grid, where each row represents a price path.
+    policy (ExercisePolicy): Policy from longstaff_schwartz_cashflows(..., return_policy=True).
+    dividend_present_val (np.ndarray): Discounted payoff of future dividends per path, as for fitting.
+    return_stopping_times (bool): Also return each path's exercise step.
+
+    Returns:
+    np.ndarray: Discounted cashflow of each path (and the exercise steps with return_stopping_times).
+    """
+    num_sims, num_steps = S.shape
+    if num_steps != policy.num_steps:
+        raise ValueError(f"Paths have {num_steps} time steps but the policy was fitted on {policy.num_steps}")
+    K = policy.K
+    dt = policy.T / num_steps  # Time interval, as in the fit
+    df = np.exp(-policy.r * dt)
+
+    exercise_value = np.empty(num_sims)
+    cashflow = np.zeros(num_sims)
+    stopping_step = np.full(num_sims, num_steps - 1)
+    alive = np.ones(num_sims, dtype=bool)
+    design = np.empty((num_sims, policy.coefficients.shape[1]))
+    european = None
+
+    for t, coefficients in zip(policy.steps, policy.coefficients):
+        if np.isnan(coefficients[0]):
+            continue  # Nothing was in the money here when fitting, so no path exercised
+        _intrinsic_values(S, t, K, policy.option_type, dividend_present_val, exercise_value)
+        candidates = np.flatnonzero(alive & (exercise_value > 0))
+        if len(candidates) == 0:
+            continue
+        moneyness = S[candidates, t] / K
+        if policy.basis == 'european':
+            european = black_scholes_prices(policy.option_type, S[candidates, t], K, policy.T - t * dt,
+                                            policy.volatility, policy.r) / K
+        X = design[:len(candidates)]
+        _fill_basis(policy.basis, moneyness, X, policy.degree, european)
+        exercise = candidates[exercise_value[candidates] > K * (X @ coefficients)]
+        cashflow[exercise] = exercise_value[exercise] * df ** t
+        stopping_step[exercise] = t
+        alive[exercise] = False
+
+    # Paths never exercised early are held to expiry
+    _intrinsic_values(S, num_steps - 1, K, policy.option_type, dividend_present_val, exercise_value)
+    cashflow[alive] = exercise_value[alive] * df ** (num_steps - 1)
+
+    if return_stopping_times:
+        return cashflow, stopping_step
+    return cashflow
+
+
+def _intrinsic_values(S, t, K, option_type, dividend_present_val, out):
+    """Intrinsic values of every path at time step t, written into out."""
+    if option_type == 'put':
+        np.subtract(K, S[:, t], out=out)
+    else:
+        np.subtract(S[:, t], K, out=out)
+        if isinstance(dividend_present_val, np.ndarray):
+            np.add(out, dividend_present_val if dividend_present_val.ndim == 1 else dividend_present_val[:, t], out=out)
+    return np.maximum(out, 0, out=out)
+
+
+def bermudan_exercise_steps(num_steps, stride, required_steps=()):
+    """
+    Exercise time steps of a Bermudan grid: every stride-th step from 0, plus required_steps.
+
+    Args:
+    num_steps (int): Number of time steps of the paths (the last one is expiry).
+    stride (int): Time steps between regular exercise dates.
+    required_steps (array-like): Steps that are always exercise dates, e.g. the
+        last step before each ex-dividend date.
+
+    Returns:
+    np.ndarray: Sorted exercise steps before expiry.
+    """
+    if stride < 1:
+        raise ValueError("stride must be at least 1")
+    steps = np.concatenate([np.arange(0, num_steps - 1, stride), np.asarray(required_steps, dtype=int)])
+    return np.unique(steps[(steps >= 0) & (steps < num_steps - 1)])
+
+
+def _make_continuation_estimator(num_sims, basis, degree):
+    """
+    Build a least-squares continuation-value regression with a preallocated design matrix.
+
+    The returned function fits targets on the basis evaluated at the given
+    moneyness by solving the small normal equations, and returns the fitted values
+    and the coefficients.
+    """
+    num_basis = degree + (2 if basis == 'european' else 1)
+    design = np.empty((num_sims, num_basis))
+
+    def estimate(moneyness, targets, european=None):
+        X = design[:len(moneyness)]
+        _fill_basis(basis, moneyness, X, degree, european)
+        gram = X.T @ X
+        rhs = X.T @ targets
+        # lstsq on the small system also copes with degenerate designs (e.g. t = 0, where all paths share S0)
+        coefficients = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+        return X @ coefficients, coefficients
 
-        cashflow[exercise, t] = exercise_value[exercise, t]  # Cashflow is now the exercise value for paths where we exercised
-        cashflow[exercise, t + 1 :] = 0  # Set future cash flows, for that path, equal to zero as we would have already exercised
-        discount_path = cashflow[:, t] == 0  # Paths where we didn't exercise
-        cashflow[discount_path, t] = cashflow[discount_path, t + 1] * df  # Discount cashflow for paths we didn't exercise
+    estimate.num_basis = num_basis
+    return estimate
 
-    # Expectation of the initial discounted cashflow
-    option_price = np.mean(cashflow[:, 0])
-    std_dev = np.std(cashflow[:, 0])
-    se = std_dev / np.sqrt(len(cashflow[:, 0]))
-    return option_price, se
 
+def _fill_basis(basis, moneyness, out, degree, european=None):
+    """Write the basis functions of moneyness into the columns of out."""
+    if basis == 'laguerre':
+        # Weighted Laguerre polynomials exp(-x/2) L_n(x) via the three-term recurrence
+        np.exp(-0.5 * moneyness, out=out[:, 0])
+        if degree >= 1:
+            np.multiply(out[:, 0], 1.0 - moneyness, out=out[:, 1])
+        for n in range(1, degree):
+            out[:, n + 1] = ((2 * n + 1 - moneyness) * out[:, n] - n * out[:, n - 1]) / (n + 1)
+        return
+    out[:, 0] = 1.0
+    for n in range(1, degree + 1):
+        np.multiply(out[:, n - 1], moneyness, out=out[:, n])
+    if basis == 'european':
+        out[:, degree + 1] = european
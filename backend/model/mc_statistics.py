@@ -0,0 +1,219 @@
+"""
+Online statistics for Monte Carlo estimators.
+Accumulates sample mean and variance batch by batch so results never need every sample in memory.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class RunningMoments:
+    """
+    Running count, mean and sum of squared deviations (Welford / Chan et al.).
+
+    Batches are reduced with NumPy and merged with the pairwise update of
+    Chan, Golub & LeVeque, which stays numerically stable for large counts.
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0  # Sum of squared deviations from the mean
+
+    def update(self, values):
+        """
+        Merge a batch of samples into the running moments.
+
+        Args:
+            values: Array of samples
+
+        Returns:
+            self, for chaining
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        batch_mean = float(values.mean())
+        batch_m2 = float(np.square(values - batch_mean).sum())
+        return self.merge(RunningMoments(values.size, batch_mean, batch_m2))
+
+    def merge(self, other):
+        """
+        Merge another set of moments into this one in place.
+
+        Args:
+            other: RunningMoments computed over a disjoint set of samples
+
+        Returns:
+            self, for chaining
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            # Copy exactly so a single merged batch is bit-identical to the batch itself
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Population standard deviation (ddof=0)."""
+        return float(np.sqrt(self.m2 / self.count)) if self.count > 0 else 0.0
+
+    @property
+    def standard_error(self):
+        """Standard error of the mean."""
+        return float(np.sqrt(self.variance / self.count)) if self.count > 1 else 0.0
+
+
+def replication_estimate(samples, replications):
+    """
+    Estimate a mean and its standard error from equally sized independent replications.
+
+    Used for randomized QMC, where samples within a replication are correlated
+    and only the replication means are i.i.d.
+
+    Args:
+        samples: 1-D array whose consecutive equal-length chunks are the replications
+        replications: Number of replications
+
+    Returns:
+        Tuple of (mean, standard_error)
+    """
+    samples = np.asarray(samples, dtype=float)
+    if replications < 2 or samples.size % replications:
+        raise ValueError("Need at least 2 equally sized replications")
+    replication_means = samples.reshape(replications, -1).mean(axis=1)
+    return float(replication_means.mean()), float(replication_means.std(ddof=1) / np.sqrt(replications))
+
+
+@dataclass
+class RunningCovariance:
+    """
+    Running mean vector and co-moment matrix of multivariate samples.
+
+    Column 0 holds the quantity being estimated; further columns hold control
+    variates. Batches merge with the same pairwise update as RunningMoments.
+    """
+    count: int = 0
+    mean: np.ndarray = None
+    comoment: np.ndarray = None  # Sum of outer products of deviations from the mean
+
+    def update(self, values):
+        """
+        Merge a batch of samples into the running statistics.
+
+        Args:
+            values: (n, k) array of samples, or (n,) for a single column
+
+        Returns:
+            self, for chaining
+        """
+        values = np.asarray(values, dtype=float)
+        values = values.reshape(len(values), -1)
+        if len(values) == 0:
+            return self
+        batch_mean = values.mean(axis=0)
+        deviations = values - batch_mean
+        return self.merge(RunningCovariance(len(values), batch_mean, deviations.T @ deviations))
+
+    def merge(self, other):
+        """
+        Merge another RunningCovariance over disjoint samples into this one in place.
+
+        Args:
+            other: RunningCovariance with the same number of columns
+
+        Returns:
+            self, for chaining
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.comoment = other.count, other.mean.copy(), other.comoment.copy()
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / total
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.count * other.count / total
+        self.count = total
+        return self
+
+    def estimate(self, control_mean=None):
+        """
+        Mean of column 0 and its standard error, optionally control-variate adjusted.
+
+        Args:
+            control_mean: Known expectation of column 1, or None for the plain mean
+
+        Returns:
+            Tuple of (mean, standard_error)
+        """
+        if self.count < 2:
+            return (float(self.mean[0]) if self.count else 0.0), 0.0
+        target_m2 = self.comoment[0, 0]
+        mean = self.mean[0]
+        if control_mean is not None and self.comoment[1, 1] > 0:
+            beta = self.comoment[0, 1] / self.comoment[1, 1]
+            mean = mean - beta * (self.mean[1] - control_mean)
+            target_m2 = max(target_m2 - beta * self.comoment[0, 1], 0.0)
+        return float(mean), float(np.sqrt(target_m2 / (self.count - 1) / self.count))
+
+
+def pair_average(samples):
+    """
+    Average antithetic pairs stored as consecutive samples (2k, 2k+1).
+
+    Args:
+        samples: 1-D array of even length
+
+    Returns:
+        np.ndarray: One value per pair
+    """
+    samples = np.asarray(samples, dtype=float)
+    return samples.reshape(-1, 2).mean(axis=1)
+
+
+def mc_estimate(samples, antithetic=False, replications=None, control=None, control_mean=None):
+    """
+    Monte Carlo mean and standard error with optional variance reduction.
+
+    Antithetic pairs are averaged first, then the control variate is applied with
+    the variance-minimizing beta = Cov(X, C) / Var(C) estimated from the same run,
+    and finally the error is taken across replications if any.
+
+    Args:
+        samples: 1-D array of per-path estimates (e.g. discounted payoffs)
+        antithetic: Samples are antithetic pairs (2k, 2k+1)
+        replications: Number of randomized-QMC replications stored as equal consecutive chunks
+        control: Per-path control variate values aligned with samples
+        control_mean: Known expectation of the control variate
+
+    Returns:
+        Tuple of (mean, standard_error)
+    """
+    samples = np.asarray(samples, dtype=float)
+    if antithetic:
+        samples = pair_average(samples)
+        control = pair_average(control) if control is not None else None
+    if control is not None and control_mean is not None:
+        control = np.asarray(control, dtype=float)
+        control_var = np.var(control)
+        if control_var > 0:
+            beta = np.mean((samples - samples.mean()) * (control - control.mean())) / control_var
+            samples = samples - beta * (control - control_mean)
+    if replications:
+        return replication_estimate(samples, replications)
+    if len(samples) < 2:
+        return float(samples.mean()), 0.0
+    return float(samples.mean()), float(np.std(samples, ddof=1) / np.sqrt(len(samples)))
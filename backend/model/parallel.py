@@ -0,0 +1,138 @@
+"""
+Multi-core Monte Carlo execution over fixed path blocks.
+Blocks are seeded from SeedSequence children, so results for a given seed do not depend on the worker count.
+"""
+
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .heston_model import DEFAULT_BLOCK_SIZE, generate_paths, iter_path_blocks, make_rng, split_into_blocks
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers):
+    """
+    Return the shared process pool, growing it if more workers are requested.
+
+    Args:
+        workers: Minimum number of worker processes
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers < workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+        return _executor
+
+
+@dataclass
+class BlockResult:
+    """Per-block output of simulate_blocks."""
+    paths: Optional[np.ndarray]  # Leading paths kept in full, or None
+    brownian: Optional[np.ndarray]  # Terminal asset Brownians of the kept paths, if generated
+    sensitivities: Optional[tuple]  # (vega_tangents, spot_scores) of the kept paths, if generated
+
+
+def _reduce_block(paths, brownian, keep, sensitivities=None):
+    """Reduce one simulated block to a BlockResult holding its leading keep paths."""
+    if keep <= 0:
+        return BlockResult(None, None, None)
+    return BlockResult(
+        paths=np.array(paths[:keep]),
+        brownian=np.array(brownian[:keep]) if brownian is not None else None,
+        sensitivities=tuple(np.array(values[:keep]) for values in sensitivities) if sensitivities is not None else None,
+    )
+
+
+def _simulate_block(task):
+    """
+    Worker entry point: simulate one block.
+
+    Args:
+        task: Tuple of (block_num_sims, block_seed, path_kwargs, keep, return_brownian, return_sensitivities)
+
+    Returns:
+        BlockResult
+    """
+    block_num_sims, block_seed, path_kwargs, keep, return_brownian, return_sensitivities = task
+    _, paths, *extras = generate_paths(**dict(path_kwargs, num_sims=block_num_sims), rng=make_rng(block_seed),
+                                       return_brownian=return_brownian, return_sensitivities=return_sensitivities)
+    brownian = extras.pop(0) if return_brownian else None
+    return _reduce_block(paths, brownian, keep, tuple(extras) if return_sensitivities else None)
+
+
+def simulate_blocks(path_kwargs, seed=None, block_size=DEFAULT_BLOCK_SIZE, workers=1, keep_paths=None,
+                    return_brownian=False, return_sensitivities=False):
+    """
+    Simulate path blocks.
+
+    With workers > 1 blocks run on a process pool; otherwise they are streamed
+    through a reused buffer in this process. Either way block i draws from the
+    i-th SeedSequence child and results come back in block order, so merging
+    them gives bit-identical output for a given seed and block_size.
+
+    Blocks are produced lazily: the pool keeps at most two blocks per worker in
+    flight, and closing the generator early cancels the blocks not yet started.
+
+    Args:
+        path_kwargs: Keyword arguments for generate_paths (including num_sims and
+            optionally antithetic)
+        seed: Integer seed or SeedSequence (fresh entropy if None)
+        block_size: Paths per block
+        workers: Number of worker processes
+        keep_paths: Number of leading paths to return in full (all if None)
+        return_brownian: Return the kept paths' terminal asset Brownians
+        return_sensitivities: Return the kept paths' vega tangents and spot scores (see
+            generate_paths), for Greek estimators
+
+    Yields:
+        BlockResult per block, in block order
+    """
+    num_sims = path_kwargs['num_sims']
+    keep_paths = num_sims if keep_paths is None else keep_paths
+    num_blocks = -(-num_sims // block_size)
+    keeps = [int(np.clip(keep_paths - i * block_size, 0, block_size)) for i in range(num_blocks)]
+
+    if workers > 1 and num_blocks > 1:
+        blocks = split_into_blocks(num_sims, block_size, seed)
+        sim_kwargs = {k: v for k, v in path_kwargs.items() if k != 'num_sims'}
+        tasks = [(n, block_seed, sim_kwargs, keep, return_brownian, return_sensitivities)
+                 for (n, block_seed), keep in zip(blocks, keeps)]
+        yield from _run_in_order(get_executor(workers), tasks, 2 * workers)
+        return
+
+    # iter_path_blocks spawns the same SeedSequence children as split_into_blocks
+    blocks = iter_path_blocks(**path_kwargs, seed=seed, block_size=block_size, return_brownian=True,
+                              return_sensitivities=return_sensitivities)
+    for (block, brownian, *sensitivities), keep in zip(blocks, keeps):
+        yield _reduce_block(block, brownian if return_brownian else None, keep,
+                            tuple(sensitivities) if return_sensitivities else None)
+
+
+def _run_in_order(executor, tasks, max_in_flight):
+    """Yield _simulate_block results in task order with a bounded number of pending tasks."""
+    tasks = iter(tasks)
+    pending = deque(executor.submit(_simulate_block, task) for task in itertools.islice(tasks, max_in_flight))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for task in itertools.islice(tasks, 1):
+                pending.append(executor.submit(_simulate_block, task))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
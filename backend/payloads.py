@@ -0,0 +1,173 @@
+"""
+Compact response payloads for the pricing API.
+Sample paths can be downsampled along the time axis (LTTB) and sent as base64 float32 or MessagePack,
+and large bodies are compressed with brotli or gzip.
+"""
+
+import base64
+import gzip
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    # MessagePack responses are only offered when msgpack is installed
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    # Without brotli, responses fall back to gzip
+    brotli = None
+
+# JSON formats for sample paths: nested lists, or base64 little-endian binary
+PATH_ENCODINGS = ('list', 'float32')
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESSED_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def lttb_indices(series, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling of each row of series.
+
+    The first and last samples are kept; the samples in between are split into
+    points - 2 equal buckets, and from each bucket the sample forming the largest
+    triangle with the previously kept sample and the next bucket's average is
+    kept. Every row is processed at once, one bucket at a time.
+
+    Args:
+        series: (rows, length) values on a uniform axis
+        points: Samples to keep per row (at least 3)
+
+    Returns:
+        np.ndarray: (rows, points) increasing indices into each row, or None if no
+        downsampling is needed (points >= length)
+    """
+    rows, length = series.shape
+    if points >= length:
+        return None
+    edges = np.floor(np.arange(points - 1) * (length - 2) / (points - 2)).astype(int) + 1
+    edges[-1] = length - 1
+    indices = np.empty((rows, points), dtype=int)
+    indices[:, 0], indices[:, -1] = 0, length - 1
+    row_index = np.arange(rows)
+
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket < points - 3:
+            next_x = 0.5 * (edges[bucket + 1] + edges[bucket + 2] - 1)
+            next_y = series[:, edges[bucket + 1]:edges[bucket + 2]].mean(axis=1)
+        else:
+            next_x, next_y = length - 1, series[:, -1]
+        anchor = indices[:, bucket]
+        anchor_y = series[row_index, anchor]
+        candidates = np.arange(start, stop)
+        # Twice the triangle area (anchor, candidate, next bucket average), per row and candidate
+        area = np.abs((anchor - next_x)[:, np.newaxis] * (series[:, start:stop] - anchor_y[:, np.newaxis])
+                      - (anchor[:, np.newaxis] - candidates) * (next_y - anchor_y)[:, np.newaxis])
+        indices[:, bucket + 1] = candidates[np.argmax(area, axis=1)]
+    return indices
+
+
+def sample_paths(paths, max_paths, points=None):
+    """
+    Pick the response's sample paths before any conversion.
+
+    Args:
+        paths: Simulated paths array (or an empty placeholder)
+        max_paths: Number of leading paths to keep
+        points: Downsample each path to this many time steps with LTTB (all steps if None)
+
+    Returns:
+        Tuple of (values, steps): (paths, points) prices, and the time-step index of
+        each value when downsampled (None otherwise)
+    """
+    if not hasattr(paths, '__len__') or isinstance(paths, (float, int)) or len(paths) == 0:
+        return np.empty((0, 0)), None
+    values = np.asarray(paths[:max_paths], dtype=float)
+    steps = lttb_indices(values, points) if points is not None else None
+    if steps is not None:
+        values = np.take_along_axis(values, steps, axis=1)
+    return values, steps
+
+
+def encode_arrays(value, encoding):
+    """
+    Replace the numpy arrays in a response payload (nested in dicts and lists) by their JSON form.
+
+    Args:
+        value: Payload
+        encoding: 'list' for nested lists, 'float32' for base64 binary (see encode_array)
+    """
+    if isinstance(value, np.ndarray):
+        return encode_array(value, encoding)
+    if isinstance(value, dict):
+        return {key: encode_arrays(item, encoding) for key, item in value.items()}
+    if isinstance(value, list):
+        return [encode_arrays(item, encoding) for item in value]
+    return value
+
+
+def encode_array(values, encoding):
+    """
+    JSON form of one array.
+
+    'float32' sends {'dtype', 'shape', 'data'}, data being the base64 of the
+    row-major little-endian values (float32 for prices, int32 for indices).
+    """
+    if encoding == 'list':
+        return values.tolist()
+    binary = _binary_array(values)
+    return {**binary, 'data': base64.b64encode(binary['data']).decode('ascii')}
+
+
+def pack_msgpack(payload):
+    """MessagePack body for a payload; arrays become {'dtype', 'shape', 'data': raw bytes} maps."""
+    return msgpack.packb(payload, default=_msgpack_default)
+
+
+def compress(body, accept_encodings):
+    """
+    Compress a response body with the best encoding the client accepts.
+
+    Args:
+        body: Response bytes
+        accept_encodings: werkzeug Accept object for the Accept-Encoding header
+
+    Returns:
+        Tuple of (body, content encoding or None if left uncompressed)
+    """
+    if len(body) < MIN_COMPRESSED_BYTES:
+        return body, None
+    offered = (['br'] if brotli is not None else []) + ['gzip']
+    encoding = accept_encodings.best_match(offered)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), encoding
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), encoding
+    return body, None
+
+
+def _binary_array(values):
+    """Little-endian binary form of a price (float32) or index (int32) array."""
+    dtype = '<i4' if np.issubdtype(values.dtype, np.integer) else '<f4'
+    return {
+        'dtype': 'int32' if dtype == '<i4' else 'float32',
+        'shape': list(values.shape),
+        'data': np.ascontiguousarray(values, dtype=dtype).tobytes()
+    }
+
+
+def _msgpack_default(value):
+    """Convert the numpy values msgpack cannot pack natively."""
+    if isinstance(value, np.ndarray):
+        return _binary_array(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
@@ -1,15 +1,35 @@
 """
 Options pricing module using Monte Carlo simulation with Heston model.
-Provides both American (Longstaff-Schwartz) and European (Black-Scholes) option pricing.
+Provides American (Longstaff-Schwartz) pricing and semi-analytic Heston European prices.
 """
 
-from model.black_scholes import price_european_option
-from model.longstaff_schwartz import longstaff_schwartz
+from model.black_scholes import (
+    barone_adesi_whaley, bjerksund_stensland, black_scholes, black_scholes_prices, european_payoffs,
+    gbm_terminal_prices
+)
+from model.binomial_tree import leisen_reimer_price
+from model.finite_difference import finite_difference_price
+from model.greeks import GREEKS, exercise_greeks, spot_tangents
+from model.heston_fourier import heston_price
+from model.longstaff_schwartz import (
+    LSM_BASES, apply_exercise_policy, bermudan_exercise_steps, longstaff_schwartz_cashflows
+)
 from data.cache import get_stock_data
-from model.heston_model import generate_paths
+from data.schema import TickerData
+from model.heston_model import DEFAULT_BLOCK_SIZE, generate_qmc_paths, num_time_steps
+from model.mc_statistics import RunningCovariance, RunningMoments, mc_estimate, pair_average
+from model.parallel import simulate_blocks
+from caching import LRUCache, SingleFlight
+from metrics import DEBUG, debug_log, record_simulation, timed
 from data.dividend_forecaster import get_dividend_array_for_pricing, get_option_period_dividends
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+from contextlib import closing
+import hashlib
 import numpy as np
 import math
+import os
+import time
 
 # Model parameters
 RISK_FREE_RATE = 0.0438  # 4.38%
@@ -18,8 +38,137 @@ CORRELATION = -0.7
 MEAN_REVERSION_RATE = 5.0
 TRADING_DAYS_PER_YEAR = 252
 
+# Default time grid per path discretization: the floored Euler scheme needs a daily
+# grid to stay stable, while Andersen QE keeps the same bias on a weekly grid
+SCHEME_STEPS_PER_YEAR = {
+    'euler': TRADING_DAYS_PER_YEAR,
+    'qe': 52,
+}
 
-def price_option(call_or_put: str, ticker: str, K: float, T: float, num_sims: int = 1000) -> tuple[float, float, float, float, list[list[float]], float, dict]:
+# Independent Sobol scrambles used for randomized QMC error estimates
+QMC_REPLICATIONS = 8
+
+# Control variates for the American estimate; control_variate=True selects the first
+CONTROL_VARIATES = ('black_scholes', 'heston')
+
+# Default path cap in target-precision mode
+TARGET_MAX_SIMS = 200000
+
+# Paths pooled for the single Longstaff-Schwartz fit of a block-by-block run
+LSM_FIT_SIMS = 10000
+
+# Memory budget for cached path sets, per process (job workers set their own, see jobs.py)
+PATH_CACHE_MAX_BYTES = int(os.environ.get('PATH_CACHE_MAX_BYTES', 64 * 1024 ** 2))
+
+# Pricing engines: Heston Monte Carlo with Longstaff-Schwartz, the Crank-Nicolson PDE,
+# the Leisen-Reimer binomial tree, or a closed-form American approximation
+ENGINES = ('monte_carlo', 'pde', 'tree', 'barone_adesi_whaley', 'bjerksund_stensland')
+
+# Closed-form engines for indicative quotes; the first is the default in quick mode
+QUICK_ENGINES = ('bjerksund_stensland', 'barone_adesi_whaley')
+
+# Memory budget for cached Longstaff-Schwartz exercise policies (a few KB each)
+POLICY_CACHE_MAX_BYTES = 16 * 1024 ** 2
+
+# Memory budget and lifetime of memoized pricing results (see price_option_memoized)
+RESULT_CACHE_MAX_BYTES = 64 * 1024 ** 2
+RESULT_CACHE_TTL_SECONDS = 10 * 60
+
+# Seed of memoized runs that do not set one, so identical requests get identical results
+RESULT_SEED = 0
+
+# Options that do not change a result: it is bit-identical whatever the number of workers
+_RESULT_NEUTRAL_OPTIONS = ('workers', 'progress')
+
+
+@dataclass
+class PricingResult:
+    """Full output of a pricing run; price_option returns it flattened to a tuple."""
+    us_price: float
+    eu_price: float
+    us_std: float  # Standard error of the American estimate, as us_se (the name of the legacy tuple field)
+    eu_std: float  # Standard error of the European price, as eu_se
+    paths: np.ndarray  # Simulated paths kept in memory (the first block when streaming)
+    volatility: float
+    dividends: dict
+    num_paths: int  # Paths actually simulated
+    us_se: float = 0.0  # Standard error of the American estimate
+    eu_se: float = 0.0  # Standard error of the European price (0 for the semi-analytic price)
+    converged: Optional[bool] = None  # Target-precision mode: whether target_se was reached
+    policy_reused: bool = False  # American leg priced out of sample with a cached exercise policy
+    greeks: Optional[dict] = None  # Simulated delta, gamma and vega per leg ('us', 'eu') and their errors
+
+    def as_tuple(self) -> tuple[float, float, float, float, list[list[float]], float, dict]:
+        return (
+            self.us_price,
+            self.eu_price,
+            self.us_std,
+            self.eu_std,
+            self.paths.tolist(),
+            self.volatility,
+            self.dividends
+        )
+
+
+@dataclass
+class PathSet:
+    """Simulated paths for one market snapshot and expiry, shared by every strike and option type."""
+    paths: np.ndarray  # Simulated price paths
+    brownian: np.ndarray  # Terminal asset Brownian of each path, for the companion control variate
+    num_paths: int  # Number of paths
+    replications: Optional[int] = None  # Randomized-QMC replications stored as equal consecutive row blocks
+    sensitivities: Optional[tuple] = None  # (spot_tangents, vega_tangents, spot_scores) for Greeks
+
+    @property
+    def nbytes(self) -> int:
+        return self.paths.nbytes + self.brownian.nbytes + sum(values.nbytes for values in self.sensitivities or ())
+
+
+@dataclass
+class MarketInputs:
+    """Market data and simulation grid shared by every contract on one ticker and expiry."""
+    stock_data: TickerData
+    T: float
+    scheme: str
+    steps_per_year: int
+    dividend_info: dict  # Dividends falling within the option period
+    dividend_days: np.ndarray  # Dividend amount per simulation time step
+    dividend_yield: float  # Continuous yield equivalent for Black-Scholes
+    path_kwargs: dict  # Keyword arguments for the Heston path generators
+
+
+@dataclass
+class MemoizedRequest:
+    """A pricing request resolved against the ticker's current market data (see memoized_request)."""
+    args: tuple  # Positional arguments for price_option_detailed
+    options: dict  # Keyword arguments for price_option_detailed, seed filled in and stock_data attached
+    keep_paths: Optional[int]  # Leading sample paths kept in the memoized result (all if None)
+    key: Optional[tuple]  # result_cache key, or None if the result is not memoizable
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Hex digest of the key, identifying the result across processes (None if not memoizable)."""
+        return hashlib.sha256(repr(self.key).encode()).hexdigest() if self.key is not None else None
+
+
+# Seeded path sets, keyed by ticker data version, expiry and simulation settings
+path_cache = LRUCache(PATH_CACHE_MAX_BYTES, sizeof=lambda path_set: path_set.nbytes, name='paths')
+
+# Fitted exercise policies, keyed by ticker data version, contract terms and regression settings
+policy_cache = LRUCache(POLICY_CACHE_MAX_BYTES, sizeof=lambda policies: sum(policy.nbytes for policy in policies),
+                        name='policies')
+
+# Pricing results with trimmed sample paths, keyed by ticker data version and normalized request
+# (a nominal 1 KB is counted for the scalars, so path-less results are bounded too)
+result_cache = LRUCache(RESULT_CACHE_MAX_BYTES, sizeof=lambda result: result.paths.nbytes + 1024, name='results',
+                        ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+
+# Memoized runs in progress, so identical concurrent requests share one simulation
+result_runs = SingleFlight(name='pricing')
+
+
+def price_option(call_or_put: str, ticker: str, K: float, T: float, num_sims: int = 1000,
+                 **options) -> tuple[float, float, float, float, list[list[float]], float, dict]:
     """
     Price an option using Monte Carlo simulation with Heston model and Longstaff-Schwartz for American options.
     
@@ -29,157 +178,14 @@ def price_option(call_or_put: str, ticker: str, K: float, T: float, num_sims: in
         K: Strike price
         T: Time to expiry in years
         num_sims: Number of Monte Carlo simulations
+        **options: Simulation options forwarded to price_option_detailed
+            (scheme, streaming, block_size, workers, seed, qmc, antithetic, target_se, ...)
         
     Returns:
         Tuple of (us_option_price, eu_option_price, us_price_std, eu_price_std, paths, vol, dividends)
     """
     try:
-        # Validate inputs
-        if call_or_put not in ['call', 'put']:
-            raise ValueError("call_or_put must be 'call' or 'put'")
-        if K <= 0:
-            raise ValueError("Strike price must be positive")
-        if T <= 0:
-            raise ValueError("Time to expiry must be positive")
-        if num_sims <= 0:
-            raise ValueError("Number of simulations must be positive")
-            
-        # Get stock data
-        stock_data = get_stock_data(ticker)
-        
-        # Validate stock data
-        if stock_data.price <= 0:
-            raise ValueError(f"Invalid stock price for {ticker}: {stock_data.price}")
-        if stock_data.volatility <= 0:
-            raise ValueError(f"Invalid volatility for {ticker}: {stock_data.volatility}")
-            
-        print(f"Pricing {call_or_put} option for {ticker}")
-        print(f"Current price: ${stock_data.price:.2f}")
-        print(f"Strike price: ${K:.2f}")
-        print(f"Time to expiry: {T:.4f} years")
-        print(f"Volatility: {stock_data.volatility:.4f}")
-        print(f"Number of simulations: {num_sims}")
-        
-        print('DEBUG about to call generate_paths')
-        # Generate price paths using Heston model
-        dividend_schedule_list = stock_data.dividend_schedule.get('schedule', []) if isinstance(stock_data.dividend_schedule, dict) else []
-        
-        # Get dividend information for the option period
-        option_dividend_info = get_option_period_dividends(dividend_schedule_list, T)
-        
-        # Use forecasted dividends for simulation
-        dividends_for_simulation = option_dividend_info['dividends_in_period']
-        
-        paths = generate_paths(
-            num_sims=num_sims,
-            initial_price=stock_data.price,
-            risk_free_rate=RISK_FREE_RATE,
-            initial_volatility=stock_data.volatility,
-            time_to_expiry=T,
-            mean_reversion_rate=MEAN_REVERSION_RATE,
-            vol_of_vol=VOL_OF_VOL,
-            long_term_variance=stock_data.volatility ** 2,
-            correlation=CORRELATION,
-            dividend_days=get_dividend_array_for_pricing(dividends_for_simulation, T)
-        )
-        print('DEBUG paths:', type(paths), 'len:', len(paths) if hasattr(paths, '__len__') else 'N/A')
-        
-        # Extract just the paths (second element of tuple)
-        price_paths = paths[1]
-        print('DEBUG price_paths type:', type(price_paths), 'shape:', getattr(price_paths, 'shape', None))
-        
-        # Estimate continuous dividend yield for Black-Scholes
-        dividend_yield = 0.0
-        if isinstance(stock_data.dividend_schedule, dict) and dividends_for_simulation:
-            # Only use dividend yield if there are actually dividends in the simulation
-            dividend_yield = stock_data.dividend_schedule.get('annual_yield', 0.0)
-            # If annual_yield is based on a $100 price, scale it to actual price
-            if dividend_yield > 0 and stock_data.price > 0:
-                # annual_yield = (annual_div / 100), so scale to actual price
-                annual_div = dividend_yield * 100
-                dividend_yield = annual_div / stock_data.price
-
-        # Price European option using Black-Scholes analytical formula
-        from model.black_scholes import black_scholes
-        eu_price = black_scholes(
-            call_or_put=call_or_put,
-            stock_price=stock_data.price,
-            strike_price=K,
-            time_to_expiry=T,
-            volatility=stock_data.volatility,
-            risk_free_rate=RISK_FREE_RATE,
-            dividend_yield=dividend_yield
-        )
-        # Price European option using MC for standard error
-        eu_price_mc, eu_se = price_european_option(
-            call_or_put=call_or_put,
-            paths=price_paths,
-            strike_price=K,
-            risk_free_rate=RISK_FREE_RATE,
-            time_to_expiry=T
-        )
-        
-        # Price American option using Longstaff-Schwartz
-        # Get dividend array for the option period
-        dividend_days = get_dividend_array_for_pricing(dividends_for_simulation, T)
-        
-        # For American options, we need to consider the present value of future dividends
-        # when calculating the exercise value for call options
-        dividend_present_val = None
-        if call_or_put == 'call' and dividends_for_simulation:
-            # Only add dividend present value if there are actual dividends
-            total_future_dividends = np.sum(dividend_days)
-            if total_future_dividends > 0:
-                # Simple approach: use the total present value of future dividends
-                dividend_present_val = np.full(num_sims, total_future_dividends)
-        
-        us_price, us_se = longstaff_schwartz(
-            S=price_paths,
-            K=K,
-            r=RISK_FREE_RATE,
-            T=T,
-            option_type=call_or_put,
-            dividend_present_val=dividend_present_val
-        )
-        
-        # Calculate standard deviations
-        eu_payoffs = []
-        us_payoffs = []
-        
-        for path in price_paths:
-            final_price = float(path[-1])
-            if call_or_put == 'call':
-                eu_payoff = max(final_price - K, 0)
-            else:  # put
-                eu_payoff = max(K - final_price, 0)
-            eu_payoffs.append(eu_payoff)
-        
-        # For American options, we need to calculate payoffs considering early exercise
-        # This is a simplified approach - in practice, Longstaff-Schwartz would handle this
-        us_payoffs = eu_payoffs.copy()  # Simplified for now
-        
-        eu_std = np.std(eu_payoffs) if len(eu_payoffs) > 1 else 0.0
-        us_std = np.std(us_payoffs) if len(us_payoffs) > 1 else 0.0
-        
-        print(f"European {call_or_put} price: ${eu_price:.4f} ± ${eu_std:.4f}")
-        print(f"American {call_or_put} price: ${us_price:.4f} ± ${us_std:.4f}")
-        
-        # Ensure dividend_schedule is always a dict
-        dividend_schedule = stock_data.dividend_schedule if isinstance(stock_data.dividend_schedule, dict) else {}
-        
-        # Add option-specific dividend information
-        dividend_schedule['option_period_info'] = option_dividend_info
-        
-        return (
-            float(us_price),
-            float(eu_price),  # Analytical Black-Scholes price
-            float(us_std),
-            float(eu_std),
-            price_paths.tolist(),
-            float(stock_data.volatility),
-            dividend_schedule
-        )
-        
+        return price_option_detailed(call_or_put, ticker, K, T, num_sims, **options).as_tuple()
     except Exception as e:
         print(f"Error pricing option for {ticker}: {str(e)}")
         # Return safe defaults instead of raising
@@ -194,17 +200,1058 @@ def price_option(call_or_put: str, ticker: str, K: float, T: float, num_sims: in
         )
 
 
+def price_option_detailed(call_or_put: str, ticker: str, K: float, T: float, num_sims: int = 1000,
+                          scheme: str = 'euler', streaming: bool = False, block_size: int = DEFAULT_BLOCK_SIZE,
+                          workers: int = 1, seed: Optional[int] = None, qmc: bool = False,
+                          qmc_replications: int = QMC_REPLICATIONS, antithetic: bool = False,
+                          control_variate: Union[bool, str] = False, target_se: Optional[float] = None,
+                          max_sims: Optional[int] = None, time_budget_ms: Optional[float] = None,
+                          lsm_basis: str = 'monomial', lsm_itm_only: bool = True,
+                          exercise_frequency: Optional[int] = None, richardson: bool = False,
+                          reuse_policy: bool = False, engine: str = 'monte_carlo',
+                          greeks: bool = False,
+                          progress: Optional[Callable[[PricingResult], None]] = None,
+                          stock_data: Optional[TickerData] = None) -> PricingResult:
+    """
+    Price an option and return the full PricingResult, raising on invalid input.
+
+    The European price is semi-analytic: the Heston characteristic-function price
+    with the discrete dividends split between spot and strike (Bos-Vandermark), so
+    it carries no Monte Carlo error. Only the American leg is simulated.
+
+    Paths are simulated in fixed-size blocks, each drawing from its own SeedSequence
+    child of seed. For a given seed and block_size the result is bit-identical
+    whatever the number of workers. Seeded in-memory path sets are cached (see
+    get_path_set), so repeated calls on the same ticker, expiry and seed skip the
+    simulation.
+
+    In streaming mode paths are simulated and priced one block at a time, so memory
+    no longer grows with num_sims. The Longstaff-Schwartz policy is fitted once, on
+    the first LSM_FIT_SIMS paths, and applied out of sample to every later block
+    (see _iter_lsm_blocks). The first block is returned as the path sample.
+
+    In QMC mode paths are driven by scrambled Sobol points through Brownian bridges,
+    in qmc_replications independent scrambles of a power-of-2 size (so slightly more
+    than num_sims paths may be used). Standard errors come from the spread of the
+    replication means. QMC runs in a single process and does not stream.
+
+    control_variate selects a control variate for the American estimate, with the
+    optimal beta estimated per run:
+    - 'black_scholes' (or True): each path also drives a geometric Brownian motion on
+      the dividend-escrowed spot at the stock's volatility, whose discounted payoff
+      has the exact Black-Scholes price as expectation.
+    - 'heston': the path's own discounted European payoff, with the semi-analytic
+      Heston price as expectation. It is more strongly correlated with the American
+      payoff but inherits the discretization bias of the scheme.
+
+    Target-precision mode (target_se or time_budget_ms set) runs like streaming mode
+    but stops as soon as the American standard error is at most target_se, max_sims
+    paths have been used, or time_budget_ms has elapsed. num_sims is then the minimum
+    number of paths before the tolerance is checked.
+
+    In both block-by-block modes, progress (if given) is called after every block
+    with a PricingResult over the paths priced so far; the last call carries the
+    final result. An exception raised by progress stops the run, cancelling the
+    blocks not yet simulated, and propagates to the caller.
+
+    The Longstaff-Schwartz continuation value is regressed on lsm_basis in the
+    moneyness S/K: 'monomial' (1, x, x^2), 'laguerre' (weighted Laguerre polynomials)
+    or 'european' (monomials plus the Black-Scholes European value at the remaining
+    maturity). lsm_itm_only=False regresses on every path instead of only the
+    in-the-money ones.
+
+    By default every simulated time step is an exercise date. exercise_frequency
+    restricts early exercise to that many dates per year (always including the last
+    step before each ex-dividend date), which cuts the number of regressions
+    accordingly. richardson=True prices the American leg on that grid and on one
+    twice as coarse, and extrapolates to continuous exercise as 2 * fine - coarse.
+
+    Every fitted exercise policy is cached (see policy_cache). With reuse_policy, a
+    cached policy for the same market data, contract and regression settings is
+    applied to this run's paths in one forward pass instead of refitting: the
+    regression phase is skipped, and on fresh paths the American price becomes a
+    low-biased out-of-sample estimate (policy_reused is then set on the result).
+
+    engine='pde' skips the simulation: both prices come from a Crank-Nicolson
+    finite-difference solution under Black-Scholes dynamics at the stock's
+    volatility, with jump conditions at the forecast dividend dates. It is a
+    one-factor approximation of the Heston model that prices in milliseconds, with
+    no standard error and no sample paths; the simulation options are ignored.
+    engine='tree' does the same with a Leisen-Reimer binomial tree on the
+    dividend-escrowed spot.
+
+    greeks=True also estimates delta, gamma and vega of both legs from the same
+    paths (see model.greeks): the simulation carries volatility tangents and
+    first-step likelihood-ratio scores alongside the prices, and the American
+    Greeks are taken at each path's Longstaff-Schwartz exercise time. Vega is the
+    sensitivity to the stock's volatility, which sets both the initial and the
+    long-run Heston volatility. The European Greeks are simulated even though the
+    European price is semi-analytic.
+
+    Args:
+        call_or_put: 'call' or 'put'
+        ticker: Stock ticker symbol
+        K: Strike price
+        T: Time to expiry in years
+        num_sims: Number of Monte Carlo simulations
+        scheme: Heston discretization, 'euler' (daily grid) or 'qe' (weekly grid)
+        streaming: Simulate and price block by block to bound memory
+        block_size: Paths per simulated block
+        workers: Number of processes used to simulate blocks
+        seed: Seed for reproducible results (fresh entropy if None)
+        qmc: Use randomized quasi-Monte Carlo paths
+        qmc_replications: Number of independent Sobol scrambles in QMC mode
+        antithetic: Simulate antithetic path pairs (num_sims is rounded up to even)
+        control_variate: False, True, 'black_scholes' or 'heston'
+        target_se: Stop once the American standard error is at most this (price units)
+        max_sims: Path cap in target-precision mode (TARGET_MAX_SIMS if None)
+        time_budget_ms: Stop after this much wall-clock time in target-precision mode
+        lsm_basis: Longstaff-Schwartz regression basis, one of LSM_BASES
+        lsm_itm_only: Regress on in-the-money paths only
+        exercise_frequency: Early-exercise dates per year (every simulated step if None)
+        richardson: Extrapolate the American price from two exercise grids
+        reuse_policy: Price with a cached exercise policy when one matches
+        engine: One of ENGINES; the closed-form approximations use the continuous
+            dividend yield equivalent to the forecast dividends
+        greeks: Estimate Monte Carlo Greeks (engine='monte_carlo' only)
+        progress: Callback receiving running results in streaming and target-precision mode
+        stock_data: Market data already fetched for the ticker (fetched when omitted)
+
+    Returns:
+        PricingResult
+    """
+    start_time = time.perf_counter()
+
+    # Validate inputs
+    _validate_contract(call_or_put, K, T)
+    num_sims = _validate_simulation(num_sims, scheme, block_size, workers, qmc, qmc_replications, antithetic)
+    if qmc and streaming:
+        raise ValueError("QMC mode does not support streaming")
+    if target_se is not None and target_se <= 0:
+        raise ValueError("target_se must be positive")
+    if time_budget_ms is not None and time_budget_ms <= 0:
+        raise ValueError("time_budget_ms must be positive")
+    target_mode = target_se is not None or time_budget_ms is not None
+    max_sims = TARGET_MAX_SIMS if max_sims is None else max_sims
+    if target_mode and qmc:
+        raise ValueError("Target-precision mode does not support QMC")
+    if target_mode and max_sims < num_sims:
+        raise ValueError("max_sims must be at least num_sims")
+    if antithetic:
+        max_sims += max_sims % 2  # Whole antithetic pairs only
+    control_kind = _control_kind(control_variate)
+    _validate_lsm(lsm_basis, exercise_frequency)
+    _validate_engine(engine, greeks)
+
+    market = load_market_inputs(ticker, T, scheme, stock_data=stock_data)
+    if engine != 'monte_carlo':
+        return _price_deterministic(market, call_or_put, [K], engine)[0]
+    lsm_options = _lsm_options(market, lsm_basis, lsm_itm_only, exercise_frequency, richardson)
+
+    debug_log(f"Pricing {call_or_put} option for {ticker}")
+    debug_log(f"Current price: ${market.stock_data.price:.2f}")
+    debug_log(f"Strike price: ${K:.2f}")
+    debug_log(f"Time to expiry: {T:.4f} years")
+    debug_log(f"Volatility: {market.stock_data.volatility:.4f}")
+    debug_log(f"Number of simulations: {num_sims}")
+    debug_log(f"Scheme: {scheme} ({market.steps_per_year} steps/year)")
+
+    if target_mode or streaming:
+        return _price_blockwise(
+            market, call_or_put, K, num_sims, max_sims if target_mode else num_sims, target_se,
+            time_budget_ms, start_time, seed=seed, block_size=block_size, workers=workers,
+            antithetic=antithetic, control_kind=control_kind, lsm_options=lsm_options, reuse_policy=reuse_policy,
+            greeks=greeks, progress=progress
+        )
+
+    path_set = get_path_set(market, num_sims, seed=seed, block_size=block_size, workers=workers, qmc=qmc,
+                            qmc_replications=qmc_replications, antithetic=antithetic, greeks=greeks)
+    return _price_contract(market, path_set, call_or_put, K, antithetic=antithetic, control_kind=control_kind,
+                           lsm_options=lsm_options, reuse_policy=reuse_policy, greeks=greeks)
+
+
+def memoized_request(call_or_put: str, ticker: str, K: float, T: float, num_sims: int = 1000,
+                     keep_paths: Optional[int] = None, memoize: bool = True, **options) -> MemoizedRequest:
+    """
+    Resolve a pricing request against the ticker's current market data, without pricing it.
+
+    The market data is looked up (to read its version; repeated lookups are served
+    in process, see data.cache.STOCK_DATA_TTL_SECONDS) and the request normalized
+    into its result_cache key: the data version, the contract, num_sims,
+    keep_paths and every option that changes the result. A market data refresh
+    therefore never serves a stale price. Unseeded memoized requests are given
+    RESULT_SEED, so identical requests return identical results (and share the
+    seeded path cache); with memoize=False they stay unseeded, so their paths are
+    simulated afresh. Some results are not memoizable: runs with a time_budget_ms depend on
+    the machine's speed, and reuse_policy runs on whatever exercise policy is in
+    policy_cache at the time.
+
+    The key is known before anything is simulated, so a caller can answer a
+    conditional request from MemoizedRequest.digest alone.
+
+    Args:
+        keep_paths: Keep only this many leading sample paths in the memoized result (all if None)
+        memoize: False to always price and, unless seeded, simulate afresh (e.g. when
+                 the caller measures the pricing)
+        **options: Keyword arguments for price_option_detailed
+
+    Returns:
+        MemoizedRequest, to price with price_option_memoized
+    """
+    if memoize and options.get('seed') is None:
+        options = {**options, 'seed': RESULT_SEED}
+    stock_data = get_stock_data(ticker)
+    key = None
+    if memoize and options.get('time_budget_ms') is None and not options.get('reuse_policy'):
+        key = (stock_data.version, call_or_put, float(K), float(T), int(num_sims), keep_paths,
+               tuple(sorted((name, value) for name, value in options.items() if name not in _RESULT_NEUTRAL_OPTIONS)))
+    return MemoizedRequest(args=(call_or_put, ticker, K, T, num_sims), options=dict(options, stock_data=stock_data),
+                           keep_paths=keep_paths, key=key)
+
+
+def price_option_memoized(memoized: MemoizedRequest) -> PricingResult:
+    """
+    Price a resolved request with price_option_detailed, memoizing the result (see result_cache).
+
+    Entries expire after RESULT_CACHE_TTL_SECONDS. Identical requests arriving
+    while the result is being computed wait for that run instead of starting
+    their own. Requests that are not memoizable are simply priced.
+
+    Args:
+        memoized: Request from memoized_request
+
+    Returns:
+        PricingResult (shared with other callers when memoized, so not to be modified)
+    """
+    if memoized.key is None:
+        return price_option_detailed(*memoized.args, **memoized.options)
+    result = result_cache.get(memoized.key)
+    if result is None:
+        result = result_runs.do(memoized.key, _price_and_memoize, memoized)
+    return result
+
+
+def _price_and_memoize(memoized):
+    """Price a memoizable request, trim its sample paths and store the result under its key."""
+    result = price_option_detailed(*memoized.args, **memoized.options)
+    if memoized.keep_paths is not None:
+        result.paths = result.paths[:memoized.keep_paths].copy()  # Copied so the full path set can be freed
+    result_cache.put(memoized.key, result)
+    return result
+
+
+def price_option_ladder(ticker: str, strikes: list[float], T: float, num_sims: int = 1000,
+                        option_types: tuple[str, ...] = ('call', 'put'), scheme: str = 'euler',
+                        block_size: int = DEFAULT_BLOCK_SIZE, workers: int = 1, seed: Optional[int] = None,
+                        qmc: bool = False, qmc_replications: int = QMC_REPLICATIONS, antithetic: bool = False,
+                        control_variate: Union[bool, str] = False, lsm_basis: str = 'monomial',
+                        lsm_itm_only: bool = True, exercise_frequency: Optional[int] = None,
+                        richardson: bool = False, reuse_policy: bool = False, engine: str = 'monte_carlo',
+                        greeks: bool = False) -> dict[tuple[str, float], PricingResult]:
+    """
+    Price a ladder of strikes for one or both option types against a single path set.
+
+    The Heston paths depend only on the market snapshot, expiry and simulation
+    settings, so they are simulated (or taken from the path cache) once and every
+    contract is priced on them. Options are as for price_option_detailed; with
+    engine='tree' or a closed-form engine each option type's whole ladder is
+    priced in one vectorized pass.
+
+    Args:
+        ticker: Stock ticker symbol
+        strikes: Strike prices
+        T: Time to expiry in years
+        num_sims: Number of Monte Carlo simulations
+        option_types: Option types to price for every strike
+
+    Returns:
+        Dict mapping (call_or_put, strike) to PricingResult, in option type then strike order
+    """
+    if not strikes:
+        raise ValueError("At least one strike is required")
+    for call_or_put in option_types:
+        for K in strikes:
+            _validate_contract(call_or_put, K, T)
+    num_sims = _validate_simulation(num_sims, scheme, block_size, workers, qmc, qmc_replications, antithetic)
+    control_kind = _control_kind(control_variate)
+    _validate_lsm(lsm_basis, exercise_frequency)
+    _validate_engine(engine, greeks)
+
+    market = load_market_inputs(ticker, T, scheme)
+    debug_log(f"Pricing {len(strikes)} strikes x {len(option_types)} option types for {ticker}")
+    return _price_contracts(
+        market, [(call_or_put, K) for call_or_put in option_types for K in strikes], num_sims, engine=engine,
+        control_kind=control_kind, lsm_basis=lsm_basis, lsm_itm_only=lsm_itm_only,
+        exercise_frequency=exercise_frequency, richardson=richardson, reuse_policy=reuse_policy, greeks=greeks,
+        antithetic=antithetic, seed=seed, block_size=block_size, workers=workers, qmc=qmc,
+        qmc_replications=qmc_replications
+    )
+
+
+def price_option_batch(contracts: list[tuple[str, str, float, float]], num_sims: int = 1000, scheme: str = 'euler',
+                       block_size: int = DEFAULT_BLOCK_SIZE, workers: int = 1, seed: Optional[int] = None,
+                       qmc: bool = False, qmc_replications: int = QMC_REPLICATIONS, antithetic: bool = False,
+                       control_variate: Union[bool, str] = False, lsm_basis: str = 'monomial',
+                       lsm_itm_only: bool = True, exercise_frequency: Optional[int] = None,
+                       richardson: bool = False, reuse_policy: bool = False, engine: str = 'monte_carlo',
+                       greeks: bool = False) -> list[Union[PricingResult, Exception]]:
+    """
+    Price many contracts across tickers, strikes, expiries and option types.
+
+    Contracts are grouped by ticker and expiry. Market data is fetched once per
+    ticker, and each group is priced like a ladder on one path set (simulated or
+    taken from the path cache), so every strike and option type on an expiry
+    shares the paths. Options are as for price_option_ladder and apply to every
+    contract. A contract that cannot be priced (invalid terms, or a ticker whose
+    market data fails to load) gets its exception instead of a result; the
+    others are unaffected.
+
+    Args:
+        contracts: (call_or_put, ticker, K, T) of each contract, T in years
+        num_sims: Number of Monte Carlo simulations per ticker and expiry
+
+    Returns:
+        List with a PricingResult or the exception raised for each contract, in request order
+    """
+    num_sims = _validate_simulation(num_sims, scheme, block_size, workers, qmc, qmc_replications, antithetic)
+    control_kind = _control_kind(control_variate)
+    _validate_lsm(lsm_basis, exercise_frequency)
+    _validate_engine(engine, greeks)
+
+    results: list[Union[PricingResult, Exception, None]] = [None] * len(contracts)
+    groups = {}
+    for index, (call_or_put, ticker, K, T) in enumerate(contracts):
+        try:
+            _validate_contract(call_or_put, K, T)
+        except ValueError as error:
+            results[index] = error
+            continue
+        groups.setdefault((ticker.upper().strip(), T), []).append(index)
+
+    market_data = {}  # Ticker -> TickerData, or the exception raised fetching it
+    debug_log(f"Pricing {len(contracts)} contracts in {len(groups)} ticker/expiry groups")
+    for (ticker, T), indices in groups.items():
+        try:
+            if ticker not in market_data:
+                try:
+                    market_data[ticker] = get_stock_data(ticker)
+                except Exception as error:
+                    market_data[ticker] = error
+            if isinstance(market_data[ticker], Exception):
+                raise market_data[ticker]
+            market = load_market_inputs(ticker, T, scheme, stock_data=market_data[ticker])
+            priced = _price_contracts(
+                market, [(contracts[index][0], contracts[index][2]) for index in indices], num_sims,
+                engine=engine, control_kind=control_kind, lsm_basis=lsm_basis, lsm_itm_only=lsm_itm_only,
+                exercise_frequency=exercise_frequency, richardson=richardson, reuse_policy=reuse_policy,
+                greeks=greeks, antithetic=antithetic, seed=seed, block_size=block_size, workers=workers, qmc=qmc,
+                qmc_replications=qmc_replications
+            )
+            for index in indices:
+                results[index] = priced[contracts[index][0], contracts[index][2]]
+        except Exception as error:
+            debug_log(f"Error pricing {ticker} contracts expiring in {T:.4f} years: {error}")
+            for index in indices:
+                results[index] = error
+    return results
+
+
+def _price_contracts(market, contracts, num_sims, engine='monte_carlo', control_kind=None, lsm_basis='monomial',
+                     lsm_itm_only=True, exercise_frequency=None, richardson=False, reuse_policy=False, greeks=False,
+                     antithetic=False, **path_options):
+    """
+    Price (call_or_put, K) contracts on one market snapshot and expiry, sharing one path set.
+
+    The semi-analytic European prices of each option type's strikes come from one
+    vectorized Heston evaluation. With engine='tree' or a closed-form engine each
+    option type's strikes are priced in one vectorized pass instead. path_options (seed, block_size,
+    workers, qmc, qmc_replications) are forwarded to get_path_set.
+
+    Returns:
+        Dict mapping each distinct contract to its PricingResult
+    """
+    contracts = list(dict.fromkeys(contracts))
+    if engine != 'monte_carlo':
+        results = {}
+        for call_or_put in dict.fromkeys(call_or_put for call_or_put, _ in contracts):
+            strikes = [K for option_type, K in contracts if option_type == call_or_put]
+            results.update(zip(((call_or_put, K) for K in strikes),
+                               _price_deterministic(market, call_or_put, strikes, engine)))
+        return results
+    lsm_options = _lsm_options(market, lsm_basis, lsm_itm_only, exercise_frequency, richardson)
+    path_set = get_path_set(market, num_sims, antithetic=antithetic, greeks=greeks, **path_options)
+    eu_prices = {}
+    with timed('european_pricing'):
+        # One Heston integral per option type prices its whole strike ladder
+        for call_or_put in dict.fromkeys(call_or_put for call_or_put, _ in contracts):
+            strikes = [K for option_type, K in contracts if option_type == call_or_put]
+            prices = np.atleast_1d(_european_price(market, call_or_put, np.asarray(strikes, dtype=float)))
+            eu_prices.update(zip(((call_or_put, K) for K in strikes), prices))
+    return {
+        (call_or_put, K): _price_contract(market, path_set, call_or_put, K, antithetic=antithetic,
+                                          control_kind=control_kind, lsm_options=lsm_options,
+                                          reuse_policy=reuse_policy, greeks=greeks,
+                                          eu_price=eu_prices[call_or_put, K])
+        for call_or_put, K in contracts
+    }
+
+
+def load_market_inputs(ticker: str, T: float, scheme: str = 'euler',
+                       stock_data: Optional[TickerData] = None) -> MarketInputs:
+    """
+    Fetch market data for a ticker and build the simulation inputs for one expiry.
+
+    Args:
+        ticker: Stock ticker symbol
+        T: Time to expiry in years
+        scheme: Heston discretization, which sets the time grid
+        stock_data: Market data already fetched for the ticker (fetched when omitted)
+
+    Returns:
+        MarketInputs
+    """
+    steps_per_year = SCHEME_STEPS_PER_YEAR[scheme]
+
+    # Get stock data
+    if stock_data is None:
+        stock_data = get_stock_data(ticker)
+
+    # Validate stock data
+    if stock_data.price <= 0:
+        raise ValueError(f"Invalid stock price for {ticker}: {stock_data.price}")
+    if stock_data.volatility <= 0:
+        raise ValueError(f"Invalid volatility for {ticker}: {stock_data.volatility}")
+
+    # Generate price paths using Heston model
+    dividend_schedule_list = stock_data.dividend_schedule.get('schedule', []) if isinstance(stock_data.dividend_schedule, dict) else []
+
+    # Get dividend information for the option period
+    option_dividend_info = get_option_period_dividends(dividend_schedule_list, T)
+
+    # Use forecasted dividends for simulation
+    dividends_for_simulation = option_dividend_info['dividends_in_period']
+    dividend_days = get_dividend_array_for_pricing(dividends_for_simulation, T, steps_per_year)
+
+    path_kwargs = dict(
+        initial_price=stock_data.price,
+        risk_free_rate=RISK_FREE_RATE,
+        initial_volatility=stock_data.volatility,
+        time_to_expiry=T,
+        mean_reversion_rate=MEAN_REVERSION_RATE,
+        vol_of_vol=VOL_OF_VOL,
+        long_term_variance=stock_data.volatility ** 2,
+        correlation=CORRELATION,
+        dividend_days=dividend_days,
+        scheme=scheme,
+        steps_per_year=steps_per_year
+    )
+
+    # Estimate continuous dividend yield for Black-Scholes
+    dividend_yield = 0.0
+    if isinstance(stock_data.dividend_schedule, dict) and dividends_for_simulation:
+        # Only use dividend yield if there are actually dividends in the simulation
+        dividend_yield = stock_data.dividend_schedule.get('annual_yield', 0.0)
+        # If annual_yield is based on a $100 price, scale it to actual price
+        if dividend_yield > 0 and stock_data.price > 0:
+            # annual_yield = (annual_div / 100), so scale to actual price
+            annual_div = dividend_yield * 100
+            dividend_yield = annual_div / stock_data.price
+
+    return MarketInputs(
+        stock_data=stock_data,
+        T=T,
+        scheme=scheme,
+        steps_per_year=steps_per_year,
+        dividend_info=option_dividend_info,
+        dividend_days=dividend_days,
+        dividend_yield=dividend_yield,
+        path_kwargs=path_kwargs
+    )
+
+
+def get_path_set(market: MarketInputs, num_sims: int, seed: Optional[int] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, workers: int = 1, qmc: bool = False,
+                 qmc_replications: int = QMC_REPLICATIONS, antithetic: bool = False,
+                 greeks: bool = False) -> PathSet:
+    """
+    Simulate all paths in memory, reusing a cached path set when one matches.
+
+    Seeded path sets are cached in path_cache, keyed by the ticker data version,
+    expiry, scheme, seed, num_sims and the remaining settings that change the
+    paths (the dividend grid is part of the key because the dividend forecast
+    rolls with the calendar). Unseeded runs are never cached.
+
+    With greeks the path set also holds the sensitivities the Greek estimators need,
+    which roughly triples its size.
+
+    Returns:
+        PathSet
+    """
+    cache_key = None
+    if seed is not None:
+        cache_key = (market.stock_data.version, market.T, market.scheme, seed, num_sims,
+                     market.dividend_days.tobytes(), qmc and qmc_replications, antithetic,
+                     None if qmc else block_size, greeks)
+        path_set = path_cache.get(cache_key)
+        if path_set is not None:
+            debug_log(f"Using cached paths ({path_set.num_paths} paths)")
+            return path_set
+
+    with timed('path_generation'):
+        if qmc:
+            # Randomized QMC: independent Sobol scrambles, each a power of 2 in size
+            paths_per_replication = 1 << max(math.ceil(num_sims / qmc_replications) - 1, 1).bit_length()
+            _, paths, brownian, *sensitivities = generate_qmc_paths(
+                **market.path_kwargs, num_sims=paths_per_replication, seed=seed, replications=qmc_replications,
+                return_brownian=True, return_sensitivities=greeks
+            )
+            path_set = PathSet(paths, brownian, len(paths), qmc_replications)
+        else:
+            blocks = list(simulate_blocks(
+                dict(market.path_kwargs, num_sims=num_sims, antithetic=antithetic), seed=seed,
+                block_size=block_size, workers=workers, return_brownian=True, return_sensitivities=greeks
+            ))
+            path_set = PathSet(np.concatenate([block.paths for block in blocks]),
+                               np.concatenate([block.brownian for block in blocks]), num_sims)
+            if greeks:
+                sensitivities = [np.concatenate(values) for values in zip(*(block.sensitivities for block in blocks))]
+        if greeks:
+            path_set.sensitivities = (spot_tangents(path_set.paths, market.dividend_days), *sensitivities)
+    record_simulation(*path_set.paths.shape)
+
+    if cache_key is not None:
+        path_cache.put(cache_key, path_set)
+    return path_set
+
+
+def _validate_contract(call_or_put, K, T):
+    """Raise ValueError for an invalid option contract."""
+    if call_or_put not in ['call', 'put']:
+        raise ValueError("call_or_put must be 'call' or 'put'")
+    if K <= 0:
+        raise ValueError("Strike price must be positive")
+    if T <= 0:
+        raise ValueError("Time to expiry must be positive")
+
+
+def _validate_simulation(num_sims, scheme, block_size, workers, qmc, qmc_replications, antithetic):
+    """Raise ValueError for invalid simulation settings; returns num_sims rounded for antithetic pairs."""
+    if num_sims <= 0:
+        raise ValueError("Number of simulations must be positive")
+    if scheme not in SCHEME_STEPS_PER_YEAR:
+        raise ValueError(f"scheme must be one of {sorted(SCHEME_STEPS_PER_YEAR)}")
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    if qmc and qmc_replications < 2:
+        raise ValueError("QMC mode needs at least 2 replications")
+    if antithetic and qmc:
+        raise ValueError("Antithetic sampling is not combined with QMC")
+    if antithetic and block_size % 2:
+        raise ValueError("Antithetic sampling needs an even block_size")
+    return num_sims + num_sims % 2 if antithetic else num_sims  # Whole antithetic pairs only
+
+
+def _control_kind(control_variate):
+    """Normalize the control_variate option to a name in CONTROL_VARIATES, or None."""
+    if control_variate is True:
+        return CONTROL_VARIATES[0]
+    if not control_variate:
+        return None
+    if control_variate not in CONTROL_VARIATES:
+        raise ValueError(f"control_variate must be a boolean or one of {list(CONTROL_VARIATES)}")
+    return control_variate
+
+
+def _validate_engine(engine, greeks=False):
+    """Raise ValueError for an unknown pricing engine, or Greeks from a deterministic one."""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {list(ENGINES)}")
+    if greeks and engine != 'monte_carlo':
+        raise ValueError("Greeks are only estimated by the monte_carlo engine")
+
+
+def _validate_lsm(lsm_basis, exercise_frequency):
+    """Raise ValueError for invalid Longstaff-Schwartz settings."""
+    if lsm_basis not in LSM_BASES:
+        raise ValueError(f"lsm_basis must be one of {list(LSM_BASES)}")
+    if exercise_frequency is not None and exercise_frequency <= 0:
+        raise ValueError("exercise_frequency must be positive")
+
+
+def _lsm_options(market, lsm_basis, lsm_itm_only, exercise_frequency=None, richardson=False):
+    """
+    Keyword arguments for longstaff_schwartz_cashflows, plus the coarse exercise grid for Richardson extrapolation.
+
+    Exercise dates fall every steps_per_year / exercise_frequency time steps, and on
+    the last step before each ex-dividend step (paths drop by the dividend on that step).
+    """
+    options = dict(basis=lsm_basis, itm_only=lsm_itm_only, volatility=market.stock_data.volatility)
+    if exercise_frequency is None and not richardson:
+        return options
+    num_steps = num_time_steps(market.T, market.steps_per_year)
+    stride = max(1, round(market.steps_per_year / exercise_frequency)) if exercise_frequency else 1
+    before_dividends = np.flatnonzero(market.dividend_days[:num_steps]) - 1
+    options['exercise_steps'] = bermudan_exercise_steps(num_steps, stride, before_dividends)
+    if richardson:
+        options['coarse_exercise_steps'] = bermudan_exercise_steps(num_steps, 2 * stride, before_dividends)
+    return options
+
+
+def _lsm_cashflows(paths, K, T, call_or_put, dividend_present_val, lsm_options=None, policies=None,
+                   return_exercises=False):
+    """
+    Longstaff-Schwartz cashflows of a path set.
+
+    With a coarse exercise grid in lsm_options the per-path cashflows are Richardson
+    extrapolated, 2 * fine - coarse, which removes the leading-order Bermudan bias
+    and keeps an unbiased per-path sample for the standard error.
+
+    Returns:
+        Tuple of (per-path discounted cashflows, exercise policies): the given policies
+        are applied without fitting; otherwise they are fitted on these paths (one per
+        exercise grid, fine first). With return_exercises it is followed by a list of
+        (cashflows, exercise steps) per exercise grid.
+    """
+    options = dict(lsm_options or {})
+    grids = [options.pop('exercise_steps', None)]
+    coarse_exercise_steps = options.pop('coarse_exercise_steps', None)
+    if coarse_exercise_steps is not None:
+        grids.append(coarse_exercise_steps)
+
+    if policies is not None:
+        with timed('policy_evaluation'):
+            exercises = [apply_exercise_policy(paths, policy, dividend_present_val, return_stopping_times=True)
+                         for policy in policies]
+    else:
+        with timed('lsm_regression'):
+            fits = [
+                longstaff_schwartz_cashflows(paths, K, RISK_FREE_RATE, T, call_or_put, dividend_present_val,
+                                             progress=DEBUG, exercise_steps=exercise_steps,
+                                             return_stopping_times=True, return_policy=True, **options)
+                for exercise_steps in grids
+            ]
+        exercises = [(cashflows, stopping_steps) for cashflows, stopping_steps, _ in fits]
+        policies = tuple(policy for _, _, policy in fits)
+
+    cashflows = exercises[0][0]
+    if len(exercises) > 1:
+        cashflows = 2.0 * cashflows - exercises[1][0]
+    if return_exercises:
+        return cashflows, policies, exercises
+    return cashflows, policies
+
+
+def _policy_key(market, call_or_put, K, lsm_options):
+    """Policy cache key: market data version, contract terms and regression settings."""
+    settings = tuple(
+        (name, value.tobytes() if isinstance(value, np.ndarray) else value)
+        for name, value in sorted((lsm_options or {}).items())
+    )
+    return (market.stock_data.version, market.T, market.scheme, market.dividend_days.tobytes(),
+            call_or_put, K, settings)
+
+
+def _greek_samples(call_or_put, K, T, paths, sensitivities, exercises):
+    """
+    Per-path Greek samples of both legs of a contract.
+
+    The American samples pay at each path's Longstaff-Schwartz exercise step and
+    are Richardson extrapolated like the cashflows; the European ones pay at expiry.
+
+    Args:
+        sensitivities: (spot_tangents, vega_tangents, spot_scores) of the paths
+        exercises: (cashflows, exercise steps) per exercise grid, from _lsm_cashflows
+
+    Returns:
+        Dict mapping 'us' and 'eu' to dicts of per-path samples for each of GREEKS
+    """
+    num_sims, num_steps = paths.shape
+    step_discount = np.exp(-RISK_FREE_RATE * T / num_steps)  # As on the Longstaff-Schwartz time grid
+    us_grids = [
+        exercise_greeks(call_or_put, paths, stopping_steps, np.where(cashflows > 0, step_discount ** stopping_steps, 0.0),
+                        *sensitivities)
+        for cashflows, stopping_steps in exercises
+    ]
+    us_samples = us_grids[0]
+    if len(us_grids) > 1:
+        us_samples = {name: 2.0 * us_samples[name] - us_grids[1][name] for name in GREEKS}
+    expiry_discount = np.where(european_payoffs(call_or_put, paths[:, -1], K) > 0, np.exp(-RISK_FREE_RATE * T), 0.0)
+    eu_samples = exercise_greeks(call_or_put, paths, np.full(num_sims, num_steps - 1), expiry_discount, *sensitivities)
+    return {'us': us_samples, 'eu': eu_samples}
+
+
+def _greeks_response(estimates):
+    """Lay out {(leg, greek): (mean, standard error)} as {leg: {greek: mean}, leg_se: {greek: standard error}}."""
+    return {
+        f'{leg}{suffix}': {name: float(estimates[leg, name][index]) for name in GREEKS}
+        for leg in ('us', 'eu')
+        for suffix, index in (('', 0), ('_se', 1))
+    }
+
+
+def _heston_params(market):
+    """Heston model parameters of the simulated paths, as keyword arguments."""
+    return {name: market.path_kwargs[name] for name in (
+        'initial_volatility', 'mean_reversion_rate', 'vol_of_vol', 'long_term_variance', 'correlation'
+    )}
+
+
+def _european_price(market, call_or_put, K):
+    """
+    Semi-analytic Heston European price, for one strike or an array of strikes.
+
+    Discrete dividends follow Bos & Vandermark (2002): each dividend's present value
+    is taken off the spot in proportion to the time remaining after it and added to
+    the strike (at its forward value) in proportion to the time before it, which
+    tracks the paths' cash dividends much more closely than escrowing them all.
+    """
+    times, present_values = _grid_dividends(market.dividend_days, market.T, market.steps_per_year)
+    spot_adjustment = np.sum((market.T - times) / market.T * present_values)
+    strike_adjustment = np.sum(times / market.T * present_values) * np.exp(RISK_FREE_RATE * market.T)
+    return heston_price(
+        call_or_put, market.stock_data.price - spot_adjustment, K + strike_adjustment, market.T,
+        RISK_FREE_RATE, **_heston_params(market)
+    )
+
+
+def _control_variate(market, call_or_put, K, control_kind, eu_price):
+    """
+    Control variate for the American estimate.
+
+    Returns:
+        Tuple of (control, control_mean): control maps (paths, brownian_terminal) to
+        per-path discounted control values; both are None without a control
+    """
+    discount = np.exp(-RISK_FREE_RATE * market.T)
+    if control_kind == 'heston':
+        # The path's own European payoff, whose expectation is the semi-analytic price
+        return (lambda paths, brownian: european_payoffs(call_or_put, paths[:, -1], K) * discount), eu_price
+    if control_kind == 'black_scholes':
+        # Black-Scholes-consistent companion paths (GBM on the escrowed spot, driven by
+        # each Heston path's own asset Brownian)
+        companion_spot = market.stock_data.price - _grid_dividends_present_value(
+            market.dividend_days, market.T, market.steps_per_year
+        )
+        if companion_spot > 0:
+            control_spec = (companion_spot, RISK_FREE_RATE, market.stock_data.volatility, market.T)
+            control_mean = black_scholes(call_or_put, companion_spot, K, market.T, market.stock_data.volatility,
+                                         RISK_FREE_RATE)
+            return (lambda paths, brownian: _companion_payoffs(call_or_put, K, control_spec, brownian)), control_mean
+    return None, None
+
+
+def _price_contract(market, path_set, call_or_put, K, antithetic=False, control_kind=None, lsm_options=None,
+                    reuse_policy=False, greeks=False, eu_price=None):
+    """
+    Price one contract on a path set.
+
+    eu_price is the contract's semi-analytic European price when already computed.
+
+    Returns:
+        PricingResult
+    """
+    if eu_price is None:
+        with timed('european_pricing'):
+            eu_price = _european_price(market, call_or_put, K)
+    control, control_mean = _control_variate(market, call_or_put, K, control_kind, eu_price)
+
+    # Price American option using Longstaff-Schwartz
+    policy_key = _policy_key(market, call_or_put, K, lsm_options)
+    cached_policies = policy_cache.get(policy_key) if reuse_policy else None
+    cashflows, policies, exercises = _lsm_cashflows(path_set.paths, K, market.T, call_or_put,
+                                                    _dividend_present_val(market, call_or_put, len(path_set.paths)),
+                                                    lsm_options, cached_policies, return_exercises=True)
+    if cached_policies is None:
+        policy_cache.put(policy_key, policies)
+    us_price, us_se = mc_estimate(
+        cashflows,
+        antithetic=antithetic,
+        replications=path_set.replications,
+        control=control(path_set.paths, path_set.brownian) if control else None,
+        control_mean=control_mean
+    )
+    greek_estimates = None
+    if greeks:
+        with timed('greeks'):
+            samples = _greek_samples(call_or_put, K, market.T, path_set.paths, path_set.sensitivities, exercises)
+            greek_estimates = _greeks_response({
+                (leg, name): mc_estimate(values, antithetic=antithetic, replications=path_set.replications)
+                for leg, leg_samples in samples.items()
+                for name, values in leg_samples.items()
+            })
+
+    debug_log(f"European {call_or_put} price: ${eu_price:.4f}")
+    debug_log(f"American {call_or_put} price: ${us_price:.4f} ± ${us_se:.4f}")
+
+    return PricingResult(
+        us_price=float(us_price),
+        eu_price=float(eu_price),  # Semi-analytic Heston price
+        us_std=float(us_se),
+        eu_std=0.0,
+        paths=path_set.paths,
+        volatility=float(market.stock_data.volatility),
+        dividends=_dividend_summary(market),
+        num_paths=path_set.num_paths,
+        us_se=float(us_se),
+        policy_reused=cached_policies is not None,
+        greeks=greek_estimates
+    )
+
+
+def _price_deterministic(market, call_or_put, strikes, engine):
+    """
+    Price contracts with the PDE, tree or a closed-form engine (American and European on the same model).
+
+    The closed-form approximations take a continuous dividend yield, the one whose
+    carry over the option's life matches the present value of the forecast dividends.
+
+    Returns:
+        List of PricingResult, one per strike
+    """
+    times, present_values = _grid_dividends(market.dividend_days, market.T, market.steps_per_year)
+    dividends = list(zip(times, present_values * np.exp(RISK_FREE_RATE * times)))
+    args = (market.stock_data.price, market.T, market.stock_data.volatility, RISK_FREE_RATE, dividends)
+
+    with timed(f'{engine}_solve'):
+        if engine in QUICK_ENGINES:
+            # All strikes in one vectorized evaluation
+            approximation = bjerksund_stensland if engine == 'bjerksund_stensland' else barone_adesi_whaley
+            dividend_yield = -np.log1p(-np.sum(present_values) / args[0]) / market.T
+            quick_args = (args[0], np.asarray(strikes, dtype=float), *args[1:4], dividend_yield)
+            us_prices = approximation(call_or_put, *quick_args)
+            eu_prices = black_scholes_prices(call_or_put, *quick_args)
+        elif engine == 'tree':
+            # One sweep prices every strike
+            us_prices = leisen_reimer_price(call_or_put, args[0], np.asarray(strikes, dtype=float), *args[1:])
+            eu_prices = leisen_reimer_price(call_or_put, args[0], np.asarray(strikes, dtype=float), *args[1:],
+                                            american=False)
+        else:
+            us_prices = [finite_difference_price(call_or_put, args[0], K, *args[1:]) for K in strikes]
+            eu_prices = [finite_difference_price(call_or_put, args[0], K, *args[1:], american=False)
+                         for K in strikes]
+
+    dividend_summary = _dividend_summary(market)
+    results = []
+    for K, us_price, eu_price in zip(strikes, us_prices, eu_prices):
+        debug_log(f"European {call_or_put} price ({engine}, K={K}): ${eu_price:.4f}")
+        debug_log(f"American {call_or_put} price ({engine}, K={K}): ${us_price:.4f}")
+        results.append(PricingResult(
+            us_price=float(us_price),
+            eu_price=float(eu_price),
+            us_std=0.0,
+            eu_std=0.0,
+            paths=np.empty((0, 0)),
+            volatility=float(market.stock_data.volatility),
+            dividends=dividend_summary,
+            num_paths=0
+        ))
+    return results
+
+
+def _price_blockwise(market, call_or_put, K, num_sims, max_sims, target_se, time_budget_ms, start_time,
+                     seed=None, block_size=DEFAULT_BLOCK_SIZE, workers=1, antithetic=False, control_kind=None,
+                     lsm_options=None, reuse_policy=False, greeks=False, progress=None):
+    """
+    Streaming and target-precision modes of price_option_detailed: simulate and price one block at a time.
+
+    A cached exercise policy (with reuse_policy) prices every block; otherwise the
+    policy fitted on the leading blocks prices the rest and is cached. Greek samples are
+    accumulated across blocks like the American cashflows, and progress receives
+    the running result after each block.
+    """
+    with timed('european_pricing'):
+        eu_price = _european_price(market, call_or_put, K)
+    control, control_mean = _control_variate(market, call_or_put, K, control_kind, eu_price)
+    policy_key = _policy_key(market, call_or_put, K, lsm_options)
+    cached_policies = policy_cache.get(policy_key) if reuse_policy else None
+
+    us_stats = RunningCovariance()
+    greek_moments = {}  # (leg, greek) -> RunningMoments of the per-path (or per-pair) samples
+    price_paths, num_paths = None, 0
+    converged = False if target_se is not None else None
+
+    def running_result():
+        """PricingResult over the blocks priced so far."""
+        return PricingResult(
+            us_price=float(us_price),
+            eu_price=float(eu_price),  # Semi-analytic Heston price
+            us_std=float(us_se),
+            eu_std=0.0,
+            paths=price_paths,
+            volatility=float(market.stock_data.volatility),
+            dividends=_dividend_summary(market),
+            num_paths=num_paths,
+            us_se=float(us_se),
+            converged=converged,
+            policy_reused=cached_policies is not None,
+            greeks=_greeks_response({
+                key: (moments.mean, moments.standard_error) for key, moments in greek_moments.items()
+            }) if greeks else None
+        )
+
+    with closing(_iter_lsm_blocks(
+        dict(market.path_kwargs, num_sims=max_sims, antithetic=antithetic), call_or_put, K, seed=seed,
+        block_size=block_size, workers=workers, control=control, antithetic=antithetic,
+        dividend_total=_dividend_total(market, call_or_put), lsm_options=lsm_options, policies=cached_policies,
+        greeks=greeks
+    )) as blocks:
+        for block, cashflows, block_stats, policies, greek_samples in blocks:
+            if cached_policies is None and num_paths == 0:
+                policy_cache.put(policy_key, policies)
+            us_stats.merge(block_stats)
+            for leg, leg_samples in (greek_samples or {}).items():
+                for name, values in leg_samples.items():
+                    greek_moments.setdefault((leg, name), RunningMoments()).update(
+                        pair_average(values) if antithetic else values
+                    )
+            price_paths = block.paths if price_paths is None else price_paths
+            num_paths += len(block.paths)
+            us_price, us_se = us_stats.estimate(control_mean)
+            if target_se is not None and num_paths >= num_sims and us_se <= target_se:
+                converged = True
+            stop = converged or (
+                time_budget_ms is not None and (time.perf_counter() - start_time) * 1000 >= time_budget_ms
+            )
+            if progress is not None:
+                progress(running_result())
+            if stop:
+                break
+    result = running_result()
+    debug_log(f"Priced {num_paths} paths block by block (converged: {converged})")
+    debug_log(f"European {call_or_put} price: ${eu_price:.4f}")
+    debug_log(f"American {call_or_put} price: ${us_price:.4f} ± ${result.us_se:.4f}")
+    return result
+
+
+def _dividend_total(market, call_or_put):
+    """Total dividends added to a call's exercise value (0 for puts or without dividends)."""
+    if call_or_put == 'call' and market.dividend_info['dividends_in_period']:
+        return float(np.sum(market.dividend_days))
+    return 0.0
+
+
+def _dividend_present_val(market, call_or_put, num_paths):
+    """
+    For American options, we need to consider the present value of future dividends
+    when calculating the exercise value for call options.
+    """
+    total_future_dividends = _dividend_total(market, call_or_put)
+    if total_future_dividends > 0:
+        # Simple approach: use the total present value of future dividends
+        return np.full(num_paths, total_future_dividends)
+    return None
+
+
+def _dividend_summary(market):
+    """Dividend schedule for the response, with the option-period dividend information added."""
+    # Ensure dividend_schedule is always a dict
+    dividend_schedule = dict(market.stock_data.dividend_schedule) if isinstance(market.stock_data.dividend_schedule, dict) else {}
+
+    # Add option-specific dividend information
+    dividend_schedule['option_period_info'] = market.dividend_info
+    return dividend_schedule
+
+
+def _iter_lsm_blocks(path_kwargs, call_or_put, K, seed, block_size, workers, control, antithetic, dividend_total,
+                     lsm_options=None, policies=None, greeks=False, fit_sims=LSM_FIT_SIMS):
+    """
+    Simulate path blocks and price them with one Longstaff-Schwartz exercise policy.
+
+    Without given policies, the leading blocks are pooled until they hold fit_sims
+    paths (or the run ends), the policy is fitted once on the pool and the pooled
+    blocks are priced with that fit; every later block is priced out of sample by
+    applying the policy. A separate fit per block would price each small block in
+    sample and bias the American price upward.
+
+    Yields:
+        Tuple of (BlockResult, per-path discounted cashflows, RunningCovariance of the
+        block's American estimator samples, exercise policies used, per-path Greek
+        samples as from _greek_samples or None without greeks)
+    """
+    T = path_kwargs['time_to_expiry']
+
+    def price(blocks, policies):
+        """Price blocks together (fitting the policies if None), yielding each block's share."""
+        paths = blocks[0].paths if len(blocks) == 1 else np.concatenate([block.paths for block in blocks])
+        dividend_present_val = np.full(len(paths), dividend_total) if dividend_total > 0 else None
+        cashflows, policies, exercises = _lsm_cashflows(paths, K, T, call_or_put, dividend_present_val,
+                                                        lsm_options, policies, return_exercises=True)
+        start = 0
+        for block in blocks:
+            rows = slice(start, start + len(block.paths))
+            start = rows.stop
+            greek_samples = None
+            if greeks:
+                with timed('greeks'):
+                    sensitivities = (spot_tangents(block.paths, path_kwargs['dividend_days']), *block.sensitivities)
+                    greek_samples = _greek_samples(call_or_put, K, T, block.paths, sensitivities, [
+                        (grid_cashflows[rows], stopping_steps[rows]) for grid_cashflows, stopping_steps in exercises
+                    ])
+            samples = cashflows[rows]
+            if control is not None:
+                samples = np.column_stack([samples, control(block.paths, block.brownian)])
+            if antithetic:
+                samples = samples.reshape(len(samples) // 2, 2, -1).mean(axis=1)
+            yield block, cashflows[rows], RunningCovariance().update(samples), policies, greek_samples
+
+    pool = []
+    with closing(simulate_blocks(path_kwargs, seed=seed, block_size=block_size, workers=workers,
+                                 return_brownian=True, return_sensitivities=greeks)) as blocks:
+        while True:
+            with timed('path_generation'):
+                block = next(blocks, None)
+            if block is not None:
+                record_simulation(*block.paths.shape)
+            if policies is not None:
+                if block is None:
+                    return
+                yield from price([block], policies)
+                continue
+            if block is not None:
+                pool.append(block)
+            if pool and (block is None or sum(len(pooled.paths) for pooled in pool) >= fit_sims):
+                for priced in price(pool, None):
+                    policies = priced[3]
+                    yield priced
+                pool = []
+            if block is None:
+                return
+
+
+def _grid_dividends(dividend_days, T, steps_per_year):
+    """Times and present values of the discrete dividends the path engine applies on its time grid."""
+    num_steps = num_time_steps(T, steps_per_year)
+    dt = T / (num_steps - 1)
+    steps = np.arange(1, min(len(dividend_days), num_steps))
+    times = steps * dt
+    return times, dividend_days[steps] * np.exp(-RISK_FREE_RATE * times)
+
+
+def _grid_dividends_present_value(dividend_days, T, steps_per_year):
+    """Present value of the discrete dividends the path engine applies on its time grid."""
+    return float(np.sum(_grid_dividends(dividend_days, T, steps_per_year)[1]))
+
+
+def _companion_payoffs(call_or_put, K, control_spec, brownian_terminal):
+    """Discounted European payoffs of the Black-Scholes companion paths."""
+    companion_spot, r, volatility, T = control_spec
+    terminal = gbm_terminal_prices(companion_spot, r, volatility, T, brownian_terminal)
+    return european_payoffs(call_or_put, terminal, K) * np.exp(-r * T)
+
+
 def _print_dividend_info(dividend_data):
     """Print dividend schedule information."""
     if dividend_data and dividend_data.get('schedule'):
         schedule = dividend_data['schedule']
-        print("\nDividends being used (most recent first):")
+        debug_log("\nDividends being used (most recent first):")
         for i, (date, amount) in enumerate(schedule[:5]):
-            print(f"  {i+1}. Date: {date}, Amount: ${amount:.4f}")
+            debug_log(f"  {i+1}. Date: {date}, Amount: ${amount:.4f}")
         if len(schedule) > 5:
-            print(f"  ... and {len(schedule) - 5} more dividends ...")
+            debug_log(f"  ... and {len(schedule) - 5} more dividends ...")
     else:
-        print("No dividend data available for pricing.")
+        debug_log("No dividend data available for pricing.")
 
 
 def _prepare_dividend_data(dividend_data, time_to_expiry, num_simulations):
@@ -218,13 +1265,13 @@ def _prepare_dividend_data(dividend_data, time_to_expiry, num_simulations):
         present_value = dividend_data.get('present_value', 0.0)
         dividend_present_val.fill(present_value)
         
-        print(f"Dividend forecast method: {dividend_data.get('forecast_method', 'N/A')}")
-        print(f"Next dividend: ${dividend_data.get('next_dividend_amount', 0.0):.4f} on {dividend_data.get('next_dividend_date', 'N/A')}")
-        print(f"Annual dividend yield: ${dividend_data.get('annual_yield', 0.0):.4f}")
-        print(f"Present value of future dividends: ${present_value:.4f}")
+        debug_log(f"Dividend forecast method: {dividend_data.get('forecast_method', 'N/A')}")
+        debug_log(f"Next dividend: ${dividend_data.get('next_dividend_amount', 0.0):.4f} on {dividend_data.get('next_dividend_date', 'N/A')}")
+        debug_log(f"Annual dividend yield: ${dividend_data.get('annual_yield', 0.0):.4f}")
+        debug_log(f"Present value of future dividends: ${present_value:.4f}")
     else:
         num_trading_days = int(time_to_expiry * TRADING_DAYS_PER_YEAR)
         dividend_days = [0.0] * num_trading_days
-        print("No dividend data available")
+        debug_log("No dividend data available")
     
     return dividend_days, dividend_present_val 
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup: modules are imported from the backend directory, and data.cache
+gets placeholder credentials so it can be imported without a .env (no test talks to
+Supabase or the data providers).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name, _value in (('ALPHAVANTAGE_API_KEY', 'test'), ('TWELVE_API_KEY', 'test'),
+                      ('SUPABASE_URL', 'http://localhost:54321'), ('SUPABASE_KEY', 'test.test.test')):
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,280 @@
+"""Flask test-client tests of the pricing API, on stubbed market data."""
+
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('supabase')
+
+import pricing
+from api import app as app_module
+from data.schema import TickerData
+
+STOCK_DATA = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+PUT = dict(option_type='put', ticker='TEST', strike_price=100.0, time_to_expiry=182.5, num_simulations=8000,
+           scheme='qe', seed=3)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(pricing, 'get_stock_data', lambda ticker: STOCK_DATA)
+    monkeypatch.setattr(app_module, 'get_api_usage_stats', lambda: {})
+    monkeypatch.setattr(app_module, 'PRICING_WORKERS', 1)
+    for cache in (pricing.path_cache, pricing.policy_cache, pricing.result_cache):
+        cache.clear()
+    return app_module.app.test_client()
+
+
+def _events(response):
+    """(event, data) pairs of a Server-Sent Events body."""
+    events = []
+    for chunk in response.get_data(as_text=True).split('\n\n'):
+        if chunk:
+            name, data = chunk.split('\n')
+            events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_stream_sends_progress_then_result(client):
+    response = client.post('/price_option/stream', json=dict(PUT, block_size=2000))
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    events = _events(response)
+
+    assert [name for name, _ in events] == ['progress'] * 4 + ['result']
+    assert [data['total_paths'] for _, data in events[:-1]] == [2000, 4000, 6000, 8000]
+    final = events[-1][1]
+    assert final['total_paths'] == 8000
+    assert final['us_option_price'] == events[-2][1]['us_option_price']
+
+
+def test_stream_result_matches_price_option(client):
+    priced = client.post('/price_option', json=PUT).get_json()
+    streamed = _events(client.post('/price_option/stream', json=PUT))[-1][1]
+
+    # The same seeded paths, fitted once as a whole
+    assert streamed['us_option_price'] == pytest.approx(priced['us_option_price'], rel=1e-12)
+    assert streamed['eu_option_price'] == priced['eu_option_price']
+    assert streamed['us_price_se'] == pytest.approx(priced['us_price_se'], rel=1e-9)
+
+
+def test_stream_error_event(client, monkeypatch):
+    broken = TickerData('TEST', 0.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+    monkeypatch.setattr(pricing, 'get_stock_data', lambda ticker: broken)
+    events = _events(client.post('/price_option/stream', json=PUT))
+
+    assert [name for name, _ in events] == ['error']
+    assert 'Invalid stock price' in events[0][1]['error']
+
+
+def test_stream_rejects_small_blocks(client):
+    response = client.post('/price_option/stream', json=dict(PUT, block_size=10))
+    assert response.status_code == 400
+
+
+def test_closing_stream_stops_pricing(client, monkeypatch):
+    finished = threading.Event()
+    outcome = {}
+    price_option_detailed = app_module.price_option_detailed
+
+    def tracked(*args, **kwargs):
+        try:
+            outcome['result'] = price_option_detailed(*args, **kwargs)
+        except BaseException as error:
+            outcome['error'] = error
+            raise
+        finally:
+            finished.set()
+
+    monkeypatch.setattr(app_module, 'price_option_detailed', tracked)
+    response = client.post('/price_option/stream', json=dict(PUT, num_simulations=200000, block_size=1000),
+                           buffered=False)
+    first = next(iter(response.response))
+    assert first.startswith(b'event: progress')
+    response.close()
+
+    assert finished.wait(30)
+    assert isinstance(outcome.get('error'), app_module._StreamClosed)
+    assert 'result' not in outcome
+
+
+def test_price_option_etag_and_not_modified(client, monkeypatch):
+    response = client.post('/price_option', json=PUT)
+    etag, _ = response.get_etag()
+    assert response.status_code == 200 and etag
+    assert response.headers['ETag'].startswith('W/')
+    assert response.headers['Cache-Control'] == f'private, max-age={app_module.RESULT_MAX_AGE_SECONDS}'
+
+    def not_priced(memoized):
+        raise AssertionError('a 304 response was priced')
+
+    monkeypatch.setattr(app_module, 'price_option_memoized', not_priced)
+    cached = client.post('/price_option', json=PUT, headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304 and cached.get_data() == b''
+    assert cached.headers['ETag'] == response.headers['ETag']
+    assert cached.headers['Cache-Control'] == response.headers['Cache-Control']
+
+
+def test_price_option_etag_follows_request_and_market_data(client, monkeypatch):
+    etag = client.post('/price_option', json=PUT).get_etag()[0]
+    assert client.post('/price_option', json=PUT).get_etag()[0] == etag
+
+    # The result key, the representation and the market data version all change the ETag
+    assert client.post('/price_option', json=dict(PUT, strike_price=95.0)).get_etag()[0] != etag
+    assert client.post('/price_option', json=dict(PUT, path_encoding='float32')).get_etag()[0] != etag
+    refreshed = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-02T00:00:00', '2026-01-01T00:00:00')
+    monkeypatch.setattr(pricing, 'get_stock_data', lambda ticker: refreshed)
+    response = client.post('/price_option', json=PUT, headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 200 and response.get_etag()[0] != etag
+
+
+@pytest.mark.parametrize('options', [dict(timings=True), dict(time_budget_ms=200), dict(reuse_policy=True)])
+def test_unmemoized_price_option_has_no_etag(client, options):
+    response = client.post('/price_option', json=dict(PUT, **options))
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers and 'Cache-Control' not in response.headers
+
+
+def test_timed_request_simulates_fresh_paths(client):
+    unseeded = {name: value for name, value in PUT.items() if name != 'seed'}
+    client.post('/price_option', json=unseeded)  # Leaves the RESULT_SEED paths in path_cache
+    timings = client.post('/price_option', json=dict(unseeded, timings=True)).get_json()['timings']
+
+    assert timings['stages_ms'].get('path_generation', 0.0) > 0.0
+    assert timings['paths'] == PUT['num_simulations']
+
+
+OTHER_DATA = TickerData('OTHER', 50.0, 0.4, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+
+@pytest.fixture
+def batch_client(client, monkeypatch):
+    """Client over two tickers, where fetching BAD fails; records market data fetches and path simulations."""
+    fetches, simulations = [], []
+
+    def get_stock_data(ticker):
+        fetches.append(ticker)
+        if ticker == 'BAD':
+            raise RuntimeError('No cached data available for BAD')
+        return {'TEST': STOCK_DATA, 'OTHER': OTHER_DATA}[ticker]
+
+    def simulate_blocks(path_kwargs, *args, **kwargs):
+        simulations.append((path_kwargs['initial_price'], path_kwargs['time_to_expiry']))
+        return simulate(path_kwargs, *args, **kwargs)
+
+    simulate = pricing.simulate_blocks
+    monkeypatch.setattr(pricing, 'get_stock_data', get_stock_data)
+    monkeypatch.setattr(pricing, 'simulate_blocks', simulate_blocks)
+    return client, fetches, simulations
+
+
+def _contract(ticker, option_type, strike_price, time_to_expiry):
+    return dict(ticker=ticker, option_type=option_type, strike_price=strike_price, time_to_expiry=time_to_expiry)
+
+
+def test_batch_reports_errors_per_contract(batch_client):
+    client, _, _ = batch_client
+    contracts = [_contract('TEST', 'put', 100.0, 182.5), _contract('TEST', 'straddle', 100.0, 182.5),
+                 _contract('BAD', 'put', 100.0, 182.5), _contract('TEST', 'call', 100.0, 400),
+                 _contract('OTHER', 'call', 50.0, 91.25)]
+    response = client.post('/price_options', json=dict(contracts=contracts, num_simulations=2000, scheme='qe', seed=3))
+    assert response.status_code == 200
+    results = response.get_json()['results']
+
+    assert len(results) == len(contracts)
+    assert 'Option type' in results[1]['error'] and 'us_option_price' not in results[1]
+    assert results[2]['ticker'] == 'BAD' and 'No cached data' in results[2]['details']
+    assert 'Time to expiry' in results[3]['error']
+    for result, contract in zip([results[0], results[4]], [contracts[0], contracts[4]]):
+        assert 'error' not in result and result['us_option_price'] > 0.0
+        assert {name: result[name] for name in contract} == contract
+
+
+def test_batch_simulates_once_per_ticker_and_expiry(batch_client):
+    client, fetches, simulations = batch_client
+    contracts = [_contract(ticker, option_type, moneyness * spot, days)
+                 for ticker, spot in (('TEST', 100.0), ('OTHER', 50.0))
+                 for days in (91.25, 182.5)
+                 for option_type in ('call', 'put')
+                 for moneyness in (0.9, 1.0)]
+    results = client.post('/price_options', json=dict(contracts=contracts, num_simulations=2000, scheme='qe',
+                                                      seed=3)).get_json()['results']
+
+    assert all('error' not in result for result in results)
+    assert sorted(fetches) == ['OTHER', 'TEST']
+    assert sorted(simulations) == [(50.0, 0.25), (50.0, 0.5), (100.0, 0.25), (100.0, 0.5)]
+
+    # The shared path set is the one a single request with the same seed prices on
+    single = client.post('/price_option', json=dict(PUT, num_simulations=2000)).get_json()
+    batched = next(result for result in results
+                   if (result['ticker'], result['option_type'], result['strike_price'], result['time_to_expiry'])
+                   == ('TEST', 'put', 100.0, 182.5))
+    assert batched['us_option_price'] == pytest.approx(single['us_option_price'], rel=1e-12)
+    assert batched['eu_option_price'] == pytest.approx(single['eu_option_price'], rel=1e-12)
+
+
+def test_batch_rejects_oversized_request(client):
+    contracts = [_contract('TEST', 'put', 100.0, 182.5)] * (app_module.MAX_BATCH_CONTRACTS + 1)
+    assert client.post('/price_options', json=dict(contracts=contracts, num_simulations=2000)).status_code == 400
+    assert client.post('/price_options', json=dict(contracts=[], num_simulations=2000)).status_code == 400
+
+
+@pytest.fixture
+def job_queue(client, monkeypatch):
+    """A fresh single-worker job pool, forked after the market data stub is in place."""
+    queue = app_module.JobQueue(workers=1, max_pending=2)
+    monkeypatch.setattr(app_module, 'pricing_jobs', queue)
+    yield queue
+    queue.shutdown()
+
+
+def _poll(client, status_url, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        payload = client.get(status_url).get_json()
+        if payload['status'] in ('completed', 'failed') or time.monotonic() > deadline:
+            return payload
+        time.sleep(0.05)
+
+
+def test_job_submit_poll_and_result(client, job_queue):
+    response = client.post('/jobs', json=PUT)
+    assert response.status_code == 202
+    submitted = response.get_json()
+    assert response.headers['Location'] == submitted['status_url'] == f"/jobs/{submitted['job_id']}"
+
+    payload = _poll(client, submitted['status_url'])
+    assert payload['status'] == 'completed' and payload['finished_at'] >= payload['submitted_at']
+    priced = client.post('/price_option', json=PUT).get_json()
+    assert payload['result']['us_option_price'] == pytest.approx(priced['us_option_price'], rel=1e-12)
+    assert payload['result']['total_paths'] == PUT['num_simulations']
+
+
+def test_failed_job_reports_error(client, job_queue, monkeypatch):
+    assert client.post('/jobs', json=dict(PUT, num_simulations=0)).status_code == 400  # Rejected before queueing
+
+    def broken(ticker):
+        raise RuntimeError('No cached data available for TEST')
+
+    # The pool is forked on the first queued job, so its worker inherits the failing stub
+    monkeypatch.setattr(pricing, 'get_stock_data', broken)
+    payload = _poll(client, client.post('/jobs', json=PUT).get_json()['status_url'])
+    assert payload['status'] == 'failed' and 'No cached data' in payload['details']
+
+
+def test_job_submission_refused_when_queue_full(client, job_queue):
+    for _ in range(job_queue.max_pending):
+        job_queue.submit(time.sleep, 0.5)
+    response = client.post('/jobs', json=PUT)
+    assert response.status_code == 503 and 'Too many pending jobs' in response.get_json()['error']
+
+
+def test_expired_job_is_not_found(client, job_queue):
+    status_url = client.post('/jobs', json=PUT).get_json()['status_url']
+    assert _poll(client, status_url)['status'] == 'completed'
+    job = job_queue.get(status_url.rsplit('/', 1)[1])
+    job.finished_at -= job_queue.ttl_seconds + 1
+
+    assert client.get(status_url).status_code == 404
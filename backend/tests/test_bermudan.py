@@ -0,0 +1,47 @@
+"""Tests of Bermudan exercise grids and their Richardson extrapolation to the American price."""
+
+import pytest
+
+pytest.importorskip('supabase')
+
+import pricing
+from data.schema import TickerData
+
+STOCK_DATA = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+
+@pytest.fixture
+def price(monkeypatch):
+    """Price the one-year at-the-money put with the vol of vol nearly switched off, so the PDE is a reference."""
+    monkeypatch.setattr(pricing, 'VOL_OF_VOL', 0.01)
+
+    def price(num_sims, **options):
+        pricing.path_cache.clear()
+        return pricing.price_option_detailed('put', 'TEST', 100.0, 1.0, num_sims, scheme='qe', seed=1,
+                                             stock_data=STOCK_DATA, **options)
+    return price
+
+
+def test_price_does_not_decrease_with_exercise_frequency(price):
+    # Nested weekly-grid strides (52, 26, 13 and 1 steps) on the same paths
+    prices = [price(20000, exercise_frequency=frequency).us_price for frequency in (1, 2, 4, 52)]
+    assert prices == sorted(prices)
+    assert prices[-1] == pytest.approx(price(20000).us_price, rel=1e-12)  # Every step is an exercise date
+
+
+def test_richardson_combines_fine_and_coarse_grids(price):
+    fine = price(20000, exercise_frequency=4)
+    coarse = price(20000, exercise_frequency=2)
+    extrapolated = price(20000, exercise_frequency=4, richardson=True)
+    assert extrapolated.us_price == pytest.approx(2.0 * fine.us_price - coarse.us_price, rel=1e-12)
+
+
+def test_richardson_price_is_closer_to_american_reference(price):
+    reference = price(1000, engine='pde').us_price
+    options = dict(exercise_frequency=4, control_variate='black_scholes')
+    fine = price(60000, **options).us_price
+    coarse = price(60000, **dict(options, exercise_frequency=2)).us_price
+    extrapolated = price(60000, richardson=True, **options).us_price
+
+    assert coarse < fine < reference
+    assert abs(extrapolated - reference) < abs(fine - reference)
@@ -0,0 +1,62 @@
+"""Regression tests for the Leisen-Reimer binomial tree."""
+
+import numpy as np
+import pytest
+
+from model.black_scholes import black_scholes
+from model.binomial_tree import leisen_reimer_price
+
+r = 0.05
+
+# American put S = K = 100, T = 1, r = 5%, sigma = 20% (binomial limit)
+AMERICAN_PUT = 6.0904
+
+
+def test_american_put_benchmark():
+    assert leisen_reimer_price('put', 100.0, 100.0, 1.0, 0.2, r) == pytest.approx(AMERICAN_PUT, abs=2e-3)
+    assert leisen_reimer_price('put', 100.0, 100.0, 1.0, 0.2, r, steps=2001) == pytest.approx(AMERICAN_PUT, abs=2e-4)
+
+
+@pytest.mark.parametrize('call_or_put', ['call', 'put'])
+def test_european_matches_black_scholes(call_or_put):
+    price = leisen_reimer_price(call_or_put, 100.0, 100.0, 1.0, 0.2, r, american=False)
+    assert price == pytest.approx(black_scholes(call_or_put, 100.0, 100.0, 1.0, 0.2, r), abs=1e-4)
+
+
+@pytest.mark.parametrize('S', [80.0, 100.0, 120.0])
+@pytest.mark.parametrize('vol', [0.2, 0.4])
+def test_american_put_dominates_european(S, vol):
+    price = leisen_reimer_price('put', S, 100.0, 1.0, vol, r)
+    assert price > black_scholes('put', S, 100.0, 1.0, vol, r)
+    assert price >= max(100.0 - S, 0.0)
+
+
+def test_american_call_without_dividends_is_european():
+    price = leisen_reimer_price('call', 100.0, 100.0, 1.0, 0.2, r)
+    assert price == pytest.approx(black_scholes('call', 100.0, 100.0, 1.0, 0.2, r), abs=1e-4)
+
+
+@pytest.mark.parametrize('call_or_put', ['call', 'put'])
+def test_european_with_dividends_prices_escrowed_spot(call_or_put):
+    dividends = [(0.25, 1.5), (0.75, 1.5)]
+    escrowed = 100.0 - sum(amount * np.exp(-r * time) for time, amount in dividends)
+    price = leisen_reimer_price(call_or_put, 100.0, 100.0, 1.0, 0.2, r, dividends=dividends, american=False)
+    assert price == pytest.approx(black_scholes(call_or_put, escrowed, 100.0, 1.0, 0.2, r), abs=1e-4)
+
+
+def test_american_exercise_with_dividends():
+    dividends = [(0.5, 5.0)]
+    escrowed = 100.0 - 5.0 * np.exp(-r * 0.5)
+    # The dividend still to be paid is added back for exercise, so an in-the-money call is exercised before it
+    call = leisen_reimer_price('call', 100.0, 90.0, 1.0, 0.2, r, dividends=dividends)
+    assert call > black_scholes('call', escrowed, 90.0, 1.0, 0.2, r) + 0.5
+    put = leisen_reimer_price('put', 100.0, 100.0, 1.0, 0.2, r, dividends=dividends)
+    assert black_scholes('put', escrowed, 100.0, 1.0, 0.2, r) < put
+    assert put > leisen_reimer_price('put', 100.0, 100.0, 1.0, 0.2, r)
+
+
+def test_strike_array_matches_scalar_prices():
+    strikes = np.array([90.0, 100.0, 110.0])
+    prices = leisen_reimer_price('put', 100.0, strikes, 1.0, 0.2, r, dividends=[(0.5, 2.0)])
+    np.testing.assert_allclose(prices, [leisen_reimer_price('put', 100.0, K, 1.0, 0.2, r, dividends=[(0.5, 2.0)])
+                                        for K in strikes], rtol=1e-12)
@@ -0,0 +1,126 @@
+"""Tests for the batched implied volatility solver and the American option approximations."""
+
+import numpy as np
+import pytest
+
+from model.black_scholes import (barone_adesi_whaley, bjerksund_stensland, black_scholes_prices,
+                                 implied_volatility)
+
+S, r, q = 100.0, 0.04, 0.01
+
+
+def _quote_grid():
+    """Strikes from deep in to deep out of the money, against maturities and volatilities."""
+    K = np.array([30.0, 50.0, 70.0, 90.0, 100.0, 110.0, 130.0, 160.0, 200.0, 300.0])[:, None, None]
+    T = np.array([0.01, 0.1, 0.5, 1.0, 3.0, 5.0])[None, :, None]
+    vol = np.array([0.05, 0.2, 0.5, 1.0, 1.5])[None, None, :]
+    return np.broadcast_arrays(K, T, vol)
+
+
+@pytest.mark.parametrize('call_or_put', ['call', 'put'])
+def test_round_trip_over_grid(call_or_put):
+    K, T, vol = _quote_grid()
+    prices = black_scholes_prices(call_or_put, S, K, T, vol, r, q)
+    implied = implied_volatility(call_or_put, prices, S, K, T, r, q)
+
+    # The volatility is only identified where the out-of-the-money option of the strike is worth more than rounding
+    forward = S * np.exp((r - q) * T)
+    otm_price = np.where(K >= forward, black_scholes_prices('call', S, K, T, vol, r, q),
+                         black_scholes_prices('put', S, K, T, vol, r, q))
+    identified = otm_price > 1e-6 * S
+    assert identified.sum() > 0.6 * identified.size
+    np.testing.assert_allclose(implied[identified], vol[identified], rtol=0.0, atol=1e-10)
+
+    # Elsewhere any volatility returned must still reproduce the price
+    solved = np.isfinite(implied)
+    repriced = black_scholes_prices(call_or_put, S, K[solved], T[solved], implied[solved], r, q)
+    np.testing.assert_allclose(repriced, prices[solved], rtol=0.0, atol=1e-9)
+
+
+def test_matches_scalar_quotes():
+    implied = implied_volatility(['call', 'put'], [10.450583572185565, 5.573526022256971], 100.0, 100.0, 1.0, 0.05)
+    np.testing.assert_allclose(implied, [0.2, 0.2], atol=1e-12)
+
+
+@pytest.mark.parametrize('call_or_put, price', [
+    ('call', 0.0),                              # No time value above zero
+    ('call', -1.0),
+    ('call', S * np.exp(-q)),                   # At the upper bound S exp(-qT)
+    ('call', 2.0 * S),
+    ('call', S * np.exp(-q) - 80.0 * np.exp(-r)),         # At the lower bound S exp(-qT) - K exp(-rT)
+    ('call', S * np.exp(-q) - 80.0 * np.exp(-r) - 0.01),  # Below it
+    ('put', 0.0),
+    ('put', 80.0 * np.exp(-r)),                 # At the upper bound K exp(-rT)
+    ('put', 100.0),
+])
+def test_prices_outside_no_arbitrage_bounds_are_nan(call_or_put, price):
+    assert np.isnan(implied_volatility(call_or_put, price, S, 80.0, 1.0, r, q))
+
+
+@pytest.mark.parametrize('strike', [101.0, 105.0, 120.0, 140.0])
+def test_in_the_money_put_at_lower_bound_is_nan(strike):
+    price = strike * np.exp(-r) - S * np.exp(-q)
+    assert np.isnan(implied_volatility('put', price, S, strike, 1.0, r, q))
+
+
+def test_invalid_quotes_do_not_affect_the_batch():
+    implied = implied_volatility('call', [-1.0, 10.450583572185565, 200.0], 100.0, 100.0, 1.0, 0.05)
+    assert np.isnan(implied[0]) and np.isnan(implied[2])
+    assert implied[1] == pytest.approx(0.2, abs=1e-12)
+
+
+def test_non_positive_maturity_raises():
+    with pytest.raises(ValueError):
+        implied_volatility('call', 5.0, 100.0, 100.0, [1.0, 0.0], 0.05)
+
+
+# Haug, The Complete Guide to Option Pricing Formulas, Barone-Adesi & Whaley table
+# (K = 100, r = 0.10, cost of carry 0, i.e. q = 0.10): spot -> (T, volatility, call, put)
+BAW_TABLE = [
+    (0.10, 0.15, [0.0206, 1.8771, 10.0089], [10.0000, 1.8770, 0.0410]),
+    (0.10, 0.25, [0.3159, 3.1280, 10.3919], [10.2533, 3.1277, 0.4562]),
+    (0.50, 0.15, [0.8208, 4.0842, 10.8087], [10.5595, 4.0842, 1.0822]),
+]
+
+
+@pytest.mark.parametrize('T, vol, calls, puts', BAW_TABLE)
+def test_barone_adesi_whaley_table(T, vol, calls, puts):
+    spots = np.array([90.0, 100.0, 110.0])
+    np.testing.assert_allclose(barone_adesi_whaley('call', spots, 100.0, T, vol, 0.10, 0.10), calls, atol=5e-3)
+    np.testing.assert_allclose(barone_adesi_whaley('put', spots, 100.0, T, vol, 0.10, 0.10), puts, atol=5e-3)
+
+
+# Longstaff & Schwartz (2001), Table 1 finite-difference American puts (K = 40, r = 0.06):
+# (S, volatility, T, value)
+AMERICAN_PUTS = [
+    (36.0, 0.2, 1.0, 4.478),
+    (36.0, 0.2, 2.0, 4.840),
+    (36.0, 0.4, 1.0, 7.101),
+    (36.0, 0.4, 2.0, 8.508),
+    (40.0, 0.2, 1.0, 2.314),
+    (44.0, 0.2, 1.0, 1.110),
+]
+
+
+@pytest.mark.parametrize('spot, vol, T, value', AMERICAN_PUTS)
+def test_bjerksund_stensland_put_bounds(spot, vol, T, value):
+    # The 2002 approximation is a lower bound on the American price, close below the finite-difference value
+    price = bjerksund_stensland('put', spot, 40.0, T, vol, 0.06)
+    european = black_scholes_prices('put', spot, 40.0, T, vol, 0.06)
+    assert european < price <= value + 5e-4
+    assert price > value - 0.05
+
+
+def test_bjerksund_stensland_improves_on_the_1993_approximation():
+    # Haug, Bjerksund & Stensland (1993) values; the 2002 two-boundary version is never lower
+    call = bjerksund_stensland('call', 42.0, 40.0, 0.75, 0.35, 0.04, 0.08)
+    put = bjerksund_stensland('put', 36.0, 40.0, 1.0, 0.2, 0.06)
+    assert float(call) == pytest.approx(5.2704, abs=0.03) and call >= 5.2704
+    assert float(put) == pytest.approx(4.4531, abs=0.03) and put >= 4.4531
+
+
+def test_american_call_without_dividends_is_european():
+    spots = np.array([80.0, 100.0, 120.0])
+    european = black_scholes_prices('call', spots, 100.0, 0.5, 0.3, 0.05)
+    for approximation in (barone_adesi_whaley, bjerksund_stensland):
+        np.testing.assert_allclose(approximation('call', spots, 100.0, 0.5, 0.3, 0.05), european, rtol=1e-10)
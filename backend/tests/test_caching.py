@@ -0,0 +1,186 @@
+"""Tests for the size-bounded LRU cache and the SingleFlight call coalescing."""
+
+import threading
+
+import numpy as np
+import pytest
+
+import caching
+from caching import LRUCache, SingleFlight
+
+
+class FakeClock:
+    """Stands in for time.monotonic, advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(caching.time, 'monotonic', fake)
+    return fake
+
+
+def test_evicts_least_recently_used_entries_to_fit_bytes():
+    cache = LRUCache(max_size=3000, sizeof=lambda value: value.nbytes)
+    for key in 'abc':
+        cache.put(key, np.zeros(125))  # 1000 bytes each
+    assert cache.get('a') is not None  # b is now least recently used
+
+    cache.put('d', np.zeros(250))  # 2000 bytes: b, then c, make room
+    assert cache.get('b') is None and cache.get('c') is None
+    assert cache.get('a') is not None and cache.get('d') is not None
+    assert cache.size == 3000 and len(cache) == 2
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(max_size=3000, sizeof=lambda value: value.nbytes)
+    cache.put('a', np.zeros(250))
+    cache.put('b', np.zeros(125))
+    cache.put('a', np.zeros(125))
+    assert cache.size == 2000 and len(cache) == 2
+
+    cache.put('c', np.zeros(125))
+    assert len(cache) == 3
+
+
+def test_oversized_value_is_not_cached():
+    cache = LRUCache(max_size=1000, sizeof=lambda value: value.nbytes)
+    cache.put('a', np.zeros(100))
+    cache.put('big', np.zeros(1000))
+    assert cache.get('big') is None
+    assert cache.get('a') is not None and cache.size == 800
+
+
+def test_counts_hits_and_misses():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b', 'missing') == 'missing'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.put('a', 1)
+    clock.now += 30
+    cache.put('b', 2)
+
+    clock.now += 29.9
+    assert cache.get('a') == 1
+    clock.now += 0.1  # a is exactly 60 seconds old
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert len(cache) == 1 and cache.size == 1
+
+    clock.now += 30
+    assert cache.get('b') is None and len(cache) == 0
+
+
+def test_put_refreshes_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.put('a', 1)
+    clock.now += 50
+    cache.put('a', 2)
+    clock.now += 50
+    assert cache.get('a') == 2
+
+
+def test_entries_never_expire_without_ttl(clock):
+    cache = LRUCache(max_size=10)
+    cache.put('a', 1)
+    clock.now += 1e9
+    assert cache.get('a') == 1
+
+
+def _run_concurrently(flight, key, fn, callers, monkeypatch):
+    """
+    Call flight.do(key, fn) from several threads, releasing fn only once every other caller has joined it.
+
+    Joining callers are detected through the shared-call metric, so flight needs a name.
+    Returns the (result, error) of each caller.
+    """
+    shared = threading.Semaphore(0)
+    record = caching.record_coalesced_call
+
+    def record_and_signal(operation, is_shared):
+        record(operation, is_shared)
+        if is_shared:
+            shared.release()
+
+    monkeypatch.setattr(caching, 'record_coalesced_call', record_and_signal)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        assert release.wait(5)
+        return fn()
+
+    outcomes = [None] * callers
+
+    def call(index):
+        try:
+            outcomes[index] = (flight.do(key, blocking), None)
+        except Exception as error:
+            outcomes[index] = (None, error)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    for _ in threads[1:]:
+        assert shared.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_single_flight_coalesces_concurrent_calls(monkeypatch):
+    flight = SingleFlight(name='test')
+    runs = []
+
+    def compute():
+        runs.append(1)
+        return object()
+
+    outcomes = _run_concurrently(flight, 'key', compute, 6, monkeypatch)
+    assert len(runs) == 1
+    results = {id(result) for result, error in outcomes}
+    assert len(results) == 1 and all(error is None for _, error in outcomes)
+    assert len(flight) == 0
+
+
+def test_single_flight_raises_error_in_every_waiter(monkeypatch):
+    flight = SingleFlight(name='test')
+    failure = RuntimeError('fetch failed')
+
+    def fail():
+        raise failure
+
+    outcomes = _run_concurrently(flight, 'key', fail, 4, monkeypatch)
+    assert all(result is None and error is failure for result, error in outcomes)
+    assert len(flight) == 0
+
+    # Nothing is kept after a failure, so the next call runs again
+    assert flight.do('key', lambda: 'recovered') == 'recovered'
+
+
+def test_single_flight_runs_sequential_and_distinct_calls():
+    flight = SingleFlight()
+    runs = []
+
+    def compute(value):
+        runs.append(value)
+        return value * 2
+
+    assert flight.do('a', compute, 1) == 2
+    assert flight.do('a', compute, 1) == 2
+    assert flight.do('b', compute, value=3) == 6
+    assert runs == [1, 1, 3]
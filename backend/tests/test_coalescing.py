@@ -0,0 +1,134 @@
+"""Tests that identical concurrent market data fetches and pricing runs are coalesced into one."""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('supabase')
+
+import caching
+import pricing
+from data import cache as data_cache
+from data.schema import TickerData
+
+CALLERS = 6
+
+STOCK_DATA = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+
+class BlockingStub:
+    """Counts its calls and holds each one until released, so the other callers can join it."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        self.started.set()
+        assert self.release.wait(5)
+        return self.result
+
+
+@pytest.fixture
+def joined(monkeypatch):
+    """Semaphore released each time a caller joins a call already in flight (shared-call metric)."""
+    semaphore = threading.Semaphore(0)
+    record = caching.record_coalesced_call
+
+    def record_and_signal(operation, shared):
+        record(operation, shared)
+        if shared:
+            semaphore.release()
+
+    monkeypatch.setattr(caching, 'record_coalesced_call', record_and_signal)
+    return semaphore
+
+
+def _call_concurrently(fn, arguments, stub, joined):
+    """Run fn(argument) for each argument on its own thread, releasing stub once all but the first have joined."""
+    results = [None] * len(arguments)
+
+    def call(index):
+        results[index] = fn(arguments[index])
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(len(arguments))]
+    threads[0].start()
+    assert stub.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    for _ in threads[1:]:
+        assert joined.acquire(timeout=5)
+    stub.release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_stock_data_requests_share_one_fetch(monkeypatch, joined):
+    fetch = BlockingStub(STOCK_DATA)
+    monkeypatch.setattr(data_cache, '_fetch_stock_data', fetch)
+    data_cache.stock_data_cache.clear()
+
+    tickers = ['test', 'TEST', 'Test'] * (CALLERS // 3)
+    results = _call_concurrently(data_cache.get_stock_data, tickers, fetch, joined)
+
+    assert fetch.calls == [(('TEST',), {})]
+    assert all(result is STOCK_DATA for result in results)
+    assert len(data_cache.stock_data_fetches) == 0
+
+    # The finished fetch is then served in process until it expires; after that a request fetches again
+    assert data_cache.get_stock_data('TEST') is STOCK_DATA
+    assert len(fetch.calls) == 1
+    data_cache.stock_data_cache.clear()
+    data_cache.get_stock_data('TEST')
+    assert len(fetch.calls) == 2
+
+
+@pytest.fixture
+def result_cache():
+    pricing.result_cache.clear()
+    yield pricing.result_cache
+    pricing.result_cache.clear()
+
+
+def test_concurrent_identical_pricing_requests_share_one_run(monkeypatch, joined, result_cache):
+    monkeypatch.setattr(pricing, 'get_stock_data', lambda ticker: STOCK_DATA)
+    priced = pricing.PricingResult(us_price=5.2, eu_price=5.0, us_std=1.0, eu_std=1.0, paths=np.ones((100, 10)),
+                                   volatility=0.3, dividends={}, num_paths=100)
+    run = BlockingStub(priced)
+    monkeypatch.setattr(pricing, 'price_option_detailed', run)
+
+    def price(_):
+        memoized = pricing.memoized_request('put', 'TEST', 100.0, 0.5, num_sims=100, keep_paths=5, scheme='qe')
+        return pricing.price_option_memoized(memoized)
+
+    results = _call_concurrently(price, range(CALLERS), run, joined)
+
+    assert len(run.calls) == 1
+    assert all(result is priced for result in results)
+    assert priced.paths.shape == (5, 10)
+    assert len(pricing.result_runs) == 0 and len(result_cache) == 1
+
+    # The finished result is then served from the result cache
+    assert price(None) is priced
+    assert len(run.calls) == 1
+
+
+def test_different_pricing_requests_run_separately(monkeypatch, result_cache):
+    monkeypatch.setattr(pricing, 'get_stock_data', lambda ticker: STOCK_DATA)
+    runs = []
+
+    def price_option_detailed(*args, **kwargs):
+        runs.append(args)
+        return pricing.PricingResult(us_price=5.2, eu_price=5.0, us_std=1.0, eu_std=1.0, paths=np.ones((10, 10)),
+                                     volatility=0.3, dividends={}, num_paths=10)
+
+    monkeypatch.setattr(pricing, 'price_option_detailed', price_option_detailed)
+    for strike in (90.0, 100.0, 90.0):
+        pricing.price_option_memoized(pricing.memoized_request('put', 'TEST', strike, 0.5, num_sims=10))
+
+    assert [args[2] for args in runs] == [90.0, 100.0]
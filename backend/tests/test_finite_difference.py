@@ -0,0 +1,62 @@
+"""Regression tests for the Crank-Nicolson American and European prices."""
+
+import numpy as np
+import pytest
+
+from model.black_scholes import black_scholes
+from model.finite_difference import FD_METHODS, finite_difference_price
+
+r = 0.05
+
+# American put S = K = 100, T = 1, r = 5%, sigma = 20% (binomial limit)
+AMERICAN_PUT = 6.0904
+
+
+@pytest.mark.parametrize('method', FD_METHODS)
+def test_american_put_benchmark(method):
+    price = finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r, method=method)
+    assert price == pytest.approx(AMERICAN_PUT, abs=2e-3)
+    refined = finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r, method=method, space_steps=1600,
+                                      time_steps=800)
+    assert refined == pytest.approx(AMERICAN_PUT, abs=5e-4)
+    assert abs(refined - AMERICAN_PUT) < abs(price - AMERICAN_PUT)
+
+
+@pytest.mark.parametrize('S', [80.0, 100.0, 120.0])
+@pytest.mark.parametrize('vol', [0.2, 0.4])
+def test_american_put_dominates_european(S, vol):
+    european = black_scholes('put', S, 100.0, 1.0, vol, r)
+    assert finite_difference_price('put', S, 100.0, 1.0, vol, r, american=False) == pytest.approx(european, abs=2e-3)
+    assert finite_difference_price('put', S, 100.0, 1.0, vol, r) > european
+    assert finite_difference_price('put', S, 100.0, 1.0, vol, r) >= max(100.0 - S, 0.0)
+
+
+def test_american_call_without_dividends_is_european():
+    price = finite_difference_price('call', 100.0, 100.0, 1.0, 0.2, r)
+    assert price == pytest.approx(black_scholes('call', 100.0, 100.0, 1.0, 0.2, r), abs=2e-3)
+
+
+@pytest.mark.parametrize('american', [False, True])
+def test_immediate_dividend_lowers_spot(american):
+    # Paid at once, a cash dividend is a spot S - D: the jump condition agrees with the escrowed model
+    with_dividend = finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r, dividends=[(1e-4, 3.0)],
+                                            american=american)
+    assert with_dividend == pytest.approx(finite_difference_price('put', 97.0, 100.0, 1.0, 0.2, r,
+                                                                  american=american), abs=1e-3)
+
+
+def test_dividend_raises_put_and_early_call_exercise():
+    dividends = [(0.5, 5.0)]
+    assert (finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r, dividends=dividends)
+            > finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r))
+    # An in-the-money call is worth exercising just before the ex-dividend date
+    american = finite_difference_price('call', 100.0, 90.0, 1.0, 0.2, r, dividends=dividends)
+    european = finite_difference_price('call', 100.0, 90.0, 1.0, 0.2, r, dividends=dividends, american=False)
+    assert american > european + 0.5
+    # The dividend drops the volatile cum-dividend price, not an escrowed one at the same volatility
+    assert european > black_scholes('call', 100.0 - 5.0 * np.exp(-r * 0.5), 90.0, 1.0, 0.2, r)
+
+
+def test_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        finite_difference_price('put', 100.0, 100.0, 1.0, 0.2, r, method='explicit')
@@ -0,0 +1,110 @@
+"""Tests of the simulated Greeks against bump-and-reprice estimates on common random numbers."""
+
+import numpy as np
+import pytest
+
+from model.greeks import exercise_greeks, spot_tangents
+from model.heston_fourier import heston_price
+from model.heston_model import generate_paths
+from model.longstaff_schwartz import apply_exercise_policy, longstaff_schwartz_cashflows
+
+S0, K, r, T, VOL = 100.0, 100.0, 0.04, 0.5, 0.25
+HESTON = dict(mean_reversion_rate=2.0, vol_of_vol=0.3, correlation=-0.6)
+NUM_SIMS = 50000
+
+
+def _simulate(S=S0, vol=VOL, scheme='qe', seed=5, sensitivities=False):
+    """Heston paths whose volatility parameter sets both the initial and the long-run volatility."""
+    _, paths, *rest = generate_paths(NUM_SIMS, S, r, vol, T, long_term_variance=vol ** 2, rng=seed, scheme=scheme,
+                                     steps_per_year=52, return_sensitivities=sensitivities, **HESTON)
+    return (paths, *rest) if sensitivities else paths
+
+
+def _standard_error(samples):
+    return samples.std() / np.sqrt(len(samples))
+
+
+def _european_put(paths):
+    return np.maximum(K - paths[:, -1], 0.0) * np.exp(-r * T)
+
+
+@pytest.fixture(scope='module', params=['qe', 'euler'])
+def european(request):
+    scheme = request.param
+    paths, vega_tangents, spot_scores = _simulate(scheme=scheme, sensitivities=True)
+    payoffs = _european_put(paths)
+    samples = exercise_greeks('put', paths, np.full(NUM_SIMS, paths.shape[1] - 1),
+                              np.where(payoffs > 0, np.exp(-r * T), 0.0), spot_tangents(paths), vega_tangents,
+                              spot_scores)
+    price = lambda **bump: _european_put(_simulate(scheme=scheme, **bump)).mean()
+    return samples, payoffs * spot_scores / S0, price
+
+
+def test_european_pathwise_delta_matches_bump(european):
+    samples, _, price = european
+    bumped = (price(S=S0 + 0.5) - price(S=S0 - 0.5)) / 1.0
+    assert samples['delta'].mean() == pytest.approx(bumped, abs=_standard_error(samples['delta']))
+
+
+def test_european_likelihood_ratio_delta_matches_bump(european):
+    samples, likelihood_ratio, price = european
+    bumped = (price(S=S0 + 0.5) - price(S=S0 - 0.5)) / 1.0
+    assert likelihood_ratio.mean() == pytest.approx(bumped, abs=3.0 * _standard_error(likelihood_ratio))
+    # Both estimators target the same delta; the pathwise one is far less noisy
+    assert _standard_error(samples['delta']) < 0.2 * _standard_error(likelihood_ratio)
+
+
+def test_european_pathwise_vega_matches_bump(european):
+    samples, _, price = european
+    bumped = (price(vol=VOL + 0.005) - price(vol=VOL - 0.005)) / 0.01
+    assert samples['vega'].mean() == pytest.approx(bumped, abs=_standard_error(samples['vega']))
+
+
+def test_european_gamma_matches_second_difference(european):
+    samples, _, price = european
+    bumped = (price(S=S0 + 2.0) - 2.0 * price() + price(S=S0 - 2.0)) / 4.0
+    assert samples['gamma'].mean() == pytest.approx(bumped, abs=3.0 * _standard_error(samples['gamma']))
+
+
+def test_american_greeks_match_bump_with_fixed_policy():
+    # The exercise rule is fitted on independent paths and held fixed under the bumps
+    _, _, policy = longstaff_schwartz_cashflows(_simulate(seed=1), K, r, T, 'put', return_stopping_times=True,
+                                                return_policy=True)
+    paths, vega_tangents, spot_scores = _simulate(sensitivities=True)
+    cashflows, stopping_steps = apply_exercise_policy(paths, policy, return_stopping_times=True)
+    discount = np.where(cashflows > 0, np.exp(-r * T / paths.shape[1]) ** stopping_steps, 0.0)
+    samples = exercise_greeks('put', paths, stopping_steps, discount, spot_tangents(paths), vega_tangents,
+                              spot_scores)
+    price = lambda **bump: apply_exercise_policy(_simulate(**bump), policy).mean()
+
+    bumped_delta = (price(S=S0 + 0.5) - price(S=S0 - 0.5)) / 1.0
+    bumped_vega = (price(vol=VOL + 0.005) - price(vol=VOL - 0.005)) / 0.01
+    assert samples['delta'].mean() == pytest.approx(bumped_delta, abs=3.0 * _standard_error(samples['delta']))
+    assert samples['vega'].mean() == pytest.approx(bumped_vega, abs=3.0 * _standard_error(samples['vega']))
+    # Early exercise makes the American put more sensitive to spot than the European one
+    assert samples['delta'].mean() < (_european_put(_simulate(S=S0 + 0.5)).mean()
+                                      - _european_put(_simulate(S=S0 - 0.5)).mean())
+
+
+def test_priced_european_greeks_match_semi_analytic_bumps():
+    pytest.importorskip('supabase')
+    import pricing
+    from data.schema import TickerData
+
+    stock_data = TickerData('TEST', S0, VOL, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+    result = pricing.price_option_detailed('put', 'TEST', K, T, 40000, scheme='qe', seed=9, greeks=True,
+                                           stock_data=stock_data)
+    params = dict(mean_reversion_rate=pricing.MEAN_REVERSION_RATE, vol_of_vol=pricing.VOL_OF_VOL,
+                  correlation=pricing.CORRELATION)
+
+    def exact(S=S0, vol=VOL):
+        return heston_price('put', S, K, T, pricing.RISK_FREE_RATE, initial_volatility=vol,
+                            long_term_variance=vol ** 2, **params)
+
+    greeks, errors = result.greeks['eu'], result.greeks['eu_se']
+    assert greeks['delta'] == pytest.approx((exact(S=S0 + 0.01) - exact(S=S0 - 0.01)) / 0.02,
+                                            abs=3.0 * errors['delta'])
+    assert greeks['vega'] == pytest.approx((exact(vol=VOL + 1e-4) - exact(vol=VOL - 1e-4)) / 2e-4,
+                                           abs=3.0 * errors['vega'])
+    assert greeks['gamma'] == pytest.approx((exact(S=S0 + 0.5) - 2.0 * exact() + exact(S=S0 - 0.5)) / 0.25,
+                                            abs=3.0 * errors['gamma'])
@@ -0,0 +1,76 @@
+"""Regression tests for the semi-analytic Heston European prices."""
+
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+from model.heston_fourier import heston_price
+
+
+def _reference_call(S, K, T, r, v0, kappa, theta, xi, rho):
+    """
+    Heston (1993) call price S * P1 - K * exp(-rT) * P2, each probability integrated with adaptive quadrature.
+
+    Uses its own characteristic function of ln S_T, independent of model.heston_fourier.
+    """
+    def log_price_cf(u):
+        d = np.sqrt((rho * xi * 1j * u - kappa) ** 2 + xi ** 2 * (1j * u + u ** 2))
+        g = (kappa - rho * xi * 1j * u - d) / (kappa - rho * xi * 1j * u + d)
+        C = (r * 1j * u * T + kappa * theta / xi ** 2
+             * ((kappa - rho * xi * 1j * u - d) * T - 2.0 * np.log((1.0 - g * np.exp(-d * T)) / (1.0 - g))))
+        D = (kappa - rho * xi * 1j * u - d) / xi ** 2 * (1.0 - np.exp(-d * T)) / (1.0 - g * np.exp(-d * T))
+        return np.exp(C + D * v0 + 1j * u * np.log(S))
+
+    def probability(shift):
+        normalization = log_price_cf(-1j * shift)
+        integral, _ = quad(lambda u: (np.exp(-1j * u * np.log(K)) * log_price_cf(u - 1j * shift)
+                                      / (1j * u * normalization)).real, 0.0, np.inf, limit=500, epsabs=1e-12)
+        return 0.5 + integral / np.pi
+
+    return S * probability(1.0) - K * np.exp(-r * T) * probability(0.0)
+
+
+def test_published_benchmark():
+    # Fang & Oosterlee (2008), Heston test: reference call value 5.785155450
+    price = heston_price('call', 100.0, 100.0, 1.0, 0.0, initial_volatility=np.sqrt(0.0175),
+                         mean_reversion_rate=1.5768, vol_of_vol=0.5751, long_term_variance=0.0398,
+                         correlation=-0.5711)
+    assert price == pytest.approx(5.785155450, abs=1e-7)
+
+
+@pytest.mark.parametrize('T', [0.05, 0.5, 2.0])
+def test_matches_quadrature_reference(T):
+    params = dict(initial_volatility=0.3, mean_reversion_rate=5.0, vol_of_vol=0.2, long_term_variance=0.09,
+                  correlation=-0.7)
+    strikes = np.array([70.0, 90.0, 100.0, 110.0, 140.0])
+    prices = heston_price('call', 100.0, strikes, T, 0.04, **params)
+    reference = [_reference_call(100.0, K, T, 0.04, 0.09, 5.0, 0.09, 0.2, -0.7) for K in strikes]
+
+    np.testing.assert_allclose(prices, reference, rtol=1e-6, atol=1e-8)
+
+
+def test_put_call_parity():
+    params = dict(initial_volatility=0.25, mean_reversion_rate=2.0, vol_of_vol=0.6, long_term_variance=0.04,
+                  correlation=-0.5)
+    strikes = np.linspace(60.0, 160.0, 11)
+    S, T, r = 100.0, 0.75, 0.05
+    calls = heston_price('call', S, strikes, T, r, **params)
+    puts = heston_price('put', S, strikes, T, r, **params)
+
+    np.testing.assert_allclose(calls - puts, S - strikes * np.exp(-r * T), atol=1e-9)
+
+
+def test_strike_array_matches_scalar_prices():
+    params = dict(initial_volatility=0.2, mean_reversion_rate=5.0, vol_of_vol=0.2, long_term_variance=0.04,
+                  correlation=-0.7)
+    strikes = [80.0, 100.0, 125.0]
+    prices = heston_price('put', 100.0, np.array(strikes), 0.5, 0.03, **params)
+
+    assert isinstance(heston_price('put', 100.0, 100.0, 0.5, 0.03, **params), float)
+    np.testing.assert_allclose(prices, [heston_price('put', 100.0, K, 0.5, 0.03, **params) for K in strikes],
+                               rtol=1e-13)
+
+
+def test_rejects_unknown_option_type():
+    with pytest.raises(ValueError):
+        heston_price('straddle', 100.0, 100.0, 1.0, 0.0, 0.2, 1.0, 0.3, 0.04, -0.5)
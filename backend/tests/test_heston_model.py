@@ -0,0 +1,140 @@
+"""Moment and price tests of the Heston path generators, pseudo-random and randomized QMC."""
+
+import numpy as np
+import pytest
+
+from model.heston_fourier import heston_price
+from model.heston_model import (
+    _make_qe_step, brownian_bridge_increments, generate_paths, generate_qmc_paths, num_time_steps,
+    sobol_bridge_normals
+)
+from model.mc_statistics import mc_estimate
+
+S0, r, T = 100.0, 0.04, 1.0
+NUM_SIMS = 100000
+
+# The service's parameters, and a set far outside the Feller condition (2 * kappa * theta << xi^2)
+# where the variance spends a lot of time near zero
+HESTON_PARAMS = {
+    'default': dict(initial_volatility=0.25, mean_reversion_rate=5.0, vol_of_vol=0.2, long_term_variance=0.0625,
+                    correlation=-0.7),
+    'feller_violated': dict(initial_volatility=0.2, mean_reversion_rate=0.5, vol_of_vol=1.0,
+                            long_term_variance=0.04, correlation=-0.9),
+}
+
+# QE on its weekly grid and on a monthly one; floored Euler needs its daily grid and the Feller condition
+SCHEMES = [('qe', 52, 'default'), ('qe', 52, 'feller_violated'), ('qe', 12, 'default'),
+           ('qe', 12, 'feller_violated'), ('euler', 252, 'default')]
+
+
+def _standard_error(samples):
+    return samples.std() / np.sqrt(len(samples))
+
+
+@pytest.mark.parametrize('scheme, steps_per_year, params', SCHEMES)
+def test_discounted_price_is_a_martingale(scheme, steps_per_year, params):
+    _, paths = generate_paths(NUM_SIMS, S0, r, time_to_expiry=T, rng=1, scheme=scheme, steps_per_year=steps_per_year,
+                              **HESTON_PARAMS[params])
+    terminal = paths[:, -1]
+    assert terminal.mean() == pytest.approx(S0 * np.exp(r * T), abs=3.0 * _standard_error(terminal))
+
+
+def test_dividend_lowers_forward_by_its_future_value():
+    num_steps = num_time_steps(T, 52)
+    dividend_days = np.zeros(num_steps)
+    dividend_days[20] = 2.0
+    time_points, paths = generate_paths(NUM_SIMS, S0, r, time_to_expiry=T, rng=2, scheme='qe', steps_per_year=52,
+                                        dividend_days=dividend_days, **HESTON_PARAMS['default'])
+    terminal = paths[:, -1]
+    forward = S0 * np.exp(r * T) - 2.0 * np.exp(r * (T - time_points[20]))
+    assert terminal.mean() == pytest.approx(forward, abs=3.0 * _standard_error(terminal))
+
+
+@pytest.mark.parametrize('params', sorted(HESTON_PARAMS))
+@pytest.mark.parametrize('steps_per_year', [52, 4])
+def test_qe_variance_matches_cir_moments(params, steps_per_year):
+    p = HESTON_PARAMS[params]
+    kappa, theta, xi = p['mean_reversion_rate'], p['long_term_variance'], p['vol_of_vol']
+    v0 = p['initial_volatility'] ** 2
+    num_steps = num_time_steps(T, steps_per_year)
+    dt = T / (num_steps - 1)
+    step = _make_qe_step(NUM_SIMS, dt, r, kappa, xi, theta, p['correlation'])
+
+    rng = np.random.default_rng(3)
+    prices, next_prices = np.full(NUM_SIMS, S0), np.empty(NUM_SIMS)
+    variance = np.full(NUM_SIMS, v0)
+    for _ in range(num_steps - 1):
+        asset_normals, vol_normals = rng.standard_normal((2, NUM_SIMS))
+        step(prices, next_prices, variance, asset_normals, vol_normals)
+        prices, next_prices = next_prices, prices
+
+    # QE matches the conditional mean and variance of each step exactly, so the CIR moments hold on any grid
+    decay = np.exp(-kappa * T)
+    mean = theta + (v0 - theta) * decay
+    var = v0 * xi ** 2 * decay * (1.0 - decay) / kappa + theta * xi ** 2 * (1.0 - decay) ** 2 / (2.0 * kappa)
+    assert (variance >= 0.0).all()
+    assert variance.mean() == pytest.approx(mean, abs=3.0 * _standard_error(variance))
+    squared_deviations = (variance - mean) ** 2
+    assert squared_deviations.mean() == pytest.approx(var, abs=3.0 * _standard_error(squared_deviations))
+
+
+@pytest.mark.parametrize('scheme, steps_per_year, params', SCHEMES[:2] + SCHEMES[-1:])
+def test_simulated_european_prices_match_lewis(scheme, steps_per_year, params):
+    p = HESTON_PARAMS[params]
+    _, paths = generate_paths(NUM_SIMS, S0, r, time_to_expiry=T, rng=4, scheme=scheme, steps_per_year=steps_per_year,
+                              **p)
+    strikes = np.array([90.0, 100.0, 110.0])
+    for call_or_put, sign in (('call', 1.0), ('put', -1.0)):
+        payoffs = np.maximum(sign * (paths[:, -1:] - strikes), 0.0) * np.exp(-r * T)
+        exact = heston_price(call_or_put, S0, strikes, T, r, **p)
+        np.testing.assert_array_less(np.abs(payoffs.mean(axis=0) - exact),
+                                     3.0 * payoffs.std(axis=0) / np.sqrt(NUM_SIMS))
+
+
+@pytest.mark.parametrize('num_increments', [1, 12, 52])
+def test_brownian_bridge_is_orthonormal(num_increments):
+    # Rows are the increments produced by each unit normal: independent standard normals must map
+    # to independent standard normal increments, i.e. the bridge matrix is orthogonal
+    bridge = brownian_bridge_increments(np.eye(num_increments))
+    np.testing.assert_allclose(bridge @ bridge.T, np.eye(num_increments), atol=1e-12)
+    np.testing.assert_allclose(bridge.sum(axis=1)[0], np.sqrt(num_increments))  # First normal sets W_T
+
+
+def test_sobol_bridge_normals_are_independent_standard_normals():
+    normals = sobol_bridge_normals(4096, 16, rng=1)
+    assert normals.shape == (16, 2, 4096)
+    dimensions = normals.reshape(32, -1)
+    np.testing.assert_allclose(dimensions.mean(axis=1), 0.0, atol=0.005)
+    np.testing.assert_allclose(dimensions.std(axis=1), 1.0, atol=0.005)
+    np.testing.assert_allclose(np.corrcoef(dimensions), np.eye(32), atol=0.02)
+
+
+QMC_KWARGS = dict(initial_price=S0, risk_free_rate=r, time_to_expiry=T, scheme='qe', **HESTON_PARAMS['default'])
+
+
+def _qmc_put(seed, num_sims, replications, steps_per_year=52):
+    _, paths = generate_qmc_paths(num_sims, seed=seed, steps_per_year=steps_per_year, replications=replications,
+                                  **QMC_KWARGS)
+    return mc_estimate(np.maximum(100.0 - paths[:, -1], 0.0) * np.exp(-r * T), replications=replications)
+
+
+def test_qmc_replications_give_a_calibrated_error():
+    # Replications are scrambled independently, so the reported error matches the spread across runs;
+    # correlated replications would make it too small
+    estimates = np.array([_qmc_put(seed, 256, 8, steps_per_year=12) for seed in range(40)])
+    spread = estimates[:, 0].std(ddof=1)
+    assert 0.7 < spread / np.sqrt(np.mean(estimates[:, 1] ** 2)) < 1.4
+
+    _, paths = generate_qmc_paths(256, seed=0, steps_per_year=12, replications=4, **QMC_KWARGS)
+    replications = np.sort(paths[:, -1].reshape(4, -1), axis=1)
+    assert all(not np.array_equal(replications[0], other) for other in replications[1:])
+
+
+def test_qmc_error_is_below_plain_monte_carlo_for_the_same_budget():
+    exact = heston_price('put', S0, 100.0, T, r, **HESTON_PARAMS['default'])
+    price, error = _qmc_put(1, 1024, 8)
+    _, paths = generate_paths(8192, rng=1, steps_per_year=52, **QMC_KWARGS)
+    _, plain_error = mc_estimate(np.maximum(100.0 - paths[:, -1], 0.0) * np.exp(-r * T))
+
+    assert error < 0.25 * plain_error
+    assert price == pytest.approx(exact, abs=3.0 * error)
@@ -0,0 +1,100 @@
+"""Tests of the asynchronous job queue and its worker processes."""
+
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('supabase')
+
+import jobs
+import pricing
+
+
+def _path_cache_state():
+    """Job body reporting the worker's path cache budget and contents."""
+    return pricing.path_cache.max_size, len(pricing.path_cache)
+
+
+@pytest.fixture
+def queue_factory():
+    queues = []
+
+    def make(**kwargs):
+        queues.append(jobs.JobQueue(**{'workers': 1, **kwargs}))
+        return queues[-1]
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def test_path_cache_budget_comes_from_environment():
+    env = dict(os.environ, PATH_CACHE_MAX_BYTES=str(1024 ** 2))
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = 'import pricing; print(pricing.PATH_CACHE_MAX_BYTES, pricing.path_cache.max_size)'
+    output = subprocess.run([sys.executable, '-c', script], cwd=backend, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.split() == [str(1024 ** 2)] * 2
+
+
+def test_job_workers_use_their_own_path_cache_budget(queue_factory):
+    pricing.path_cache.put('inherited', pricing.PathSet(np.ones((10, 10)), np.ones(10), 10))
+    try:
+        assert queue_factory().submit(_path_cache_state).future.result(30) == (jobs.JOB_PATH_CACHE_MAX_BYTES, 0)
+        assert queue_factory(path_cache_max_bytes=2048).submit(_path_cache_state).future.result(30) == (2048, 0)
+    finally:
+        pricing.path_cache.clear()
+    assert jobs.JOB_PATH_CACHE_MAX_BYTES == 0
+
+
+def test_job_lifecycle(queue_factory):
+    queue = queue_factory()
+    job = queue.submit(pow, 2, 10, context='request')
+    assert job.status in ('queued', 'running', 'completed')
+    assert job.future.result(30) == 1024
+
+    assert queue.get(job.id) is job and job.status == 'completed' and job.context == 'request'
+    assert job.finished_at >= job.submitted_at
+    assert queue.get('unknown') is None
+
+    failed = queue.submit(divmod, 1, 0)
+    with pytest.raises(ZeroDivisionError):
+        failed.future.result(30)
+    assert failed.status == 'failed'
+
+
+def test_submit_refuses_beyond_max_pending(queue_factory):
+    queue = queue_factory(max_pending=2)
+    running = [queue.submit(time.sleep, 0.5) for _ in range(2)]
+    with pytest.raises(jobs.JobQueueFull):
+        queue.submit(pow, 2, 10)
+    assert len(queue) == 2
+
+    # Finished jobs no longer count as pending
+    for job in running:
+        job.future.result(30)
+    assert queue.submit(pow, 2, 10).future.result(30) == 1024
+
+
+def test_finished_jobs_expire_after_ttl(queue_factory):
+    queue = queue_factory(ttl_seconds=60)
+    job = queue.submit(pow, 2, 10)
+    job.future.result(30)
+    _wait_for_finish(job)
+
+    job.finished_at -= 59
+    assert queue.get(job.id) is job
+    job.finished_at -= 2
+    assert queue.get(job.id) is None and len(queue) == 0
+
+
+def _wait_for_finish(job, timeout=5.0):
+    """Wait for the done callback that stamps finished_at (it runs just after the result is set)."""
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
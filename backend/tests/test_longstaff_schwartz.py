@@ -0,0 +1,127 @@
+"""Tests for the Longstaff-Schwartz backward induction and for exporting its exercise policies to other paths."""
+
+import numpy as np
+import pytest
+
+from model.heston_model import generate_paths
+from model.longstaff_schwartz import apply_exercise_policy, bermudan_exercise_steps, longstaff_schwartz_cashflows
+
+K, R, T, VOLATILITY = 100.0, 0.04, 0.5, 0.3
+
+
+def _paths(num_sims, seed):
+    """Heston paths on a weekly grid, (num_sims, num_steps)."""
+    _, paths = generate_paths(num_sims, initial_price=100.0, risk_free_rate=R, initial_volatility=VOLATILITY,
+                              time_to_expiry=T, mean_reversion_rate=5.0, vol_of_vol=0.2,
+                              long_term_variance=VOLATILITY ** 2, correlation=-0.7, rng=seed, scheme='qe',
+                              steps_per_year=52)
+    return np.ascontiguousarray(paths)
+
+
+def _fit(paths, **options):
+    return longstaff_schwartz_cashflows(paths, K, R, T, option_type=options.pop('option_type', 'put'),
+                                        volatility=VOLATILITY, return_stopping_times=True, return_policy=True,
+                                        **options)
+
+
+def _reference_cashflows(S, option_type, dividend_present_val=None):
+    """
+    Full-matrix Longstaff-Schwartz backward induction, as originally implemented.
+
+    Keeps the (num_sims, num_steps) cashflow matrix, zeroing a path's later cashflows
+    when it exercises, and regresses on a quadratic in S with np.polyfit.
+    """
+    num_sims, num_steps = S.shape
+    df = np.exp(-R * T / num_steps)
+    if option_type == 'put':
+        exercise_value = np.maximum(K - S, 0.0)
+    else:
+        exercise_value = S - K
+        if dividend_present_val is not None:
+            exercise_value = exercise_value + dividend_present_val[:, np.newaxis]
+        exercise_value = np.maximum(exercise_value, 0.0)
+
+    cashflow = np.zeros_like(exercise_value)
+    cashflow[:, -1] = exercise_value[:, -1]
+    for t in range(num_steps - 2, -1, -1):
+        itm = exercise_value[:, t] > 0
+        continuation_value = np.zeros(np.count_nonzero(itm))
+        if np.count_nonzero(itm) > 0:
+            continuation_value = np.polyval(np.polyfit(S[itm, t], cashflow[itm, t + 1] * df, 2), S[itm, t])
+        exercise = np.zeros(num_sims, dtype=bool)
+        exercise[itm] = exercise_value[itm, t] > continuation_value
+        cashflow[exercise, t] = exercise_value[exercise, t]
+        cashflow[exercise, t + 1:] = 0.0
+        held = cashflow[:, t] == 0
+        cashflow[held, t] = cashflow[held, t + 1] * df
+    return cashflow[:, 0]
+
+
+@pytest.mark.filterwarnings('ignore:Polyfit may be poorly conditioned')
+@pytest.mark.parametrize('option_type, dividend', [('put', 0.0), ('call', 0.0), ('call', 3.0)])
+def test_stopping_time_induction_matches_full_matrix(option_type, dividend):
+    paths = _paths(4000, seed=7)
+    dividend_present_val = np.full(len(paths), dividend) if dividend else None
+    cashflows, stopping_steps = longstaff_schwartz_cashflows(paths, K, R, T, option_type, dividend_present_val,
+                                                             return_stopping_times=True)
+    reference = _reference_cashflows(paths, option_type, dividend_present_val)
+
+    np.testing.assert_allclose(cashflows, reference, rtol=1e-10, atol=1e-12)
+    assert cashflows.mean() == pytest.approx(reference.mean(), rel=1e-12)
+    # Each cashflow is the exercise value at the path's stopping step, discounted from that step
+    rows = np.arange(len(paths))
+    exercise_value = paths[rows, stopping_steps] - K if option_type == 'call' else K - paths[rows, stopping_steps]
+    if dividend_present_val is not None:
+        exercise_value += dividend_present_val
+    paid = cashflows > 0
+    np.testing.assert_allclose(cashflows[paid], exercise_value[paid] * np.exp(-R * T / paths.shape[1])
+                               ** stopping_steps[paid], rtol=1e-12)
+
+
+@pytest.mark.parametrize('options', [
+    dict(),
+    dict(option_type='call'),
+    dict(basis='laguerre'),
+    dict(basis='european'),
+    dict(itm_only=False),
+    dict(exercise_stride=4),
+])
+def test_policy_reproduces_in_sample_cashflows(options):
+    paths = _paths(4000, seed=1)
+    if 'exercise_stride' in options:
+        # Bermudan: exercise every few steps only
+        options['exercise_steps'] = bermudan_exercise_steps(paths.shape[1], options.pop('exercise_stride'))
+    cashflows, stopping_steps, policy = _fit(paths, **options)
+    applied, applied_steps = apply_exercise_policy(paths, policy, return_stopping_times=True)
+
+    np.testing.assert_array_equal(applied_steps, stopping_steps)
+    np.testing.assert_allclose(applied, cashflows, rtol=1e-12, atol=1e-12)
+
+
+def test_policy_reproduces_in_sample_cashflows_with_dividends():
+    paths = _paths(4000, seed=2)
+    dividend_present_val = np.full(len(paths), 1.5)
+    cashflows, stopping_steps, policy = _fit(paths, option_type='call', dividend_present_val=dividend_present_val)
+    applied, applied_steps = apply_exercise_policy(paths, policy, dividend_present_val, return_stopping_times=True)
+
+    np.testing.assert_array_equal(applied_steps, stopping_steps)
+    np.testing.assert_allclose(applied, cashflows, rtol=1e-12, atol=1e-12)
+
+
+def test_out_of_sample_price_is_not_above_refit_price():
+    cashflows, _, policy = _fit(_paths(20000, seed=3))
+    fresh = _paths(20000, seed=4)
+    out_of_sample = apply_exercise_policy(fresh, policy)
+    refit = longstaff_schwartz_cashflows(fresh, K, R, T, option_type='put')
+
+    standard_error = np.hypot(out_of_sample.std(ddof=1), refit.std(ddof=1)) / np.sqrt(len(fresh))
+    assert out_of_sample.mean() <= refit.mean() + 3 * standard_error
+    # A sub-optimal rule, but still a good one: within a few cents of the refit price
+    assert out_of_sample.mean() > refit.mean() - 0.1
+    assert cashflows.mean() > 0
+
+
+def test_policy_rejects_paths_on_another_grid():
+    _, _, policy = _fit(_paths(500, seed=5))
+    with pytest.raises(ValueError):
+        apply_exercise_policy(_paths(500, seed=6)[:, :-1], policy)
@@ -0,0 +1,81 @@
+"""Tests of the market data lookup: the in-process copy of recent reads and write-back of refreshed data only."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('supabase')
+
+import caching
+from data import cache as data_cache
+from data.schema import APILimits, TickerData
+
+STOCK_DATA = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+    data_cache.stock_data_cache.clear()
+    yield now
+    data_cache.stock_data_cache.clear()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Stands in for the Supabase table: one stored row per ticker, with the upserts recorded."""
+    rows, upserts = {}, []
+    monkeypatch.setattr(data_cache, '_get_cached_data', lambda ticker: rows.get(ticker))
+    monkeypatch.setattr(data_cache, '_upsert_stock_data', lambda **row: upserts.append(row))
+    monkeypatch.setattr(data_cache, 'api_limits', APILimits())
+    return rows, upserts
+
+
+def _row(price_age_days, dividend_age_days=1):
+    now = datetime.now()
+    return {'price': 100.0, 'volatility': 0.3, 'dividend_json': {'schedule': [['2026-12-01', 0.5]]},
+            'last_price_update': (now - timedelta(days=price_age_days)).isoformat(),
+            'last_dividend_update': (now - timedelta(days=dividend_age_days)).isoformat()}
+
+
+def test_repeated_lookups_are_served_in_process(monkeypatch, clock):
+    fetches = []
+    monkeypatch.setattr(data_cache, '_fetch_stock_data', lambda ticker: fetches.append(ticker) or STOCK_DATA)
+
+    assert data_cache.get_stock_data('test') is STOCK_DATA
+    clock[0] += data_cache.STOCK_DATA_TTL_SECONDS - 1
+    assert data_cache.get_stock_data('TEST') is STOCK_DATA
+    assert fetches == ['TEST']
+
+    clock[0] += 1
+    data_cache.get_stock_data('TEST')
+    assert fetches == ['TEST', 'TEST']
+
+
+def test_fresh_read_is_not_written_back(monkeypatch, store):
+    rows, upserts = store
+    rows['TEST'] = _row(price_age_days=0)
+
+    def no_fetch(ticker):
+        raise AssertionError('fresh data fetched from the provider')
+
+    monkeypatch.setattr(data_cache.twelve_provider, 'get_closing_prices', no_fetch)
+    stock_data = data_cache._fetch_stock_data('TEST')
+
+    assert upserts == []
+    assert (stock_data.price, stock_data.volatility) == (100.0, 0.3)
+    assert stock_data.last_price_update == rows['TEST']['last_price_update']
+
+
+def test_stale_price_is_refreshed_and_written_back(monkeypatch, store):
+    rows, upserts = store
+    rows['TEST'] = _row(price_age_days=3)
+    prices = [('2026-10-14', 100.0), ('2026-10-15', 101.0), ('2026-10-16', 99.5), ('2026-10-17', 102.0)]
+    monkeypatch.setattr(data_cache.twelve_provider, 'get_closing_prices', lambda ticker: prices)
+    stock_data = data_cache._fetch_stock_data('TEST')
+
+    assert stock_data.price == 102.0
+    assert [(row['ticker'], row['price']) for row in upserts] == [('TEST', 102.0)]
+    assert upserts[0]['last_price_update'] == stock_data.last_price_update != rows['TEST']['last_price_update']
+    assert upserts[0]['last_dividend_update'] == rows['TEST']['last_dividend_update']
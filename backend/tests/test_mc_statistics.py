@@ -0,0 +1,86 @@
+"""Tests for the online Monte Carlo statistics in model.mc_statistics."""
+
+import numpy as np
+
+from model.mc_statistics import RunningCovariance, RunningMoments, mc_estimate
+
+
+def _blocks(values, sizes):
+    """Split values into consecutive blocks of the given sizes."""
+    return np.split(values, np.cumsum(sizes)[:-1])
+
+
+def test_running_moments_merge_matches_numpy():
+    values = np.random.default_rng(0).lognormal(mean=3.0, sigma=0.8, size=10_000)
+    merged = RunningMoments()
+    for block in _blocks(values, [1, 999, 2500, 3, 6497]):
+        merged.merge(RunningMoments().update(block))
+
+    assert merged.count == len(values)
+    np.testing.assert_allclose(merged.mean, np.mean(values), rtol=1e-12)
+    np.testing.assert_allclose(merged.variance, np.var(values, ddof=1), rtol=1e-10)
+    np.testing.assert_allclose(merged.std, np.std(values), rtol=1e-10)
+    np.testing.assert_allclose(merged.standard_error, np.std(values, ddof=1) / np.sqrt(len(values)), rtol=1e-10)
+
+
+def test_running_moments_merge_is_stable_with_large_offset():
+    # A naive sum-of-squares variance loses every digit here
+    values = 1e9 + np.random.default_rng(1).normal(size=4000)
+    merged = RunningMoments()
+    for block in _blocks(values, [1000] * 4):
+        merged.update(block)
+
+    np.testing.assert_allclose(merged.variance, np.var(values, ddof=1), rtol=1e-6)
+
+
+def test_running_moments_single_batch_is_exact_and_empty_batches_are_ignored():
+    values = np.arange(10.0)
+    moments = RunningMoments().update(values).update(np.array([]))
+
+    assert (moments.count, moments.mean) == (10, values.mean())
+    assert moments.m2 == np.square(values - values.mean()).sum()
+
+
+def test_running_covariance_merge_matches_numpy_cov():
+    rng = np.random.default_rng(2)
+    control = rng.normal(size=6000)
+    samples = np.column_stack([2.0 + 0.7 * control + 0.3 * rng.normal(size=6000), control])
+    merged = RunningCovariance()
+    for block in _blocks(samples, [17, 1983, 4000]):
+        merged.merge(RunningCovariance().update(block))
+
+    assert merged.count == len(samples)
+    np.testing.assert_allclose(merged.mean, samples.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(merged.comoment / (merged.count - 1), np.cov(samples, rowvar=False), rtol=1e-10)
+
+
+def test_control_variate_beta_matches_numpy_cov():
+    rng = np.random.default_rng(3)
+    control_mean = 1.5
+    control = control_mean + rng.normal(size=5000)
+    target = 4.0 + 1.3 * control + 0.2 * rng.normal(size=5000)
+    cov = np.cov(target, control)
+    beta = cov[0, 1] / cov[1, 1]
+    expected_mean = target.mean() - beta * (control.mean() - control_mean)
+    residuals = target - beta * control
+
+    stats = RunningCovariance()
+    for block in _blocks(np.column_stack([target, control]), [2500, 2500]):
+        stats.update(block)
+    mean, standard_error = stats.estimate(control_mean=control_mean)
+
+    np.testing.assert_allclose(mean, expected_mean, rtol=1e-12)
+    # The adjusted error is that of the regression residuals
+    np.testing.assert_allclose(standard_error, np.std(residuals, ddof=1) / np.sqrt(len(target)), rtol=1e-10)
+    assert standard_error < np.std(target, ddof=1) / np.sqrt(len(target)) / 5
+
+    batch_mean, _ = mc_estimate(target, control=control, control_mean=control_mean)
+    np.testing.assert_allclose(batch_mean, expected_mean, rtol=1e-12)
+
+
+def test_running_covariance_without_control_is_plain_mean():
+    values = np.random.default_rng(4).normal(size=(1000, 1))
+    mean, standard_error = RunningCovariance().update(values).estimate()
+
+    np.testing.assert_allclose(mean, values.mean(), rtol=1e-12)
+    np.testing.assert_allclose(standard_error, values.std(ddof=1) / np.sqrt(len(values)), rtol=1e-10)
@@ -0,0 +1,61 @@
+"""Tests that multi-process block simulation is bit-identical to single-process simulation."""
+
+import numpy as np
+import pytest
+
+from model.parallel import simulate_blocks
+
+PATH_KWARGS = dict(
+    initial_price=100.0, risk_free_rate=0.04, initial_volatility=0.25, time_to_expiry=0.5,
+    mean_reversion_rate=5.0, vol_of_vol=0.2, long_term_variance=0.0625, correlation=-0.7
+)
+
+
+@pytest.mark.parametrize('antithetic', [False, True])
+def test_simulate_blocks_bit_identical_across_workers(antithetic):
+    path_kwargs = dict(PATH_KWARGS, num_sims=2500, antithetic=antithetic)
+    serial = list(simulate_blocks(path_kwargs, seed=7, block_size=600, workers=1, return_brownian=True,
+                                  return_sensitivities=True))
+    parallel = list(simulate_blocks(path_kwargs, seed=7, block_size=600, workers=3, return_brownian=True,
+                                    return_sensitivities=True))
+
+    assert [len(block.paths) for block in serial] == [600, 600, 600, 600, 100]
+    assert len(parallel) == len(serial)
+    for one, many in zip(serial, parallel):
+        np.testing.assert_array_equal(one.paths, many.paths)
+        np.testing.assert_array_equal(one.brownian, many.brownian)
+        for one_values, many_values in zip(one.sensitivities, many.sensitivities):
+            np.testing.assert_array_equal(one_values, many_values)
+
+
+def test_simulate_blocks_keep_paths_and_seed():
+    path_kwargs = dict(PATH_KWARGS, num_sims=1000)
+    kept = list(simulate_blocks(path_kwargs, seed=3, block_size=400, workers=2, keep_paths=500))
+    full = np.concatenate([block.paths for block in simulate_blocks(path_kwargs, seed=3, block_size=400)])
+    other_seed = np.concatenate([block.paths for block in simulate_blocks(path_kwargs, seed=4, block_size=400)])
+
+    assert [None if block.paths is None else len(block.paths) for block in kept] == [400, 100, None]
+    np.testing.assert_array_equal(np.concatenate([kept[0].paths, kept[1].paths]), full[:500])
+    assert not np.array_equal(full, other_seed)
+
+
+@pytest.mark.parametrize('options', [dict(), dict(greeks=True), dict(streaming=True),
+                                     dict(target_se=0.01, max_sims=6000)])
+def test_prices_bit_identical_across_workers(options):
+    pytest.importorskip('supabase')
+    import pricing
+    from data.schema import TickerData
+
+    stock_data = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+    results = []
+    for workers in (1, 3):
+        # Seeded in-memory path sets are cached whatever the worker count
+        pricing.path_cache.clear()
+        results.append(pricing.price_option_detailed('put', 'TEST', 105.0, 0.5, 4000, seed=11, block_size=1000,
+                                                     workers=workers, stock_data=stock_data, **options))
+
+    assert results[0].us_price == results[1].us_price
+    assert results[0].us_se == results[1].us_se
+    assert results[0].num_paths == results[1].num_paths
+    assert results[0].greeks == results[1].greeks
+    np.testing.assert_array_equal(results[0].paths, results[1].paths)
@@ -0,0 +1,139 @@
+"""Tests for the sample path downsampling, binary array encoding and response compression."""
+
+import base64
+import gzip
+import json
+
+import numpy as np
+import pytest
+from werkzeug.http import parse_accept_header
+
+import payloads
+from payloads import compress, encode_array, encode_arrays, lttb_indices, pack_msgpack, sample_paths
+
+
+def _random_walks(rows=4, length=500, seed=0):
+    return 100.0 + np.cumsum(np.random.default_rng(seed).normal(size=(rows, length)), axis=1)
+
+
+@pytest.mark.parametrize('points', [3, 4, 20, 499])
+def test_lttb_keeps_endpoints_and_requested_count(points):
+    series = _random_walks()
+    indices = lttb_indices(series, points)
+
+    assert indices.shape == (4, points)
+    assert np.all(indices[:, 0] == 0) and np.all(indices[:, -1] == series.shape[1] - 1)
+    assert np.all(np.diff(indices, axis=1) > 0)
+
+
+def test_lttb_keeps_spikes():
+    series = np.zeros((2, 101))
+    series[0, 37] = 10.0
+    series[1, 62] = -10.0
+    indices = lttb_indices(series, 12)
+    assert 37 in indices[0] and 62 in indices[1]
+
+
+def test_lttb_matches_row_by_row():
+    series = _random_walks()
+    indices = lttb_indices(series, 25)
+    for row, row_indices in zip(series, indices):
+        np.testing.assert_array_equal(lttb_indices(row[np.newaxis], 25)[0], row_indices)
+
+
+@pytest.mark.parametrize('points', [500, 800])
+def test_lttb_skips_short_series(points):
+    assert lttb_indices(_random_walks(), points) is None
+
+
+def test_sample_paths_downsamples_leading_paths():
+    paths = _random_walks(rows=10)
+    values, steps = sample_paths(paths, 3, points=50)
+    assert values.shape == (3, 50) and steps.shape == (3, 50)
+    np.testing.assert_array_equal(values, np.take_along_axis(paths[:3], steps, axis=1))
+
+    values, steps = sample_paths(paths, 3)
+    assert steps is None
+    np.testing.assert_array_equal(values, paths[:3])
+
+
+def test_sample_paths_without_paths():
+    values, steps = sample_paths(np.array([]), 5, points=10)
+    assert values.shape == (0, 0) and steps is None
+
+
+def _decode(encoded):
+    dtype = {'float32': '<f4', 'int32': '<i4'}[encoded['dtype']]
+    return np.frombuffer(base64.b64decode(encoded['data']), dtype=dtype).reshape(encoded['shape'])
+
+
+def test_float32_round_trip():
+    paths = _random_walks(rows=3, length=7)
+    encoded = encode_array(paths, 'float32')
+    assert encoded['dtype'] == 'float32' and encoded['shape'] == [3, 7]
+    np.testing.assert_array_equal(_decode(encoded), paths.astype(np.float32))
+
+
+def test_indices_round_trip_as_int32():
+    steps = np.array([[0, 5, 9], [0, 2, 9]])
+    encoded = encode_array(steps, 'float32')
+    assert encoded['dtype'] == 'int32'
+    np.testing.assert_array_equal(_decode(encoded), steps)
+
+
+def test_encode_arrays_through_nested_payload():
+    paths = _random_walks(rows=2, length=4)
+    payload = {'price': 1.5, 'paths': {'values': paths, 'steps': None}, 'legs': [np.arange(3)]}
+
+    as_lists = encode_arrays(payload, 'list')
+    assert as_lists == {'price': 1.5, 'paths': {'values': paths.tolist(), 'steps': None}, 'legs': [[0, 1, 2]]}
+    as_binary = json.loads(json.dumps(encode_arrays(payload, 'float32')))
+    np.testing.assert_array_equal(_decode(as_binary['paths']['values']), paths.astype(np.float32))
+    np.testing.assert_array_equal(_decode(as_binary['legs'][0]), np.arange(3))
+
+
+def test_small_bodies_are_not_compressed():
+    body = b'x' * (payloads.MIN_COMPRESSED_BYTES - 1)
+    assert compress(body, parse_accept_header('gzip, br')) == (body, None)
+
+
+def test_gzip_when_brotli_is_not_installed(monkeypatch):
+    monkeypatch.setattr(payloads, 'brotli', None)
+    body = json.dumps(_random_walks().tolist()).encode()
+    compressed, encoding = compress(body, parse_accept_header('br, gzip;q=0.5'))
+    assert encoding == 'gzip'
+    assert gzip.decompress(compressed) == body
+
+    assert compress(body, parse_accept_header('br')) == (body, None)
+
+
+def test_brotli_preferred_when_installed():
+    pytest.importorskip('brotli')
+    body = json.dumps(_random_walks().tolist()).encode()
+    compressed, encoding = compress(body, parse_accept_header('gzip, br'))
+    assert encoding == 'br'
+    assert payloads.brotli.decompress(compressed) == body
+
+
+def test_msgpack_round_trip_when_installed():
+    msgpack = pytest.importorskip('msgpack')
+    paths = _random_walks(rows=2, length=5)
+    unpacked = msgpack.unpackb(pack_msgpack({'price': np.float64(1.5), 'paths': paths}))
+    assert unpacked['price'] == 1.5
+    values = unpacked['paths']
+    np.testing.assert_array_equal(np.frombuffer(values['data'], dtype='<f4').reshape(values['shape']),
+                                  paths.astype(np.float32))
+
+
+def test_json_when_msgpack_is_not_installed(monkeypatch):
+    pytest.importorskip('supabase')
+    from api import app as app_module
+    monkeypatch.setattr(app_module, 'msgpack', None)
+    paths = _random_walks(rows=2, length=5)
+
+    with app_module.app.test_request_context(headers={'Accept': payloads.MSGPACK_MIMETYPE}):
+        app_module.g.timings = None
+        response = app_module._json_response({'paths': paths}, {'path_encoding': 'float32'})
+
+    assert response.mimetype == 'application/json'
+    np.testing.assert_array_equal(_decode(response.get_json()['paths']), paths.astype(np.float32))
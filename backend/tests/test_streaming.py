@@ -0,0 +1,68 @@
+"""Tests that block-by-block pricing agrees with in-memory pricing on the same paths, and reports the same errors."""
+
+import pytest
+
+pytest.importorskip('supabase')
+
+import pricing
+from data.schema import TickerData
+
+STOCK_DATA = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+
+def _price(num_sims, seed, **options):
+    pricing.path_cache.clear()
+    return pricing.price_option_detailed('put', 'TEST', 100.0, 0.5, num_sims, scheme='qe', seed=seed,
+                                         stock_data=STOCK_DATA, **options)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_streamed_price_matches_in_memory_price(seed):
+    in_memory = _price(30000, seed)
+    streamed = _price(30000, seed, streaming=True)
+
+    assert streamed.num_paths == in_memory.num_paths
+    # The same paths, priced with one fit on the first LSM_FIT_SIMS paths instead of all of them
+    assert abs(streamed.us_price - in_memory.us_price) < in_memory.us_se
+    assert streamed.us_se == pytest.approx(in_memory.us_se, rel=0.05)
+
+
+def test_streamed_run_within_fit_pool_matches_in_memory_fit():
+    # Every block falls in the fitting pool, so the streamed run fits exactly the in-memory paths
+    in_memory = _price(5000, 4, block_size=1000)
+    streamed = _price(5000, 4, streaming=True, block_size=1000)
+    assert streamed.us_price == pytest.approx(in_memory.us_price, rel=1e-12)
+    assert streamed.us_se == pytest.approx(in_memory.us_se, rel=1e-9)
+
+
+def test_streamed_blocks_share_one_policy(monkeypatch):
+    fits = []
+    fit = pricing.longstaff_schwartz_cashflows
+
+    def counting_fit(paths, *args, **kwargs):
+        fits.append(len(paths))
+        return fit(paths, *args, **kwargs)
+
+    monkeypatch.setattr(pricing, 'longstaff_schwartz_cashflows', counting_fit)
+    result = _price(25000, 5, streaming=True)
+
+    assert result.num_paths == 25000
+    assert fits == [pricing.LSM_FIT_SIMS]
+
+
+def test_target_precision_run_matches_large_reference():
+    reference = _price(200000, 6)
+    result = _price(2500, 7, target_se=0.03)
+
+    assert result.converged and result.us_se <= 0.03
+    assert result.num_paths < pricing.TARGET_MAX_SIMS
+    # Independent seeds: within 3 standard errors of the difference
+    assert abs(result.us_price - reference.us_price) < 3.0 * (result.us_se ** 2 + reference.us_se ** 2) ** 0.5
+
+
+@pytest.mark.parametrize('options', [{}, dict(streaming=True), dict(target_se=0.05), dict(qmc=True),
+                                     dict(antithetic=True, control_variate='black_scholes')])
+def test_reported_std_is_the_standard_error(options):
+    result = _price(4096, 8, **options)
+    assert result.us_std == result.us_se > 0.0
+    assert result.eu_std == result.eu_se == 0.0
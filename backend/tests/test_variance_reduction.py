@@ -0,0 +1,70 @@
+"""Tests for antithetic path pairs and the Black-Scholes control variate."""
+
+import numpy as np
+import pytest
+
+from model.heston_model import generate_paths
+from model.parallel import simulate_blocks
+
+PATH_KWARGS = dict(initial_price=100.0, risk_free_rate=0.04, initial_volatility=0.25, time_to_expiry=0.5,
+                   mean_reversion_rate=2.0, long_term_variance=0.0625, correlation=-0.6)
+
+
+@pytest.mark.parametrize('scheme', ['euler', 'qe'])
+def test_antithetic_pairs_use_negated_normals(scheme):
+    _, paths, brownian = generate_paths(1000, vol_of_vol=0.3, rng=3, scheme=scheme, steps_per_year=52,
+                                        antithetic=True, return_brownian=True, **PATH_KWARGS)
+    np.testing.assert_array_equal(brownian[1::2], -brownian[0::2])
+    assert not np.array_equal(paths[0::2], paths[1::2])
+
+
+def test_antithetic_paths_mirror_without_stochastic_volatility():
+    # With (almost) constant variance, log prices of a pair mirror each other around the common drift
+    _, paths = generate_paths(1000, vol_of_vol=1e-8, rng=3, scheme='qe', steps_per_year=52, antithetic=True,
+                              **PATH_KWARGS)
+    log_paths = np.log(paths)
+    pair_sums = log_paths[0::2] + log_paths[1::2]
+    np.testing.assert_allclose(pair_sums, np.broadcast_to(pair_sums[0], pair_sums.shape), atol=1e-6)
+    assert np.std(log_paths[:, -1]) > 0.1
+
+
+def test_antithetic_pairs_stay_within_blocks():
+    kwargs = dict(PATH_KWARGS, vol_of_vol=0.3, num_sims=1000, antithetic=True, scheme='qe', steps_per_year=52)
+    blocks = list(simulate_blocks(kwargs, seed=5, block_size=400, return_brownian=True))
+    assert [len(block.paths) for block in blocks] == [400, 400, 200]
+    for block in blocks:
+        np.testing.assert_array_equal(block.brownian[1::2], -block.brownian[0::2])
+
+
+@pytest.fixture
+def near_black_scholes(monkeypatch):
+    """Price a put with the vol of vol nearly switched off, so the Heston paths are close to Black-Scholes."""
+    pytest.importorskip('supabase')
+    import pricing
+    from data.schema import TickerData
+
+    monkeypatch.setattr(pricing, 'VOL_OF_VOL', 0.02)
+    stock_data = TickerData('TEST', 100.0, 0.3, {'schedule': []}, '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+
+    def price(**options):
+        pricing.path_cache.clear()
+        return pricing.price_option_detailed('put', 'TEST', 100.0, 0.5, 20000, scheme='qe', seed=4,
+                                             stock_data=stock_data, **options)
+    return price
+
+
+@pytest.mark.parametrize('antithetic', [False, True])
+def test_black_scholes_control_variate_keeps_mean_and_cuts_error(near_black_scholes, antithetic):
+    plain = near_black_scholes(antithetic=antithetic)
+    controlled = near_black_scholes(antithetic=antithetic, control_variate='black_scholes')
+
+    assert abs(controlled.us_price - plain.us_price) < 2.0 * plain.us_se
+    assert controlled.us_se < 0.8 * plain.us_se
+
+
+def test_antithetic_pairs_cut_error(near_black_scholes):
+    plain = near_black_scholes()
+    antithetic = near_black_scholes(antithetic=True)
+
+    assert abs(antithetic.us_price - plain.us_price) < 2.0 * plain.us_se
+    assert antithetic.us_se < 0.7 * plain.us_se